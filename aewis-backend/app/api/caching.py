@@ -0,0 +1,48 @@
+import hashlib
+import json
+from typing import Any, Callable, Hashable
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.orm import Session
+
+from app.core.cache import cache_key, response_cache
+from app.db.datasets import data_version
+
+
+def _etag(key: tuple) -> str:
+    digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()[:16]
+    return f'W/"{key[1]}-{digest}"'
+
+
+def _not_modified(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    return header.strip() == "*" or etag in [tag.strip() for tag in header.split(",")]
+
+
+def cached_json_response(
+    request: Request,
+    db: Session,
+    college_id: str,
+    variant: tuple[Hashable, ...],
+    build: Callable[[], Any],
+) -> Response:
+    """Serve `build()` as JSON through the per-college response cache.
+
+    Returns 304 when the client's If-None-Match matches the current ETag;
+    neither that nor a cache hit calls `build`, and the only query either
+    makes is the primary-key read of the college's data version.
+    """
+    key = cache_key(college_id, data_version(db, college_id), *variant)
+    etag = _etag(key)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    body = response_cache.get(key)
+    if body is None:
+        body = json.dumps(jsonable_encoder(build()), separators=(",", ":")).encode("utf-8")
+        response_cache.put(key, body)
+    return Response(content=body, media_type="application/json", headers=headers)
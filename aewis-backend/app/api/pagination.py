@@ -0,0 +1,15 @@
+from fastapi import HTTPException
+
+
+def format_cursor(priority: float, last_id: int) -> str:
+    """Keyset cursor for pages ordered by (priority DESC, id)."""
+    return f"{priority}_{last_id}"
+
+
+def parse_cursor(cursor: str) -> tuple[float, int]:
+    """(priority, id) of the last row of the previous page; 400 if malformed."""
+    try:
+        priority, last_id = cursor.split("_", 1)
+        return float(priority), int(last_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
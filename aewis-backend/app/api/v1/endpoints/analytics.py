@@ -1,28 +1,34 @@
-from collections import defaultdict
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.orm import Session
 
+from app.api.caching import cached_json_response
 from app.api.deps import get_db
-from app.db.base import Risk
-from app.models.risk import RiskStatsResponse, RiskStatsKPIs, RiskStatsCharts
+from app.db.columns import college_columns
+from app.db.history import risk_trend, snapshot_series
+from app.db.summary import get_or_rebuild_summary
+from app.models.risk import RiskHistoryResponse, RiskStatsResponse, RiskStatsKPIs, RiskStatsCharts
 
 router = APIRouter()
 
 
 @router.get("/risk-stats/{college_id}", response_model=RiskStatsResponse)
-def get_risk_stats(college_id: str, db: Session = Depends(get_db)):
-    rows = db.query(Risk).filter(Risk.college_id == college_id).all()
-    if not rows:
-        raise HTTPException(status_code=404, detail="College not found or no data")
+def get_risk_stats(college_id: str, request: Request, db: Session = Depends(get_db)):
+    return cached_json_response(request, db, college_id, ("risk-stats",), lambda: _risk_stats(db, college_id))
 
-    total = len(rows)
-    high = sum(1 for r in rows if r.risk_level == "HIGH")
-    medium = sum(1 for r in rows if r.risk_level == "MEDIUM")
-    low = sum(1 for r in rows if r.risk_level == "LOW")
 
-    avg_health = sum((r.quiz1 + r.quiz2 + r.quiz3) / 3 for r in rows) / total if total else 0
-    health_score = round(avg_health, 1)
-    success_rate = round((low + medium * 0.5) / total * 100, 1) if total else 0
+def _risk_stats(db: Session, college_id: str) -> RiskStatsResponse:
+    # Counts and health come from the maintained summary: O(subjects), not O(rows)
+    summary = get_or_rebuild_summary(db, college_id)
+    total = summary.total
+    if not total:
+        raise HTTPException(status_code=404, detail="College not found or no data")
+
+    high, medium, low = summary.high, summary.medium, summary.low
+    health_score = round(summary.quiz_avg_sum / total, 1)
+    success_rate = round((low + medium * 0.5) / total * 100, 1)
 
     risk_distribution = [
         {"level": "HIGH", "count": high},
@@ -30,35 +36,43 @@ def get_risk_stats(college_id: str, db: Session = Depends(get_db)):
         {"level": "LOW", "count": low},
     ]
 
-    subject_risks = defaultdict(float)
-    subject_counts = defaultdict(int)
-    for r in rows:
-        subject_risks[r.subject] += 1 if r.risk_level == "HIGH" else 0
-        subject_counts[r.subject] += 1
     subject_risks_pct = {
-        s: round(subject_risks[s] / subject_counts[s] * 100, 1)
-        for s in subject_counts
+        subject: round(counts[0] / sum(counts) * 100, 1)
+        for subject, counts in sorted(summary.subjects.items())
+        if sum(counts)
     }
 
-    decline_trends = []
-    by_student_subject = defaultdict(list)
-    for r in rows:
-        key = (r.student_id, r.subject)
-        by_student_subject[key].append((r.quiz1, r.quiz2, r.quiz3))
-    for key, quizzes in list(by_student_subject.items())[:50]:
-        if quizzes:
-            q1, q2, q3 = quizzes[0]
-            decline = ((q1 - q3) / q1 * 100) if q1 and q1 > 0 else 0
-            decline_trends.append({"student_id": key[0], "subject": key[1], "decline_pct": round(decline, 1)})
+    # Row-level charts come from the college's in-memory columns (loaded once per data version)
+    columns = college_columns(db, college_id)
 
+    # First row of the first 50 (student, subject) pairs, in upload order
+    first = columns.first_unique_pairs(50)
+    decline_trends = [
+        {
+            "student_id": student_id,
+            "subject": subject,
+            "decline_pct": round(decline, 1),
+        }
+        for student_id, subject, decline in zip(
+            columns.student_id[first].tolist(), columns.subject(first).tolist(), columns.decline_pct[first].tolist()
+        )
+    ]
+
+    head = slice(0, 200)
     heatmap_matrix = [
-        [r.student_id, r.subject, r.risk_level, r.xp_score, (r.quiz1 + r.quiz2 + r.quiz3) / 3]
-        for r in rows[:200]
+        [student_id, subject, level, xp, avg]
+        for student_id, subject, level, xp, avg in zip(
+            columns.student_id[head].tolist(),
+            columns.subject(head).tolist(),
+            columns.risk_level(head).tolist(),
+            columns.xp_score[head].tolist(),
+            columns.quiz_avg[head].tolist(),
+        )
     ]
 
     kpis = RiskStatsKPIs(
         health_score=health_score,
-        risk_trend=-12.5,
+        risk_trend=risk_trend(db, college_id),
         success_rate=success_rate,
     )
     charts = RiskStatsCharts(
@@ -73,3 +87,38 @@ def get_risk_stats(college_id: str, db: Session = Depends(get_db)):
         charts=charts,
         heatmap_matrix=heatmap_matrix,
     )
+
+
+@router.get("/risk-history/{college_id}", response_model=RiskHistoryResponse)
+def get_risk_history(
+    college_id: str,
+    request: Request,
+    subject: Optional[str] = Query(None, description="Subject series; omit for the whole college"),
+    since: Optional[datetime] = Query(None, description="Earliest snapshot time (inclusive)"),
+    until: Optional[datetime] = Query(None, description="Latest snapshot time (inclusive)"),
+    limit: int = Query(200, ge=1, le=5000, description="Most recent snapshots to return"),
+    db: Session = Depends(get_db),
+):
+    """Risk counts per upload over time, for trend charts."""
+    return cached_json_response(
+        request,
+        db,
+        college_id,
+        ("risk-history", subject, since, until, limit),
+        lambda: _risk_history(db, college_id, subject, since, until, limit),
+    )
+
+
+def _risk_history(db, college_id, subject, since, until, limit) -> RiskHistoryResponse:
+    # Range scan on ix_risk_snapshots_series; never touches the risks table
+    rows = snapshot_series(db, college_id, subject=subject, since=since, until=until, limit=limit)
+    return RiskHistoryResponse(
+        college_id=college_id,
+        subject=subject,
+        taken_at=[r.taken_at for r in rows],
+        total=[r.total for r in rows],
+        high=[r.high for r in rows],
+        medium=[r.medium for r in rows],
+        low=[r.low for r in rows],
+        health_score=[r.health_score for r in rows],
+    )
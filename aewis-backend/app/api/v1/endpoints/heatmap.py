@@ -0,0 +1,143 @@
+from typing import Literal, Optional
+
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.orm import Session
+
+from app.api.caching import cached_json_response
+from app.api.deps import get_db
+from app.api.pagination import format_cursor, parse_cursor
+from app.core.risk_engine import RISK_LEVELS
+from app.db.columns import CollegeColumns, college_columns
+from app.models.risk import HeatmapCells, HeatmapResponse, HeatmapRowsResponse
+
+router = APIRouter()
+
+HeatmapBy = Literal["risk", "health"]
+
+
+def _buckets(columns: CollegeColumns, by: str, width: int) -> tuple[list[str], np.ndarray]:
+    """Bucket labels and each row's bucket code: its risk level, or its quiz-average range."""
+    if by == "risk":
+        return list(RISK_LEVELS), columns.risk_code.astype(np.intp)
+    edges = list(range(0, 100, width))
+    labels = [f"{lo}-{min(lo + width, 100)}" for lo in edges]
+    codes = np.clip(columns.quiz_avg // width, 0, len(edges) - 1).astype(np.intp)  # 100 joins the top range
+    return labels, codes
+
+
+def _college(db: Session, college_id: str) -> CollegeColumns:
+    columns = college_columns(db, college_id)
+    if not len(columns):
+        raise HTTPException(status_code=404, detail="College not found or no data")
+    return columns
+
+
+@router.get("/heatmap/{college_id}", response_model=HeatmapResponse)
+def get_heatmap(
+    college_id: str,
+    request: Request,
+    by: HeatmapBy = Query("risk", description="risk: subject x risk level; health: subject x quiz-average range"),
+    width: int = Query(10, ge=5, le=50, description="Quiz-average range width for by=health"),
+    db: Session = Depends(get_db),
+):
+    """Row counts and averages per (subject, bucket) cell, aggregated over the college's columns."""
+    return cached_json_response(
+        request, db, college_id, ("heatmap", by, width), lambda: _heatmap(db, college_id, by, width)
+    )
+
+
+def _heatmap(db: Session, college_id: str, by: str, width: int) -> HeatmapResponse:
+    columns = _college(db, college_id)
+    labels, bucket = _buckets(columns, by, width)
+    # One flat cell index per row, so every aggregate is a single bincount
+    cell = columns.subject_code.astype(np.intp) * len(labels) + bucket
+    size = len(columns.subjects) * len(labels)
+    count = np.bincount(cell, minlength=size)
+    high = np.bincount(cell, weights=columns.risk_code == RISK_LEVELS.index("HIGH"), minlength=size)
+    score = np.bincount(cell, weights=columns.quiz_avg, minlength=size)
+    attendance = np.bincount(cell, weights=columns.attendance, minlength=size)
+
+    filled = np.flatnonzero(count)
+    n = count[filled]
+    return HeatmapResponse(
+        college_id=college_id,
+        by=by,
+        total=len(columns),
+        subjects=columns.subjects.tolist(),
+        buckets=labels,
+        cells=HeatmapCells(
+            subject=(filled // len(labels)).tolist(),
+            bucket=(filled % len(labels)).tolist(),
+            count=n.tolist(),
+            high=high[filled].astype(np.int64).tolist(),
+            avg_score=np.round(score[filled] / n, 1).tolist(),
+            avg_attendance=np.round(attendance[filled] / n, 1).tolist(),
+        ),
+    )
+
+
+@router.get("/heatmap/{college_id}/rows", response_model=HeatmapRowsResponse)
+def get_heatmap_rows(
+    college_id: str,
+    request: Request,
+    subject: str = Query(..., description="Cell subject"),
+    bucket: str = Query(..., description="Cell bucket label, as listed in the heatmap's buckets"),
+    by: HeatmapBy = Query("risk"),
+    width: int = Query(10, ge=5, le=50),
+    limit: int = Query(100, ge=1, le=1000, description="Page size"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    db: Session = Depends(get_db),
+):
+    """Drill-down: the rows of one heatmap cell, highest priority first."""
+    after = parse_cursor(cursor) if cursor else None
+    return cached_json_response(
+        request,
+        db,
+        college_id,
+        ("heatmap-rows", by, width, subject, bucket, limit, cursor),
+        lambda: _heatmap_rows(db, college_id, by, width, subject, bucket, limit, after),
+    )
+
+
+def _heatmap_rows(
+    db: Session, college_id: str, by: str, width: int, subject: str, bucket: str, limit: int,
+    after: Optional[tuple[float, int]],
+) -> HeatmapRowsResponse:
+    columns = _college(db, college_id)
+    labels, codes = _buckets(columns, by, width)
+    if bucket not in labels:
+        raise HTTPException(status_code=400, detail=f"Unknown bucket {bucket!r} for by={by}")
+    subject_code = np.flatnonzero(columns.subjects == subject)
+    if not len(subject_code):
+        raise HTTPException(status_code=404, detail="Subject not found")
+
+    rows = np.flatnonzero((columns.subject_code == subject_code[0]) & (codes == labels.index(bucket)))
+    total = len(rows)
+    # Same keyset order and cursor as the teacher list: priority desc, then id
+    rows = rows[np.lexsort((columns.id[rows], -columns.priority[rows]))]
+    if after is not None:
+        priority, last_id = after
+        p, ids = columns.priority[rows], columns.id[rows]
+        rows = rows[(p < priority) | ((p == priority) & (ids > last_id))]
+
+    page = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        next_cursor = format_cursor(columns.priority[page[-1]].item(), columns.id[page[-1]].item())
+    teachers = columns.teachers.tolist()
+    return HeatmapRowsResponse(
+        college_id=college_id,
+        subject=subject,
+        bucket=bucket,
+        total=total,
+        student_id=columns.student_id[page].tolist(),
+        teacher_id=[teachers[code] if code >= 0 else None for code in columns.teacher_code[page].tolist()],
+        quiz_avg=np.round(columns.quiz_avg[page], 1).tolist(),
+        attendance=columns.attendance[page].tolist(),
+        decline_pct=np.round(columns.decline_pct[page], 1).tolist(),
+        risk_level=columns.risk_level(page).tolist(),
+        xp_score=columns.xp_score[page].tolist(),
+        priority=columns.priority[page].tolist(),
+        next_cursor=next_cursor,
+    )
@@ -3,8 +3,10 @@ from sqlalchemy.orm import Session
 
 from app.api.deps import get_db
 from app.db.base import Risk, Intervention
+from app.db.datasets import active_risks, bump_data_version
 from app.models.risk import InterventionRequest, InterventionResponse
 from app.core.gamification import get_badge
+from app.db.summary import get_or_rebuild_summary
 
 router = APIRouter()
 
@@ -21,7 +23,7 @@ def record_intervention(
     risks = (
         db.query(Risk)
         .filter(
-            Risk.college_id == college_id,
+            active_risks(db, college_id),
             Risk.student_id.in_(student_ids),
         )
         .all()
@@ -29,12 +31,9 @@ def record_intervention(
     if not risks:
         raise HTTPException(status_code=404, detail="No matching students found")
 
-    total_before = db.query(Risk).filter(Risk.college_id == college_id).count()
-    high_before = (
-        db.query(Risk)
-        .filter(Risk.college_id == college_id, Risk.risk_level == "HIGH")
-        .count()
-    )
+    summary = get_or_rebuild_summary(db, college_id)
+    total_before = summary.total
+    high_before = summary.high
     success_rate_before = (
         (total_before - high_before) / total_before * 100 if total_before else 0
     )
@@ -42,6 +41,8 @@ def record_intervention(
     xp_earned = 0
     for r in risks:
         r.teacher_id = teacher_id
+        # teacher_id is hashed: the next incremental upload rewrites the row from the file, as replace does
+        r.row_hash = None
         xp_per = 50 + (r.xp_score or 0) // 10
         xp_earned += xp_per
         db.add(
@@ -55,14 +56,12 @@ def record_intervention(
             )
         )
 
+    bump_data_version(db, college_id)
     db.commit()
 
+    # Interventions assign teachers but do not re-score risks, so the summary is unchanged
     total_after = total_before
-    high_after = (
-        db.query(Risk)
-        .filter(Risk.college_id == college_id, Risk.risk_level == "HIGH")
-        .count()
-    )
+    high_after = get_or_rebuild_summary(db, college_id).high
     success_rate_after = (
         (total_after - high_after) / total_after * 100 if total_after else 0
     )
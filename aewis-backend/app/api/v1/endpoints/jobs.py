@@ -0,0 +1,23 @@
+from fastapi import APIRouter, HTTPException
+
+from app.core.jobs import upload_jobs
+from app.models.risk import UploadJobStatus
+
+router = APIRouter()
+
+
+@router.get("/jobs/{job_id}", response_model=UploadJobStatus)
+def get_job(job_id: str):
+    job = upload_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return UploadJobStatus(
+        job_id=job.id,
+        college_id=job.college_id,
+        phase=job.phase,
+        rows_processed=job.rows_processed,
+        rows_per_sec=round(job.rows_per_sec, 1),
+        elapsed_seconds=round(job.elapsed, 3),
+        error=job.error,
+        result=job.result,
+    )
@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_db
+from app.db.datasets import bump_data_version
+from app.db.rules import invalidate_rules, rule_config, save_rules
+from app.models.risk import RuleSetConfig
+
+router = APIRouter()
+
+
+@router.get("/rules/{college_id}", response_model=RuleSetConfig)
+def get_rules(college_id: str, db: Session = Depends(get_db)):
+    """The college's risk rules (the defaults if it has none)."""
+    return rule_config(db, college_id)
+
+
+@router.put("/rules/{college_id}", response_model=RuleSetConfig)
+def put_rules(college_id: str, body: RuleSetConfig, db: Session = Depends(get_db)):
+    """Replace the college's risk rules; they apply from the next upload (preview with /simulate)."""
+    save_rules(db, college_id, body)
+    bump_data_version(db, college_id)
+    db.commit()
+    invalidate_rules(college_id)
+    return body
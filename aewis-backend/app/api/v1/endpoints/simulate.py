@@ -0,0 +1,47 @@
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_db
+from app.core.risk_engine import CompiledRules, crisis_subjects_from_counts
+from app.db.columns import CollegeColumns, college_columns
+from app.db.rules import college_rules
+from app.models.risk import SimulationRequest, SimulationResponse, SimulationResult, SimulationThresholds
+
+router = APIRouter()
+
+
+@router.post("/simulate/{college_id}", response_model=SimulationResponse)
+def simulate(college_id: str, body: SimulationRequest, db: Session = Depends(get_db)):
+    """Re-evaluate the college under its rules with other thresholds; nothing is written."""
+    columns = college_columns(db, college_id)
+    rules = college_rules(db, college_id)
+    if not len(columns):
+        raise HTTPException(status_code=404, detail="College not found or no data")
+    return SimulationResponse(
+        college_id=college_id,
+        total_students=len(columns),
+        results=[_simulate(columns, rules, scenario) for scenario in body.scenarios],
+    )
+
+
+def _simulate(columns: CollegeColumns, rules: CompiledRules, scenario: SimulationThresholds) -> SimulationResult:
+    # One pass over the in-memory columns; quiz average and decline are precomputed per load
+    rules = rules.with_overrides(**scenario.model_dump())
+    codes, _ = rules.classify(columns.quiz_avg, columns.decline_pct, columns.attendance)
+    high, medium, low = np.bincount(codes, minlength=3).tolist()
+
+    n_subjects = len(columns.subjects)
+    totals = np.bincount(columns.subject_code, minlength=n_subjects)
+    highs = np.bincount(columns.subject_code[codes == 0], minlength=n_subjects)
+    counts = {s: (int(t), int(h)) for s, t, h in zip(columns.subjects.tolist(), totals, highs)}
+
+    return SimulationResult(
+        thresholds=scenario,
+        high_risk=high,
+        medium_risk=medium,
+        low_risk=low,
+        changed=int(np.count_nonzero(codes != columns.risk_code)),
+        crisis_subjects=crisis_subjects_from_counts(counts, rules.crisis_share),
+        subject_risks={s: round(h / t * 100, 1) for s, (t, h) in sorted(counts.items()) if t},
+    )
@@ -1,8 +1,14 @@
-from fastapi import APIRouter, Depends, Query
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query, Request
+from sqlalchemy import and_, or_
 from sqlalchemy.orm import Session
 
+from app.api.caching import cached_json_response
 from app.api.deps import get_db
+from app.api.pagination import format_cursor, parse_cursor
 from app.db.base import Risk
+from app.db.datasets import active_risks
 from app.models.risk import TeacherStudentRisk
 
 router = APIRouter()
@@ -11,17 +17,37 @@ router = APIRouter()
 @router.get("/teacher/{teacher_id}/students")
 def get_teacher_students(
     teacher_id: str,
+    request: Request,
     college_id: str = Query("demo_001", description="College ID"),
+    limit: int = Query(100, ge=1, le=500, description="Page size"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
     db: Session = Depends(get_db),
 ):
-    """Teacher-specific risk list for dashboard."""
-    all_risks = (
-        db.query(Risk)
-        .filter(Risk.college_id == college_id)
-        .order_by(Risk.risk_level.desc())
-        .limit(100)
-        .all()
+    """Teacher-specific risk list for dashboard, highest priority first."""
+    after = parse_cursor(cursor) if cursor else None
+    return cached_json_response(
+        request,
+        db,
+        college_id,
+        ("teacher", teacher_id, limit, cursor),
+        lambda: _teacher_students(db, teacher_id, college_id, limit, after),
     )
+
+
+def _teacher_students(
+    db: Session, teacher_id: str, college_id: str, limit: int, after: Optional[tuple[float, int]]
+) -> dict:
+    # Keyset pagination over ix_risks_worklist: each page is an index seek, not an OFFSET scan
+    query = db.query(Risk).filter(active_risks(db, college_id), Risk.teacher_id == teacher_id)
+    if after is not None:
+        priority, last_id = after
+        query = query.filter(
+            or_(Risk.priority < priority, and_(Risk.priority == priority, Risk.id > last_id))
+        )
+    rows = query.order_by(Risk.priority.desc(), Risk.id).limit(limit + 1).all()
+
+    page = rows[:limit]
+    next_cursor = format_cursor(page[-1].priority, page[-1].id) if len(rows) > limit else None
     result = [
         TeacherStudentRisk(
             student_id=r.student_id,
@@ -29,7 +55,8 @@ def get_teacher_students(
             risk_level=r.risk_level,
             reason=r.reason or "",
             xp_score=r.xp_score or 0,
+            priority=r.priority or 0.0,
         )
-        for r in all_risks
+        for r in page
     ]
-    return {"teacher_id": teacher_id, "college_id": college_id, "students": result}
+    return {"teacher_id": teacher_id, "college_id": college_id, "students": result, "next_cursor": next_cursor}
@@ -1,123 +1,149 @@
-import io
-import pandas as pd
-from fastapi import APIRouter, UploadFile, File, Form, Depends, HTTPException
+import hashlib
+import os
+import tempfile
+
+from fastapi import APIRouter, UploadFile, File, Form, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, Response
 from sqlalchemy.orm import Session
-from collections import defaultdict
 
 from app.api.deps import get_db
-from app.db.base import Risk
-from app.core.risk_engine import compute_risk
-from app.models.risk import UploadResponse, UploadSummary, TopRisk
+from app.config import settings
+from app.core.ingest import IngestError, ingest_frames, read_upload_chunks, upload_format
+from app.core.jobs import Job, upload_jobs
+from app.db.datasets import CollegeBusy
+from app.db.rules import college_rules
+from app.db.session import SessionLocal
+from app.db.uploads import content_hash, identical_upload, upload_key
+from app.models.risk import UploadJobAccepted, UploadResponse
 
 router = APIRouter()
 
+SPOOL_READ_BYTES = 1024 * 1024
+# Set on responses served from an identical earlier upload
+IDENTICAL_UPLOAD_HEADER = "X-Upload-Identical"
+
+
+def _frames_for(fileobj, fmt: str, stream: bool, heatmap: bool = True):
+    if not heatmap:
+        heatmap_limit = 0
+    elif stream:
+        heatmap_limit = settings.UPLOAD_STREAM_HEATMAP_ROWS
+    else:
+        heatmap_limit = None
+    if stream:
+        return read_upload_chunks(fileobj, fmt, settings.UPLOAD_CHUNK_ROWS), heatmap_limit
+    return read_upload_chunks(fileobj, fmt), heatmap_limit
+
+
+def _upload_key(
+    db: Session, college_id: str, digest: str, mode: str, fmt: str, stream: bool, heatmap: bool
+) -> str:
+    return upload_key(digest, mode, fmt, stream, college_rules(db, college_id).hash_key, heatmap)
+
+
+def _stored_upload_job(job: Job, stored: bytes) -> UploadResponse:
+    response = UploadResponse.model_validate_json(stored)
+    job.update("publishing", response.summary.total_students)
+    return response
+
+
+def _run_upload_job(
+    job: Job, path: str, fmt: str, stream: bool, heatmap: bool, mode: str, key: str
+) -> UploadResponse:
+    db = SessionLocal()
+    try:
+        with open(path, "rb") as f:
+            frames, heatmap_limit = _frames_for(f, fmt, stream, heatmap)
+            return ingest_frames(
+                db, job.college_id, frames, heatmap_limit=heatmap_limit, progress=job.update, mode=mode,
+                upload_key=key,
+            )
+    finally:
+        db.close()
+        os.unlink(path)
 
-@router.post("/upload-csv", response_model=UploadResponse)
+
+@router.post(
+    "/upload-csv",
+    response_model=UploadResponse,
+    responses={202: {"model": UploadJobAccepted, "description": "Upload queued as a background job"}},
+)
 async def upload_csv(
     file: UploadFile = File(...),
     college_id: str = Form("demo"),
+    stream: bool = Query(False, description="Parse, score and write the file in bounded-memory chunks"),
+    run_async: bool = Query(False, alias="async", description="Queue the upload and return a job id immediately"),
+    mode: str = Query(
+        "replace",
+        pattern="^(replace|incremental)$",
+        description="replace: rewrite the college; incremental: write only new, changed and removed rows",
+    ),
+    force: bool = Query(False, description="Process the file even if it is identical to the college's last upload"),
+    heatmap: bool = Query(
+        True,
+        description="Include the per-row heatmap_matrix; false returns it empty (see GET /heatmap). "
+        "Always empty for async uploads",
+    ),
     db: Session = Depends(get_db),
 ):
-    if not file.filename or not file.filename.lower().endswith(".csv"):
-        raise HTTPException(status_code=400, detail="CSV file required")
-
-    content = await file.read()
-    try:
-        df = pd.read_csv(io.StringIO(content.decode("utf-8")))
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Invalid CSV: {str(e)}")
-
-    required = ["student_id", "subject", "quiz1", "quiz2", "quiz3", "attendance"]
-    for col in required:
-        if col not in df.columns:
-            raise HTTPException(status_code=400, detail=f"Missing column: {col}")
+    # CSV (optionally .csv.gz or a single-CSV .zip), Parquet or Arrow IPC (.arrow/.feather)
+    fmt = upload_format(file.filename or "")
+    if fmt is None:
+        raise HTTPException(
+            status_code=400, detail="Unsupported file type: upload .csv, .csv.gz, .zip, .parquet or .arrow"
+        )
 
     # Normalize college_id
     cid = f"{college_id}_001" if college_id == "demo" else college_id
 
-    # Delete existing risks for this college to avoid duplicates
-    db.query(Risk).filter(Risk.college_id == cid).delete()
-    db.commit()
-
-    high, medium, low = 0, 0, 0
-    subject_high_count = defaultdict(int)
-    subject_total = defaultdict(int)
-    records = []
-    top_risks = []
-    matrix_rows = []
-
-    for _, row in df.iterrows():
-        r = row.to_dict()
-        computed = compute_risk(r)
-        if computed.risk_level == "HIGH":
-            high += 1
-        elif computed.risk_level == "MEDIUM":
-            medium += 1
-        else:
-            low += 1
-
-        subject_total[r["subject"]] += 1
-        if computed.risk_level == "HIGH":
-            subject_high_count[r["subject"]] += 1
-
-        rec = Risk(
+    if run_async:
+        # Finished jobs are kept for polling, so their results carry no per-row heatmap
+        heatmap = False
+        # The request's spooled file is closed once we respond, so hand the job its own copy
+        sha = hashlib.sha256()
+        tmp = tempfile.NamedTemporaryFile(prefix="aewis-upload-", delete=False)
+        handed_off = False  # once the job owns the copy, _run_upload_job deletes it
+        try:
+            with tmp:
+                while chunk := await file.read(SPOOL_READ_BYTES):
+                    sha.update(chunk)
+                    await run_in_threadpool(tmp.write, chunk)
+            key = await run_in_threadpool(_upload_key, db, cid, sha.hexdigest(), mode, fmt, stream, heatmap)
+            stored = None if force else await run_in_threadpool(identical_upload, db, cid, key)
+            if stored is not None:
+                job = upload_jobs.submit(cid, lambda job: _stored_upload_job(job, stored))
+            else:
+                job = upload_jobs.submit(
+                    cid, lambda job: _run_upload_job(job, tmp.name, fmt, stream, heatmap, mode, key)
+                )
+                handed_off = True
+        finally:
+            if not handed_off:
+                os.unlink(tmp.name)
+        accepted = UploadJobAccepted(
+            job_id=job.id,
             college_id=cid,
-            student_id=str(r["student_id"]),
-            subject=str(r["subject"]),
-            quiz1=float(r["quiz1"]),
-            quiz2=float(r["quiz2"]),
-            quiz3=float(r["quiz3"]),
-            attendance=float(r["attendance"]),
-            risk_level=computed.risk_level,
-            xp_score=computed.xp_score,
-            reason=computed.reason,
+            phase=job.phase,
+            status_url=f"{settings.API_V1_STR}/jobs/{job.id}",
         )
-        records.append(rec)
-        if computed.risk_level == "HIGH" and len(top_risks) < 20:
-            top_risks.append(
-                TopRisk(
-                    student_id=str(r["student_id"]),
-                    subject=str(r["subject"]),
-                    risk=computed.risk_level,
-                    reason=computed.reason,
-                )
-            )
-        matrix_rows.append(
-            [
-                r["student_id"],
-                r["subject"],
-                computed.risk_level,
-                computed.xp_score,
-                computed.health_score,
-            ]
+        return JSONResponse(status_code=202, content=accepted.model_dump())
+
+    # A re-sent export is answered from the stored response without parsing it
+    digest = await run_in_threadpool(content_hash, file.file)
+    key = await run_in_threadpool(_upload_key, db, cid, digest, mode, fmt, stream, heatmap)
+    stored = None if force else await run_in_threadpool(identical_upload, db, cid, key)
+    if stored is not None:
+        return Response(content=stored, media_type="application/json", headers={IDENTICAL_UPLOAD_HEADER: "true"})
+
+    # Parse straight from the spooled upload rather than copying it into memory.
+    # Parsing, scoring and commits are blocking, so run them off the event loop.
+    frames, heatmap_limit = _frames_for(file.file, fmt, stream, heatmap)
+    try:
+        return await run_in_threadpool(
+            ingest_frames, db, cid, frames, heatmap_limit=heatmap_limit, mode=mode, upload_key=key
         )
-
-    db.add_all(records)
-    db.commit()
-
-    # Crisis subjects: >30% high risk
-    crisis_subjects = [
-        s
-        for s in subject_total
-        if subject_total[s] > 0
-        and subject_high_count[s] / subject_total[s] > 0.30
-    ]
-    crisis_subjects = sorted(crisis_subjects)
-
-    heatmap_matrix = matrix_rows
-
-    summary = UploadSummary(
-        total_students=len(records),
-        high_risk=high,
-        medium_risk=medium,
-        low_risk=low,
-        crisis_subjects=crisis_subjects,
-    )
-
-    return UploadResponse(
-        success=True,
-        college_id=cid,
-        summary=summary,
-        heatmap_matrix=heatmap_matrix,
-        top_risks=top_risks,
-    )
+    except IngestError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except CollegeBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import upload, analytics, interventions, teacher
+from app.api.v1.endpoints import upload, analytics, interventions, teacher, jobs, simulate, rules, heatmap
 
 api_router = APIRouter()
 
@@ -7,3 +7,7 @@ api_router.include_router(upload.router, prefix="", tags=["upload"])
 api_router.include_router(analytics.router, prefix="", tags=["analytics"])
 api_router.include_router(interventions.router, prefix="", tags=["interventions"])
 api_router.include_router(teacher.router, prefix="", tags=["teacher"])
+api_router.include_router(jobs.router, prefix="", tags=["jobs"])
+api_router.include_router(simulate.router, prefix="", tags=["simulate"])
+api_router.include_router(rules.router, prefix="", tags=["rules"])
+api_router.include_router(heatmap.router, prefix="", tags=["heatmap"])
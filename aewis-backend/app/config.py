@@ -6,6 +6,18 @@ class Settings(BaseSettings):
     DEBUG: bool = True
     DATABASE_URL: str = "sqlite:///./aewis.db"
     API_V1_STR: str = "/api/v1"
+    BULK_INSERT_CHUNK_SIZE: int = 10000
+    UPLOAD_CHUNK_ROWS: int = 50000
+    UPLOAD_STREAM_HEATMAP_ROWS: int = 1000
+    UPLOAD_MAX_CONCURRENT_JOBS: int = 2
+    UPLOAD_JOB_TTL_SECONDS: int = 3600
+    SCORING_PROCESSES: int = 0  # 0: one per CPU; 1: always score in-process
+    SCORING_PARALLEL_MIN_ROWS: int = 1_000_000
+    RESPONSE_CACHE_MAX_BYTES: int = 32 * 1024 * 1024
+    COLUMN_STORE_MAX_BYTES: int = 256 * 1024 * 1024
+    DATASET_GC_DELAY_SECONDS: float = 30.0
+    COLLEGE_WRITE_LEASE_SECONDS: float = 300.0  # a crashed upload's lease expires after this
+    COLLEGE_WRITE_WAIT_SECONDS: float = 60.0  # how long an upload waits for the college's current one
     CORS_ORIGINS: List[str] = [
         "http://localhost:8501",
         "https://*.streamlit.app",
@@ -1,4 +1,4 @@
-from .risk_engine import compute_risk, RiskLevelEnum
+from .risk_engine import compute_risk, RiskLevelEnum, RiskResult
 from .gamification import calculate_level, get_badge
 
-__all__ = ["compute_risk", "RiskLevelEnum", "calculate_level", "get_badge"]
+__all__ = ["compute_risk", "RiskLevelEnum", "RiskResult", "calculate_level", "get_badge"]
@@ -0,0 +1,125 @@
+"""
+Memory-bounded LRUs of serialized responses and of in-memory column sets.
+Both are keyed on the college's data version, a counter in college_datasets
+that every write bumps in its own transaction (see app/db/datasets.py).
+Readers look the version up first, so anything cached before a write is
+never served after it, whichever process made the write.
+"""
+import threading
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional
+
+from app.config import settings
+
+
+class ResponseCache:
+    """LRU of serialized bodies keyed by (college_id, data_version, ...), bounded by total bytes."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: OrderedDict[tuple, bytes] = OrderedDict()
+        self._versions: dict[str, int] = {}  # newest data version stored per college
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> Optional[bytes]:
+        with self._lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+            return body
+
+    def put(self, key: tuple, body: bytes) -> None:
+        if len(body) > self.max_bytes:
+            return
+        college_id, version = key[:2]
+        with self._lock:
+            newest = self._versions.get(college_id, version)
+            if version < newest:
+                return  # built from data a later write has replaced
+            if version > newest:
+                self._drop_college(college_id)
+            self._versions[college_id] = version
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.size -= len(old)
+            self._entries[key] = body
+            self.size += len(body)
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def drop_college(self, college_id: str) -> None:
+        with self._lock:
+            self._drop_college(college_id)
+
+    def _drop_college(self, college_id: str) -> None:
+        for key in [k for k in self._entries if k[0] == college_id]:
+            self.size -= len(self._entries.pop(key))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+            self.size = 0
+
+
+class ColumnStore:
+    """LRU of one column set per college (see app/db/columns.py), bounded by `nbytes`.
+
+    Entries are tagged with the data version they were loaded at; a lookup
+    at any other version reloads.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: OrderedDict[str, tuple[int, object]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, college_id: str, version: int, load: Callable[[], object]):
+        """Cached columns for the college at `version`, or `load()` them on a miss.
+
+        Read `version` before loading, so a write that lands in between only
+        costs a reload on the next lookup.
+        """
+        with self._lock:
+            entry = self._entries.get(college_id)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(college_id)
+                return entry[1]
+        columns = load()
+        self.put(college_id, version, columns)
+        return columns
+
+    def put(self, college_id: str, version: int, columns) -> None:
+        if columns.nbytes > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(college_id, None)
+            if old is not None:
+                self.size -= old[1].nbytes
+            self._entries[college_id] = (version, columns)
+            self.size += columns.nbytes
+            while self.size > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.size -= evicted.nbytes
+
+    def drop_college(self, college_id: str) -> None:
+        with self._lock:
+            old = self._entries.pop(college_id, None)
+            if old is not None:
+                self.size -= old[1].nbytes
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+
+response_cache = ResponseCache(settings.RESPONSE_CACHE_MAX_BYTES)
+column_store = ColumnStore(settings.COLUMN_STORE_MAX_BYTES)
+
+
+def cache_key(college_id: str, version: int, *variant: Hashable) -> tuple:
+    return (college_id, version) + variant
@@ -0,0 +1,591 @@
+"""
+Upload ingestion pipeline.
+Parses uploaded CSV (plain, gzip or zip), Parquet or Arrow IPC data, scores it
+with the batch risk engine and bulk-writes it to the risks table one chunk at
+a time, so a streaming upload only holds the chunk being written and the one
+being scored ahead of it in memory.
+Every format yields the same DataFrames, so column validation is shared.
+
+Two modes share the per-chunk scoring:
+- replace: write every uploaded row into a new staging dataset version and
+  publish it atomically once complete (see app/db/datasets.py); readers keep
+  seeing the previous version until then.
+- incremental: diff rows keyed on (student_id, subject) by a hash of their
+  inputs; only inserted or changed rows are re-scored and written, and only
+  rows missing from the upload are deleted.
+"""
+import gzip
+import re
+import zipfile
+from dataclasses import dataclass
+from collections import deque
+from typing import BinaryIO, Callable, Iterable, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core.cache import column_store
+from app.core.parallel import PendingScore, compute_risk_series, submit_risk_series
+from app.core.risk_engine import DEFAULT_RULES, CompiledRules, RiskBatch, crisis_subjects_from_counts
+from app.db.base import Risk
+from app.db.bulk import bulk_delete_risks, bulk_insert_risks, bulk_update_risks, pack_extra_quizzes
+from app.db.columns import college_columns
+from app.db.datasets import (
+    active_version, allocate_version, bump_data_version, college_write_lease, discard_version, publish_version,
+    schedule_garbage_collection,
+)
+from app.db.history import record_snapshot
+from app.db.rules import college_rules
+from app.db.summary import SummaryData, compute_summary, read_summary, write_summary
+from app.db.uploads import record_upload
+from app.models.risk import IngestChanges, TopRisk, UploadResponse, UploadSummary
+
+REQUIRED_COLUMNS = ["student_id", "subject", "quiz1", "quiz2", "quiz3", "attendance"]
+# Optional: teacher_id assigns each row to a teacher's worklist, and quiz4..quizN
+# extend the assessment series
+MAX_QUIZZES = 50
+QUIZ_COLUMN = re.compile(r"quiz([1-9][0-9]*)")
+TOP_RISKS_LIMIT = 20
+# Filename suffix -> upload format, longest suffixes first
+UPLOAD_FORMATS = (
+    (".csv.gz", "gzip"),
+    (".csv", "csv"),
+    (".gz", "gzip"),
+    (".zip", "zip"),
+    (".parquet", "parquet"),
+    (".arrow", "arrow"),
+    (".feather", "arrow"),
+)
+INGEST_MODES = ("replace", "incremental")
+# Identifiers are text even when they look numeric: teacher "12" must not become 12.0
+CSV_DTYPES = {"teacher_id": str}
+
+
+class IngestError(ValueError):
+    """Uploaded data could not be parsed or is missing required columns."""
+
+
+def read_csv_chunks(fileobj: BinaryIO, chunk_rows: Optional[int] = None) -> Iterator[pd.DataFrame]:
+    """Yield DataFrames parsed from a binary CSV stream.
+
+    With `chunk_rows` the file is parsed incrementally; without it the whole
+    file is parsed into a single frame.
+    """
+    try:
+        if chunk_rows is None:
+            yield pd.read_csv(fileobj, encoding="utf-8", dtype=CSV_DTYPES)
+            return
+        with pd.read_csv(fileobj, encoding="utf-8", dtype=CSV_DTYPES, chunksize=chunk_rows) as reader:
+            yield from reader
+    except Exception as e:
+        raise IngestError(f"Invalid CSV: {str(e)}") from e
+
+
+def upload_format(filename: str) -> Optional[str]:
+    """The upload format for a filename (see UPLOAD_FORMATS), or None if unsupported."""
+    name = filename.lower()
+    return next((fmt for suffix, fmt in UPLOAD_FORMATS if name.endswith(suffix)), None)
+
+
+def read_upload_chunks(fileobj: BinaryIO, fmt: str, chunk_rows: Optional[int] = None) -> Iterator[pd.DataFrame]:
+    """Yield DataFrames from an upload in any of UPLOAD_FORMATS.
+
+    Compressed CSV is decompressed as a stream; Parquet and Arrow are read in
+    record batches and converted column by column, without per-value Python
+    objects for numeric columns.
+    """
+    if fmt == "csv":
+        yield from read_csv_chunks(fileobj, chunk_rows)
+    elif fmt == "gzip":
+        yield from read_csv_chunks(gzip.GzipFile(fileobj=fileobj, mode="rb"), chunk_rows)
+    elif fmt == "zip":
+        try:
+            archive = zipfile.ZipFile(fileobj)
+        except zipfile.BadZipFile as e:
+            raise IngestError(f"Invalid zip archive: {str(e)}") from e
+        with archive, archive.open(_zip_member(archive)) as member:
+            yield from read_csv_chunks(member, chunk_rows)
+    elif fmt in ("parquet", "arrow"):
+        yield from _read_arrow_chunks(fileobj, fmt, chunk_rows)
+    else:
+        raise IngestError(f"Unsupported upload format: {fmt}")
+
+
+def _zip_member(archive: zipfile.ZipFile) -> zipfile.ZipInfo:
+    files = [info for info in archive.infolist() if not info.is_dir()]
+    csvs = [info for info in files if info.filename.lower().endswith(".csv")]
+    if len(files) == 1:
+        return files[0]
+    if len(csvs) == 1:
+        return csvs[0]
+    raise IngestError("Zip archive must contain exactly one CSV file")
+
+
+def _read_arrow_chunks(fileobj: BinaryIO, fmt: str, chunk_rows: Optional[int]) -> Iterator[pd.DataFrame]:
+    try:
+        import pyarrow as pa
+        import pyarrow.ipc
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise IngestError(f"{fmt.capitalize()} uploads require pyarrow on the server (pip install pyarrow)")
+
+    try:
+        if fmt == "parquet":
+            parquet = pq.ParquetFile(fileobj)
+            schema = parquet.schema_arrow
+            batches = parquet.iter_batches(batch_size=chunk_rows or 64 * 1024)
+        else:
+            try:
+                reader = pa.ipc.open_file(fileobj)
+                batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+            except pa.ArrowInvalid:
+                # Not the random-access file format; try the streaming format
+                fileobj.seek(0)
+                reader = pa.ipc.open_stream(fileobj)
+                batches = iter(reader)
+            schema = reader.schema
+
+        # Group record batches into frames of about chunk_rows rows (the whole file without it)
+        pending, rows, yielded = [], 0, False
+        for batch in batches:
+            pending.append(batch)
+            rows += batch.num_rows
+            if chunk_rows and rows >= chunk_rows:
+                yield _arrow_frame(pa.Table.from_batches(pending, schema=schema))
+                pending, rows, yielded = [], 0, True
+        if pending or not yielded:
+            yield _arrow_frame(pa.Table.from_batches(pending, schema=schema))
+    except (pa.ArrowException, OSError) as e:
+        raise IngestError(f"Invalid {fmt} file: {str(e)}") from e
+
+
+def _arrow_frame(table) -> pd.DataFrame:
+    """Arrow table -> DataFrame; dictionary-encoded columns are decoded to plain values."""
+    import pyarrow as pa
+
+    for i, field in enumerate(table.schema):
+        if pa.types.is_dictionary(field.type):
+            table = table.set_column(i, field.name, table.column(i).cast(field.type.value_type))
+    return table.to_pandas()
+
+
+def validate_columns(df: pd.DataFrame) -> None:
+    for col in REQUIRED_COLUMNS:
+        if col not in df.columns:
+            raise IngestError(f"Missing column: {col}")
+    quiz_columns(df)
+
+
+def quiz_columns(df: pd.DataFrame) -> list[str]:
+    """quiz1..quizN in order; the numbering must have no gaps."""
+    numbers = sorted(int(m.group(1)) for m in map(QUIZ_COLUMN.fullmatch, map(str, df.columns)) if m)
+    if len(numbers) > MAX_QUIZZES:
+        raise IngestError(f"Too many quiz columns: at most {MAX_QUIZZES} are supported")
+    for expected, number in enumerate(numbers, start=1):
+        if number != expected:
+            raise IngestError(f"Missing column: quiz{expected}")
+    return [f"quiz{n}" for n in numbers]
+
+
+def _teacher_ids(df: pd.DataFrame) -> list:
+    if "teacher_id" not in df.columns:
+        return [None] * len(df)
+    teachers = df["teacher_id"]
+    if pd.api.types.is_float_dtype(teachers) and (teachers.dropna() % 1 == 0).all():
+        # Integer IDs with nulls (e.g. from Parquet) arrive as float64
+        teachers = teachers.astype("Int64")
+    return teachers.astype(str).astype(object).where(teachers.notna(), None).tolist()
+
+
+def row_hashes(df: pd.DataFrame, hash_key: Optional[str] = None) -> np.ndarray:
+    """16-hex-digit hash per row of the inputs that determine a stored risk row.
+
+    `hash_key` (CompiledRules.hash_key) ties the hash to the rules that scored it.
+    Non-numeric scores raise IngestError, as they do when the rows are scored.
+    """
+    try:
+        quizzes = {col: df[col].astype(float).to_numpy() for col in quiz_columns(df)}
+        attendance = df["attendance"].astype(float).to_numpy()
+    except ValueError as e:
+        raise IngestError(f"Invalid CSV: {str(e)}") from e
+    inputs = pd.DataFrame({
+        "quiz1": quizzes["quiz1"],
+        "quiz2": quizzes["quiz2"],
+        "quiz3": quizzes["quiz3"],
+        "attendance": attendance,
+        "teacher_id": _teacher_ids(df),
+    })
+    for col in list(quizzes)[3:]:
+        inputs[col] = quizzes[col]
+    if hash_key is not None:
+        inputs["rules"] = hash_key
+    hashed = pd.util.hash_pandas_object(inputs, index=False).to_numpy()
+    return np.array([f"{h:016x}" for h in hashed.tolist()], dtype=object)
+
+
+@dataclass
+class ScoredFrame:
+    """One validated chunk of upload rows and its risk scores."""
+    df: pd.DataFrame
+    computed: RiskBatch
+    student_ids: list
+    subjects: list
+    quizzes: np.ndarray  # (rows, assessments)
+    rules: CompiledRules = DEFAULT_RULES
+
+    @classmethod
+    def score(cls, df: pd.DataFrame, rules: CompiledRules = DEFAULT_RULES) -> "ScoredFrame":
+        try:
+            quizzes = df[quiz_columns(df)].to_numpy(dtype=np.float64)
+            computed = compute_risk_series(quizzes, df["attendance"], rules)
+        except ValueError as e:
+            raise IngestError(f"Invalid CSV: {str(e)}") from e
+        return cls._scored(df, quizzes, computed, rules)
+
+    @classmethod
+    def submit(cls, df: pd.DataFrame, rules: CompiledRules = DEFAULT_RULES) -> "PendingFrame":
+        """Start scoring `df` in the scoring pool; PendingFrame.result() waits for the ScoredFrame."""
+        try:
+            quizzes = df[quiz_columns(df)].to_numpy(dtype=np.float64)
+            pending = submit_risk_series(quizzes, df["attendance"], rules)
+        except ValueError as e:
+            raise IngestError(f"Invalid CSV: {str(e)}") from e
+        return PendingFrame(df, quizzes, pending)
+
+    @classmethod
+    def _scored(cls, df: pd.DataFrame, quizzes: np.ndarray, computed: RiskBatch, rules: CompiledRules) -> "ScoredFrame":
+        return cls(
+            df=df,
+            computed=computed,
+            student_ids=df["student_id"].astype(str).tolist(),
+            subjects=df["subject"].astype(str).tolist(),
+            quizzes=quizzes,
+            rules=rules,
+        )
+
+    @property
+    def quiz_avg(self) -> np.ndarray:
+        return self.computed.quiz_avg
+
+    def columns(self, hashes: Optional[np.ndarray] = None) -> dict[str, list]:
+        """Column lists in the shape bulk_insert_risks expects."""
+        df, computed = self.df, self.computed
+        columns = {
+            "student_id": self.student_ids,
+            "subject": self.subjects,
+            "quiz1": self.quizzes[:, 0].tolist(),
+            "quiz2": self.quizzes[:, 1].tolist(),
+            "quiz3": self.quizzes[:, 2].tolist(),
+            "quiz_avg": computed.quiz_avg.tolist(),
+            "attendance": df["attendance"].astype(float).tolist(),
+            "risk_level": computed.risk_level.tolist(),
+            "xp_score": computed.xp_score.tolist(),
+            "reason": computed.reason.tolist(),
+            "priority": computed.priority.tolist(),
+            "row_hash": (row_hashes(df, self.rules.hash_key) if hashes is None else hashes).tolist(),
+        }
+        if "teacher_id" in df.columns:
+            columns["teacher_id"] = _teacher_ids(df)
+        # Always present, so an update from a shorter series clears stale extras
+        columns["extra_quizzes"] = pack_extra_quizzes(self.quizzes)
+        return columns
+
+
+@dataclass
+class PendingFrame:
+    """A chunk handed to the scoring pool by ScoredFrame.submit."""
+    df: pd.DataFrame
+    quizzes: np.ndarray
+    pending: PendingScore
+
+    def result(self) -> ScoredFrame:
+        try:
+            computed = self.pending.result()
+        except ValueError as e:
+            raise IngestError(f"Invalid CSV: {str(e)}") from e
+        return ScoredFrame._scored(self.df, self.quizzes, computed, self.pending.rules)
+
+    def cancel(self) -> None:
+        self.pending.cancel()
+
+
+def score_frames(
+    frames: Iterable[pd.DataFrame],
+    rules: CompiledRules = DEFAULT_RULES,
+    min_rows: Optional[int] = None,
+) -> Iterator[ScoredFrame]:
+    """Validate and score each frame, in order.
+
+    Frames are scored in-process until the upload reaches `min_rows` rows
+    (SCORING_PARALLEL_MIN_ROWS by default), so smaller uploads never start the
+    pool; a frame of that size on its own is split across the pool. Past the
+    threshold, smaller chunks of a stream are scored one chunk ahead: chunk
+    N+1 is parsed and handed to a pool worker before chunk N is yielded, so
+    its scoring overlaps the caller writing chunk N. At most three chunks are
+    held at a time.
+    """
+    min_rows = settings.SCORING_PARALLEL_MIN_ROWS if min_rows is None else min_rows
+    pending: deque[PendingFrame] = deque()
+    rows = 0
+    try:
+        for df in frames:
+            validate_columns(df)
+            rows += len(df)
+            if rows >= min_rows and len(df) < min_rows:
+                pending.append(ScoredFrame.submit(df, rules))
+                if len(pending) > 1:
+                    yield pending.popleft().result()
+                continue
+            while pending:
+                yield pending.popleft().result()
+            yield ScoredFrame.score(df, rules)
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        # An error or an abandoned upload leaves chunks in the pool
+        for frame in pending:
+            frame.cancel()
+
+
+def _select(columns: dict[str, list], mask: np.ndarray) -> dict[str, list]:
+    idx = np.flatnonzero(mask).tolist()
+    return {name: [col[i] for i in idx] for name, col in columns.items()}
+
+
+class UploadAccumulator:
+    """Running upload totals, merged chunk by chunk."""
+
+    def __init__(self, heatmap_limit: Optional[int] = None, rules: CompiledRules = DEFAULT_RULES):
+        self.heatmap_limit = heatmap_limit
+        self.rules = rules
+        self.summary = SummaryData()
+        self.top_risks: list[TopRisk] = []
+        self.heatmap_matrix: list[list] = []
+
+    @property
+    def total(self) -> int:
+        return self.summary.total
+
+    def add(self, scored: ScoredFrame) -> None:
+        df, computed = scored.df, scored.computed
+        levels = computed.risk_level
+        self.summary.add_rows(scored.subjects, levels, float(scored.quiz_avg.sum()))
+
+        room = TOP_RISKS_LIMIT - len(self.top_risks)
+        if room > 0:
+            self.top_risks.extend(
+                TopRisk(
+                    student_id=scored.student_ids[i],
+                    subject=scored.subjects[i],
+                    risk=levels[i],
+                    reason=computed.reason[i],
+                )
+                for i in np.flatnonzero(levels == "HIGH")[:room]
+            )
+
+        room = len(df) if self.heatmap_limit is None else self.heatmap_limit - len(self.heatmap_matrix)
+        if room > 0:
+            self.heatmap_matrix.extend(
+                list(row)
+                for row in zip(
+                    df["student_id"].iloc[:room].tolist(),
+                    df["subject"].iloc[:room].tolist(),
+                    levels[:room].tolist(),
+                    computed.xp_score[:room].tolist(),
+                    computed.health_score[:room].tolist(),
+                )
+            )
+
+    def build(
+        self,
+        college_id: str,
+        summary: Optional[SummaryData] = None,
+        changes: Optional[IngestChanges] = None,
+    ) -> UploadResponse:
+        data = summary or self.summary
+        upload_summary = UploadSummary(
+            total_students=data.total,
+            high_risk=data.high,
+            medium_risk=data.medium,
+            low_risk=data.low,
+            # Crisis subjects: HIGH share above the college's crisis_share (30% by default)
+            crisis_subjects=crisis_subjects_from_counts(
+                {s: (sum(c), c[0]) for s, c in data.subjects.items()}, self.rules.crisis_share
+            ),
+        )
+        # The heatmap holds a row per student, built here from engine arrays with known
+        # types; validating it again would copy every row, so only the outer model skips it
+        return UploadResponse.model_construct(
+            success=True,
+            college_id=college_id,
+            summary=upload_summary,
+            heatmap_matrix=self.heatmap_matrix,
+            top_risks=self.top_risks,
+            changes=changes,
+        )
+
+
+def ingest_frames(
+    db: Session,
+    college_id: str,
+    frames: Iterable[pd.DataFrame],
+    heatmap_limit: Optional[int] = None,
+    progress: Optional[Callable[[str, int], None]] = None,
+    mode: str = "replace",
+    upload_key: Optional[str] = None,
+) -> UploadResponse:
+    """Write the scored rows of `frames` for a college using `mode` (see INGEST_MODES).
+
+    Each frame is validated, scored and written before the next is read.
+    Nothing becomes visible to readers until the upload completes, so a parse
+    error part-way through leaves the previous data in place. Uploads of one
+    college run one at a time under its write lease; this one waits for any
+    in progress, raising app.db.datasets.CollegeBusy if that takes too long.
+    `progress(phase, rows)` is called as the pipeline moves between phases.
+    `upload_key` is recorded with the response for
+    app.db.uploads.identical_upload.
+    """
+    if mode not in INGEST_MODES:
+        raise IngestError(f"Unknown ingest mode: {mode}")
+    progress = progress or (lambda phase, rows: None)
+    try:
+        with college_write_lease(db, college_id) as lease:
+            def report(phase: str, rows: int) -> None:
+                lease.renew()
+                progress(phase, rows)
+
+            try:
+                if mode == "incremental":
+                    response = _ingest_incremental(db, college_id, frames, heatmap_limit, report)
+                else:
+                    response = _ingest_replace(db, college_id, frames, heatmap_limit, report)
+                bump_data_version(db, college_id)
+                # An incremental heatmap lists only the rows it wrote, which cannot be rebuilt later
+                replayable = mode == "replace" or not response.heatmap_matrix
+                record_upload(db, college_id, upload_key if replayable else None, response)
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+    finally:
+        # Release the parser while the caller's file is still open
+        close = getattr(frames, "close", None)
+        if close is not None:
+            close()
+    if mode == "replace":
+        schedule_garbage_collection(college_id)
+    # Load the published rows into column_store now, so the first analytics or
+    # what-if read after an upload does not pay for it
+    if column_store.max_bytes:
+        college_columns(db, college_id)
+    return response
+
+
+def _ingest_replace(db, college_id, frames, heatmap_limit, report) -> UploadResponse:
+    rules = college_rules(db, college_id)
+    acc = UploadAccumulator(heatmap_limit=heatmap_limit, rules=rules)
+    version = allocate_version(db, college_id)
+    try:
+        report("parsing", 0)
+        # Streamed chunks are scored in the pool while the previous chunk is written
+        for scored in score_frames(frames, rules):
+            report("writing", acc.total)
+            bulk_insert_risks(db, college_id, scored.columns(), dataset_version=version)
+            # Staged rows are invisible to readers, so each chunk commits on its own
+            # instead of holding the write lock for the whole file
+            db.commit()
+            acc.add(scored)
+            report("scoring", acc.total)
+
+        # Publish: the version switch and its summary land in one small transaction
+        report("publishing", acc.total)
+        if not publish_version(db, college_id, version):
+            raise IngestError("A newer upload for this college was published first")
+        write_summary(db, college_id, acc.summary)
+        record_snapshot(db, college_id, acc.summary)
+    except Exception:
+        db.rollback()
+        # Still under the write lease: nothing else can be using the staging version
+        discard_version(db, college_id, version)
+        raise
+    return acc.build(college_id)
+
+
+def _ingest_incremental(db, college_id, frames, heatmap_limit, report) -> UploadResponse:
+    # (student_id, subject) -> (id, row_hash, subject, risk_level, quiz average) of the stored row
+    # Applied in place to the published version, in a single transaction
+    version = active_version(db, college_id)
+    stored = {}
+    duplicate_ids = []
+    for row_id, student_id, subject, row_hash, risk_level, quiz_avg in (
+        db.query(
+            Risk.id, Risk.student_id, Risk.subject, Risk.row_hash, Risk.risk_level,
+            Risk.quiz_avg,
+        )
+        .filter(Risk.college_id == college_id, Risk.dataset_version == version)
+        .order_by(Risk.id)
+    ):
+        if (student_id, subject) in stored:
+            duplicate_ids.append(row_id)
+        else:
+            stored[(student_id, subject)] = (row_id, row_hash, subject, risk_level, quiz_avg or 0.0)
+
+    # Read (or aggregate) the current summary before writing anything; it is adjusted by deltas
+    summary = (read_summary(db, college_id) or compute_summary(db, college_id)) if stored else SummaryData()
+    rules = college_rules(db, college_id)
+    acc = UploadAccumulator(heatmap_limit=heatmap_limit, rules=rules)
+    changes = IngestChanges()
+    removed = SummaryData()  # contributions of stored rows that were updated or deleted
+    seen = set()
+
+    report("parsing", 0)
+    for df in frames:
+        validate_columns(df)
+        keys = list(zip(df["student_id"].astype(str), df["subject"].astype(str)))
+        if len(set(keys)) != len(keys) or not seen.isdisjoint(keys):
+            raise IngestError("Duplicate (student_id, subject) rows are not allowed in incremental mode")
+        seen.update(keys)
+
+        report("scoring", len(seen) - len(keys))
+        hashes = row_hashes(df, rules.hash_key)
+        matches = [stored.get(key) for key in keys]
+        is_new = np.array([m is None for m in matches], dtype=bool)
+        is_changed = np.array([m is not None and m[1] != h for m, h in zip(matches, hashes)], dtype=bool)
+        write = is_new | is_changed
+        changes.inserted += int(is_new.sum())
+        changes.updated += int(is_changed.sum())
+        changes.unchanged += len(keys) - int(write.sum())
+
+        if write.any():
+            scored = ScoredFrame.score(df[write], rules)
+            columns = scored.columns(hashes[write])
+            report("writing", len(seen) - len(keys))
+            bulk_insert_risks(db, college_id, _select(columns, is_new[write]), dataset_version=version)
+            updates = _select(columns, is_changed[write])
+            changed = [matches[i] for i in np.flatnonzero(is_changed)]
+            bulk_update_risks(
+                db,
+                [dict(zip(updates, values), id=m[0]) for m, values in zip(changed, zip(*updates.values()))],
+            )
+            removed.add_rows([m[2] for m in changed], [m[3] for m in changed], sum(m[4] for m in changed))
+            acc.add(scored)
+        report("parsing", len(seen))
+
+    report("committing", len(seen))
+    gone = [m for key, m in stored.items() if key not in seen]
+    bulk_delete_risks(db, [m[0] for m in gone] + duplicate_ids)
+    changes.deleted = len(gone) + len(duplicate_ids)
+
+    if duplicate_ids:
+        # Duplicates left by earlier replace uploads: re-aggregate rather than track them
+        db.flush()
+        summary = compute_summary(db, college_id)
+    else:
+        removed.add_rows([m[2] for m in gone], [m[3] for m in gone], sum(m[4] for m in gone))
+        summary.merge(removed, sign=-1)
+        summary.merge(acc.summary)
+    write_summary(db, college_id, summary)
+    record_snapshot(db, college_id, summary)
+    return acc.build(college_id, summary=summary, changes=changes)
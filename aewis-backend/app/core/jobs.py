@@ -0,0 +1,91 @@
+"""
+In-process background jobs for long-running uploads.
+Jobs run on a bounded thread pool and report progress that the API can poll.
+"""
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+from app.config import settings
+
+
+@dataclass
+class Job:
+    id: str
+    college_id: str
+    phase: str = "queued"  # queued, parsing, scoring, writing, committing/publishing, done, failed
+    rows_processed: int = 0
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    error: Optional[str] = None
+    result: Any = None
+
+    @property
+    def elapsed(self) -> float:
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.time()) - self.started_at
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows_processed / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def finished(self) -> bool:
+        return self.phase in ("done", "failed")
+
+    def update(self, phase: str, rows_processed: int) -> None:
+        self.phase = phase
+        self.rows_processed = rows_processed
+
+
+class JobManager:
+    """Runs jobs on a thread pool of `max_workers` and keeps them for polling."""
+
+    def __init__(self, max_workers: int, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="aewis-job")
+        self._jobs: dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, college_id: str, fn: Callable[[Job], Any]) -> Job:
+        job = Job(id=uuid.uuid4().hex, college_id=college_id)
+        with self._lock:
+            self._prune()
+            self._jobs[job.id] = job
+        self._executor.submit(self._run, job, fn)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            self._prune()
+            return self._jobs.get(job_id)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, job: Job, fn: Callable[[Job], Any]) -> None:
+        job.started_at = time.time()
+        try:
+            job.result = fn(job)
+            job.phase = "done"
+        except Exception as e:
+            job.error = str(e)
+            job.phase = "failed"
+        finally:
+            job.finished_at = time.time()
+
+    def _prune(self) -> None:
+        cutoff = time.time() - self.ttl_seconds
+        for job_id in [j.id for j in self._jobs.values() if j.finished and j.finished_at < cutoff]:
+            del self._jobs[job_id]
+
+
+upload_jobs = JobManager(
+    max_workers=settings.UPLOAD_MAX_CONCURRENT_JOBS,
+    ttl_seconds=settings.UPLOAD_JOB_TTL_SECONDS,
+)
@@ -0,0 +1,270 @@
+"""
+Process-pool scoring for multi-million-row uploads.
+
+Batch scoring is vectorized but runs on one core. From SCORING_PARALLEL_MIN_ROWS
+rows on, compute_risk_series copies the quiz matrix and attendance once into
+a shared-memory segment; each worker scores a contiguous slice of rows and
+writes its level/reason codes and metrics into output arrays in the same
+segment, so neither DataFrames nor results are pickled and rows come back in
+input order. Smaller inputs, a single-CPU host or SCORING_PROCESSES=1 stay on
+the in-process path, as does any input if the pool breaks.
+
+Streamed uploads arrive as many chunks well below that threshold. Once an
+upload has passed it, submit_risk_series hands each further chunk to one
+worker through its own segment and returns at once, so the upload scores
+the next chunk while it writes the current one.
+"""
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from functools import lru_cache
+from multiprocessing import shared_memory
+from typing import Optional
+
+import numpy as np
+
+from app.config import settings
+from app.core.risk_engine import DEFAULT_RULES, CompiledRules, RiskBatch, compile_rules
+from app.models.risk import RuleSetConfig
+
+logger = logging.getLogger(__name__)
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_size = 0
+_pool_lock = threading.Lock()
+
+
+def scoring_processes() -> int:
+    return settings.SCORING_PROCESSES or os.cpu_count() or 1
+
+
+def _get_pool(processes: int) -> ProcessPoolExecutor:
+    global _pool, _pool_size
+    with _pool_lock:
+        if _pool is None or _pool_size != processes:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            # spawn, not fork: the app process has threads (server, upload jobs)
+            _pool = ProcessPoolExecutor(processes, mp_context=multiprocessing.get_context("spawn"))
+            _pool_size = processes
+        return _pool
+
+
+def shutdown_pool() -> None:
+    global _pool, _pool_size
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+        _pool, _pool_size = None, 0
+
+
+@dataclass(frozen=True)
+class SharedLayout:
+    """Named arrays packed into one shared-memory segment; small enough to pickle per task."""
+    name: str
+    arrays: tuple[tuple[str, tuple[int, ...], str, int], ...]  # (array, shape, dtype, offset)
+
+    def views(self, buf) -> dict[str, np.ndarray]:
+        return {
+            key: np.ndarray(shape, dtype=np.dtype(dtype), buffer=buf, offset=offset)
+            for key, shape, dtype, offset in self.arrays
+        }
+
+
+def _allocate(specs: dict[str, tuple[tuple[int, ...], np.dtype]]) -> tuple[shared_memory.SharedMemory, SharedLayout]:
+    arrays, offset = [], 0
+    for key, (shape, dtype) in specs.items():
+        dtype = np.dtype(dtype)
+        offset = -(-offset // 8) * 8  # keep every array 8-byte aligned
+        arrays.append((key, shape, dtype.str, offset))
+        offset += int(np.prod(shape)) * dtype.itemsize
+    shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+    return shm, SharedLayout(shm.name, tuple(arrays))
+
+
+@lru_cache(maxsize=32)
+def _worker_rules(config_json: Optional[str]) -> CompiledRules:
+    if config_json is None:
+        return DEFAULT_RULES
+    return compile_rules(RuleSetConfig.model_validate_json(config_json))
+
+
+def _score_slice(layout: SharedLayout, start: int, stop: int, config_json: Optional[str]) -> None:
+    """Worker: score rows [start, stop) in place."""
+    shm = shared_memory.SharedMemory(name=layout.name)
+    try:
+        arrays = layout.views(shm.buf)
+        rows = slice(start, stop)
+        level, code, avg, decline = _worker_rules(config_json).codes(arrays["quizzes"][rows], arrays["attendance"][rows])
+        arrays["level"][rows] = level
+        arrays["code"][rows] = code
+        arrays["avg_score"][rows] = avg
+        arrays["decline_pct"][rows] = decline
+        del arrays  # views must be released before the segment is closed
+    finally:
+        shm.close()
+
+
+def _config_json(rules: CompiledRules) -> Optional[str]:
+    return None if rules is DEFAULT_RULES else rules.config.model_dump_json()
+
+
+def _share_inputs(quizzes: np.ndarray, attendance: np.ndarray) -> tuple[shared_memory.SharedMemory, SharedLayout]:
+    """A segment holding the inputs and room for the worker outputs of every row."""
+    rows = len(quizzes)
+    shm, layout = _allocate({
+        "quizzes": (quizzes.shape, np.float64),
+        "attendance": ((rows,), np.float64),
+        "level": ((rows,), np.int8),
+        "code": ((rows,), np.int16),
+        "avg_score": ((rows,), np.float64),
+        "decline_pct": ((rows,), np.float64),
+    })
+    try:
+        arrays = layout.views(shm.buf)
+        arrays["quizzes"][:] = quizzes
+        arrays["attendance"][:] = attendance
+        del arrays
+    except BaseException:
+        _release(shm)
+        raise
+    return shm, layout
+
+
+def _collect(shm: shared_memory.SharedMemory, layout: SharedLayout, rules: CompiledRules, attendance: np.ndarray) -> RiskBatch:
+    """Copy the worker outputs out of the segment before it is released."""
+    arrays = layout.views(shm.buf)
+    level, code, avg, decline = (arrays[k].copy() for k in ("level", "code", "avg_score", "decline_pct"))
+    del arrays
+    return rules.batch(level, code, avg, decline, attendance)
+
+
+def _release(shm: shared_memory.SharedMemory) -> None:
+    shm.close()
+    shm.unlink()
+
+
+def _score_pooled(quizzes: np.ndarray, attendance: np.ndarray, rules: CompiledRules, processes: int) -> RiskBatch:
+    rows = len(quizzes)
+    shm, layout = _share_inputs(quizzes, attendance)
+    try:
+        config_json = _config_json(rules)
+        bounds = np.linspace(0, rows, processes + 1, dtype=np.int64).tolist()
+        pool = _get_pool(processes)
+        futures = [
+            pool.submit(_score_slice, layout, start, stop, config_json)
+            for start, stop in zip(bounds, bounds[1:])
+            if stop > start
+        ]
+        for future in futures:
+            future.result()
+        return _collect(shm, layout, rules, attendance)
+    finally:
+        _release(shm)
+
+
+def compute_risk_series(
+    quizzes,
+    attendance,
+    rules: Optional[CompiledRules] = None,
+    processes: Optional[int] = None,
+    min_rows: Optional[int] = None,
+) -> RiskBatch:
+    """risk_engine.compute_risk_series, split across the scoring pool for large inputs.
+
+    `processes` and `min_rows` default to SCORING_PROCESSES and
+    SCORING_PARALLEL_MIN_ROWS; results are identical either way.
+    """
+    rules = rules or DEFAULT_RULES
+    quizzes = np.atleast_2d(np.asarray(quizzes, dtype=np.float64))
+    attendance = np.asarray(attendance, dtype=np.float64)
+    processes = processes or scoring_processes()
+    min_rows = settings.SCORING_PARALLEL_MIN_ROWS if min_rows is None else min_rows
+    if processes < 2 or len(quizzes) < max(min_rows, processes):
+        return rules.score(quizzes, attendance)
+    if np.isnan(quizzes).any():
+        raise ValueError("quiz scores must not be NaN")
+    try:
+        return _score_pooled(quizzes, attendance, rules, processes)
+    except BrokenProcessPool:
+        logger.warning("Scoring pool failed; scoring %d rows in-process", len(quizzes), exc_info=True)
+        shutdown_pool()
+        return rules.score(quizzes, attendance)
+
+
+class PendingScore:
+    """A chunk's risk scores, possibly still being computed by a pool worker.
+
+    A pooled chunk owns its shared-memory segment until result() or cancel().
+    """
+
+    def __init__(self, quizzes: np.ndarray, attendance: np.ndarray, rules: CompiledRules, pooled=None):
+        self.quizzes = quizzes
+        self.attendance = attendance
+        self.rules = rules
+        self._pooled = pooled  # (future, segment, layout)
+        self._batch: Optional[RiskBatch] = None if pooled is not None else rules.score(quizzes, attendance)
+
+    def result(self) -> RiskBatch:
+        """Wait for the scores; raises ValueError for invalid input like compute_risk_series."""
+        if self._batch is None:
+            future, shm, layout = self._pooled
+            try:
+                future.result()
+            except BrokenProcessPool:
+                logger.warning("Scoring pool failed; scoring %d rows in-process", len(self.quizzes), exc_info=True)
+                shutdown_pool()
+                self._batch = self.rules.score(self.quizzes, self.attendance)
+            else:
+                self._batch = _collect(shm, layout, self.rules, self.attendance)
+            finally:
+                self._pooled = None
+                _release(shm)
+        return self._batch
+
+    def cancel(self) -> None:
+        """Give up on a chunk whose scores are no longer needed, releasing its segment."""
+        if self._pooled is not None:
+            future, shm, _ = self._pooled
+            self._pooled = None
+            future.cancel()
+            # A worker still attached keeps its own mapping until it finishes
+            _release(shm)
+
+
+def submit_risk_series(
+    quizzes,
+    attendance,
+    rules: Optional[CompiledRules] = None,
+    processes: Optional[int] = None,
+) -> PendingScore:
+    """Start scoring one chunk in the pool without waiting for it.
+
+    The chunk is copied into a shared-memory segment that one worker scores in
+    place. With fewer than two scoring processes it is scored in-process
+    before returning. Either way PendingScore.result() matches
+    risk_engine.compute_risk_series.
+    """
+    rules = rules or DEFAULT_RULES
+    quizzes = np.atleast_2d(np.asarray(quizzes, dtype=np.float64))
+    attendance = np.asarray(attendance, dtype=np.float64)
+    processes = processes or scoring_processes()
+    if processes < 2:
+        return PendingScore(quizzes, attendance, rules)
+    if np.isnan(quizzes).any():
+        raise ValueError("quiz scores must not be NaN")
+    shm, layout = _share_inputs(quizzes, attendance)
+    try:
+        future = _get_pool(processes).submit(_score_slice, layout, 0, len(quizzes), _config_json(rules))
+    except BrokenProcessPool:
+        _release(shm)
+        shutdown_pool()
+        return PendingScore(quizzes, attendance, rules)
+    except BaseException:
+        _release(shm)
+        raise
+    return PendingScore(quizzes, attendance, rules, (future, shm, layout))
@@ -1,5 +1,10 @@
+import hashlib
 from enum import Enum
-from app.models.risk import RiskModel
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+from app.models.risk import RiskModel, RiskRule, RuleSetConfig
 
 
 class RiskLevelEnum(str, Enum):
@@ -8,7 +13,58 @@ class RiskLevelEnum(str, Enum):
     LOW = "LOW"
 
 
-def compute_risk(row: dict) -> RiskModel:
+ATTENDANCE_THRESHOLD = 75
+DECLINE_THRESHOLD = 15
+AVERAGE_THRESHOLD = 40
+CRISIS_HIGH_SHARE = 0.30
+
+RISK_LEVELS = (RiskLevelEnum.HIGH.value, RiskLevelEnum.MEDIUM.value, RiskLevelEnum.LOW.value)
+LEVELS = np.array(RISK_LEVELS, dtype=object)
+
+# The rules compute_risk hardcodes, as data; colleges without their own rule set use these
+DEFAULT_RULE_SET = RuleSetConfig(
+    rules=[
+        RiskRule(name="Attendance", metric="attendance", op="<", value=ATTENDANCE_THRESHOLD),
+        RiskRule(name="Decline", metric="decline_pct", op=">", value=DECLINE_THRESHOLD),
+        RiskRule(name="Average", metric="avg_score", op="<", value=AVERAGE_THRESHOLD),
+    ],
+    high_at=2,
+    medium_at=1,
+    crisis_share=CRISIS_HIGH_SHARE,
+)
+_OPS = {"<": np.less, "<=": np.less_equal, ">": np.greater, ">=": np.greater_equal}
+# SimulationThresholds field -> rule metric it overrides
+_OVERRIDE_METRICS = {"attendance": "attendance", "decline": "decline_pct", "average": "avg_score"}
+
+
+class RiskBatch(NamedTuple):
+    risk_level: np.ndarray
+    reason: np.ndarray
+    xp_score: np.ndarray
+    health_score: np.ndarray
+    priority: np.ndarray
+    quiz_avg: np.ndarray
+
+
+class RiskResult(NamedTuple):
+    """One row's scores: a plain tuple, no validation; RiskModel is built only for responses."""
+    risk_level: str
+    reason: str
+    xp_score: int
+    health_score: int
+    priority: float = 0.0
+
+    def to_model(self) -> RiskModel:
+        return RiskModel(**self._asdict())
+
+
+class SeriesStats(NamedTuple):
+    avg_score: np.ndarray
+    slope: np.ndarray  # least-squares points per assessment
+    decline_pct: np.ndarray
+
+
+def compute_risk(row: dict) -> RiskResult:
     quiz1 = float(row.get("quiz1", 0))
     quiz2 = float(row.get("quiz2", 0))
     quiz3 = float(row.get("quiz3", 0))
@@ -22,11 +78,11 @@ def compute_risk(row: dict) -> RiskModel:
     )
 
     reasons = []
-    if attendance < 75:
+    if attendance < ATTENDANCE_THRESHOLD:
         reasons.append("Attendance")
-    if decline_pct > 15:
+    if decline_pct > DECLINE_THRESHOLD:
         reasons.append("Decline")
-    if avg_score < 40:
+    if avg_score < AVERAGE_THRESHOLD:
         reasons.append("Average")
 
     if len(reasons) >= 2:
@@ -38,10 +94,205 @@ def compute_risk(row: dict) -> RiskModel:
 
     xp_score = int(avg_score * 10)
     health_score = min(100, max(0, int(avg_score)))
+    # Same worklist priority as CompiledRules.batch
+    priority = round(
+        (2 - RISK_LEVELS.index(risk_level)) * 1000.0
+        + min(max(decline_pct, 0), 100) * 5
+        + min(max(100 - attendance, 0), 100) * 4,
+        2,
+    )
 
-    return RiskModel(
+    return RiskResult(
         risk_level=risk_level,
         reason="+".join(reasons) if reasons else "OK",
         xp_score=xp_score,
         health_score=health_score,
+        priority=priority,
     )
+
+
+def trend_weights(n: int) -> np.ndarray:
+    """w with quizzes @ w == least-squares slope over assessments 0..n-1.
+
+    The weights sum to zero, so the mean never has to be subtracted; for three
+    quizzes they are exactly [-0.5, 0, 0.5].
+    """
+    x = np.arange(n, dtype=np.float64)
+    centered = x - (n - 1) / 2
+    sxx = float((centered ** 2).sum())
+    return centered / sxx if sxx else np.zeros(n)
+
+
+def _column_sum(block: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """block @ weights, accumulated one column at a time.
+
+    Element-wise passes in a fixed order give every row the same bits however
+    the rows are chunked or aligned; BLAS matmul does not, which would let a
+    threshold decision depend on upload chunking or the scoring pool.
+    """
+    total = block[:, 0] * weights[0]
+    for j in range(1, block.shape[1]):
+        total += block[:, j] * weights[j]
+    return total
+
+
+def series_stats(quizzes) -> SeriesStats:
+    """Average, trend slope and decline per row of a (rows, assessments) score matrix.
+
+    Decline is the fitted drop across the series as a percentage of the first
+    score (0 where it is <= 0); with three quizzes that is (quiz1 - quiz3) / quiz1.
+    Rows shorter than the matrix are NaN-padded on the right and evaluated
+    with their own length.
+    """
+    quizzes = np.atleast_2d(np.asarray(quizzes, dtype=np.float64))
+    rows, width = quizzes.shape
+    lengths = (~np.isnan(quizzes)).sum(axis=1)
+    avg = np.zeros(rows)
+    slope = np.zeros(rows)
+    decline = np.zeros(rows)
+    # One matrix operation per distinct series length (uploads have a single one)
+    uniform = bool((lengths == width).all())
+    for n in [width] if uniform else np.unique(lengths).tolist():
+        if n == 0:
+            continue
+        rows_n = slice(None) if uniform else lengths == n
+        block = quizzes[rows_n, :n]
+        avg[rows_n] = _column_sum(block, np.ones(n)) / n
+        slope_n = _column_sum(block, trend_weights(n))
+        slope[rows_n] = slope_n
+        first = block[:, 0]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            decline[rows_n] = np.where(first > 0, -slope_n * (n - 1) / first * 100, 0.0)
+    return SeriesStats(avg, slope, decline)
+
+
+class CompiledRules:
+    """A RuleSetConfig compiled to array operations over whole columns."""
+
+    def __init__(self, config: RuleSetConfig):
+        self.config = config
+        self.crisis_share = config.crisis_share
+        self._tests = [(rule.metric, _OPS[rule.op], rule.value, rule.weight) for rule in config.rules]
+        # Tripped rules are packed into a bit code (rule i = bit i), so reasons
+        # map to strings with a single table lookup
+        names = [rule.name for rule in config.rules]
+        self.reasons = np.array(
+            ["+".join(n for bit, n in enumerate(names) if code >> bit & 1) or "OK" for code in range(1 << len(names))],
+            dtype=object,
+        )
+        # Keys row_hashes, so incremental uploads re-score rows stored under other rules
+        self.hash_key = (
+            None if config == DEFAULT_RULE_SET
+            else hashlib.sha256(config.model_dump_json().encode()).hexdigest()[:16]
+        )
+
+    def classify(self, avg_score, decline_pct, attendance) -> tuple[np.ndarray, np.ndarray]:
+        """Per row: index into RISK_LEVELS (0 HIGH, 1 MEDIUM, 2 LOW) and reason code."""
+        metrics = {
+            "avg_score": np.asarray(avg_score, dtype=np.float64),
+            "decline_pct": np.asarray(decline_pct, dtype=np.float64),
+            "attendance": np.asarray(attendance, dtype=np.float64),
+        }
+        shape = metrics["avg_score"].shape
+        score = np.zeros(shape)
+        code = np.zeros(shape, dtype=np.int16)
+        for bit, (metric, op, value, weight) in enumerate(self._tests):
+            flag = op(metrics[metric], value)
+            score += flag * weight
+            code |= flag.astype(np.int16) << bit
+        level = np.where(score >= self.config.high_at, 0, np.where(score >= self.config.medium_at, 1, 2))
+        return level.astype(np.int8), code
+
+    def score(self, quizzes, attendance) -> RiskBatch:
+        """Score a (rows, assessments) quiz matrix; cost is linear in its size."""
+        att = np.asarray(attendance, dtype=np.float64)
+        return self.batch(*self.codes(quizzes, att), att)
+
+    def codes(self, quizzes, attendance) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """The numeric part of score: level code, reason code, avg_score and decline_pct per row."""
+        quizzes = np.atleast_2d(np.asarray(quizzes, dtype=np.float64))
+        if np.isnan(quizzes).any():
+            raise ValueError("quiz scores must not be NaN")
+        avg_score, _, decline_pct = series_stats(quizzes)
+        level, code = self.classify(avg_score, decline_pct, attendance)
+        return level, code, avg_score, decline_pct
+
+    def batch(self, level, code, avg_score, decline_pct, attendance) -> RiskBatch:
+        """Assemble a RiskBatch from the output of codes()."""
+        att = np.asarray(attendance, dtype=np.float64)
+        # Worklist priority: severity dominates, then decline and attendance shortfall,
+        # each bounded so together they never lift a row into the next severity band.
+        priority = (
+            (2 - level) * 1000.0
+            + np.clip(decline_pct, 0, 100) * 5
+            + np.clip(100 - att, 0, 100) * 4
+        ).round(2)
+
+        return RiskBatch(
+            risk_level=LEVELS[level],
+            reason=self.reasons[code],
+            xp_score=np.trunc(avg_score * 10).astype(np.int64),
+            health_score=np.clip(np.trunc(avg_score), 0, 100).astype(np.int64),
+            priority=priority,
+            quiz_avg=avg_score,
+        )
+
+    def with_overrides(self, crisis_share: Optional[float] = None, **values: Optional[float]) -> "CompiledRules":
+        """A copy whose attendance/decline/average rules use the given values."""
+        metric_values = {_OVERRIDE_METRICS[k]: v for k, v in values.items() if v is not None}
+        if not metric_values and crisis_share is None:
+            return self
+        rules = [
+            rule.model_copy(update={"value": metric_values[rule.metric]}) if rule.metric in metric_values else rule
+            for rule in self.config.rules
+        ]
+        update = {"rules": rules}
+        if crisis_share is not None:
+            update["crisis_share"] = crisis_share
+        return compile_rules(self.config.model_copy(update=update))
+
+
+def compile_rules(config: RuleSetConfig) -> CompiledRules:
+    return CompiledRules(config)
+
+
+DEFAULT_RULES = compile_rules(DEFAULT_RULE_SET)
+
+
+def compute_risk_batch(quiz1, quiz2, quiz3, attendance, rules: Optional[CompiledRules] = None) -> RiskBatch:
+    """Vectorized compute_risk over whole columns; row i matches compute_risk(row i)
+    under the default rules, or scores with a college's `rules`."""
+    quizzes = np.column_stack([np.asarray(q, dtype=np.float64) for q in (quiz1, quiz2, quiz3)])
+    return compute_risk_series(quizzes, attendance, rules)
+
+
+def compute_risk_series(quizzes, attendance, rules: Optional[CompiledRules] = None) -> RiskBatch:
+    """compute_risk_batch for any number of assessments, given as a (rows, assessments) matrix."""
+    return (rules or DEFAULT_RULES).score(quizzes, attendance)
+
+
+def subject_level_counts(subject, risk_level) -> dict[str, tuple[int, int, int]]:
+    """Per-subject (HIGH, MEDIUM, LOW) row counts in one grouped pass."""
+    subject = np.asarray(subject)
+    if subject.size == 0:
+        return {}
+    names, inverse = np.unique(subject.astype(str), return_inverse=True)
+    level_code = np.full(subject.shape, 2, dtype=np.int64)
+    level_code[np.asarray(risk_level) == RiskLevelEnum.MEDIUM.value] = 1
+    level_code[np.asarray(risk_level) == RiskLevelEnum.HIGH.value] = 0
+    counts = np.bincount(inverse * 3 + level_code, minlength=len(names) * 3).reshape(-1, 3)
+    return {str(s): tuple(int(c) for c in row) for s, row in zip(names, counts)}
+
+
+def subject_risk_counts(subject, risk_level) -> dict[str, tuple[int, int]]:
+    """Per-subject (total rows, HIGH rows)."""
+    return {s: (sum(c), c[0]) for s, c in subject_level_counts(subject, risk_level).items()}
+
+
+def crisis_subjects_from_counts(counts: dict[str, tuple[int, int]], threshold: float = CRISIS_HIGH_SHARE) -> list[str]:
+    return sorted(s for s, (total, high) in counts.items() if total > 0 and high / total > threshold)
+
+
+def crisis_subjects(subject, risk_level, threshold: float = CRISIS_HIGH_SHARE) -> list[str]:
+    """Subjects whose share of HIGH-risk rows exceeds `threshold`, sorted by name."""
+    return crisis_subjects_from_counts(subject_risk_counts(subject, risk_level), threshold)
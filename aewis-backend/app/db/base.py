@@ -1,5 +1,5 @@
 from datetime import datetime, timezone
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, Index, JSON, LargeBinary
 from sqlalchemy.orm import declarative_base
 
 Base = declarative_base()
@@ -14,13 +14,27 @@ class Risk(Base):
     quiz1 = Column(Float)
     quiz2 = Column(Float)
     quiz3 = Column(Float)
+    extra_quizzes = Column(LargeBinary, nullable=True)  # quiz4..quizN as packed float64, see app/db/bulk.py
+    quiz_avg = Column(Float)  # over the full quiz series
     attendance = Column(Float)
     risk_level = Column(String(16))  # HIGH, MEDIUM, LOW
     xp_score = Column(Integer, default=0)
     reason = Column(String(256), nullable=True)
     teacher_id = Column(String(64), nullable=True)
+    priority = Column(Float, default=0.0)  # worklist rank, see compute_risk_batch
+    row_hash = Column(String(16), nullable=True)  # hash of the scored inputs, for incremental uploads
+    dataset_version = Column(Integer, default=0, nullable=False)  # see app/db/datasets.py
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
 
+    __table_args__ = (
+        # Readers always filter on (college_id, dataset_version) first
+        Index("ix_risks_college_version", college_id, dataset_version),
+        # Per-teacher lookups seek on the (college, version, teacher) prefix; the worklist
+        # additionally keyset-paginates on (priority DESC, id)
+        Index("ix_risks_worklist", college_id, dataset_version, teacher_id, priority.desc(), id),
+        Index("ix_risks_college_student_subject", college_id, dataset_version, student_id, subject),
+    )
+
 
 class Intervention(Base):
     __tablename__ = "interventions"
@@ -32,3 +46,73 @@ class Intervention(Base):
     success = Column(Boolean, default=False)
     xp_earned = Column(Integer, default=0)
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+
+
+class CollegeDataset(Base):
+    """Which risks dataset version is published for a college, and its data version."""
+    __tablename__ = "college_datasets"
+    college_id = Column(String(64), primary_key=True)
+    active_version = Column(Integer, default=0, nullable=False)
+    next_version = Column(Integer, default=1, nullable=False)
+    published_at = Column(DateTime, nullable=True)
+    data_version = Column(Integer, default=0, nullable=False)  # bumped by every write; keys caches
+    writer = Column(String(32), nullable=True)  # token of the upload holding the write lease
+    writer_expires = Column(DateTime, nullable=True)
+
+
+class CollegeRuleSet(Base):
+    """A college's risk rules as a RuleSetConfig document (see app/db/rules.py)."""
+    __tablename__ = "college_rule_sets"
+    college_id = Column(String(64), primary_key=True)
+    config = Column(JSON, nullable=False)
+    updated_at = Column(DateTime, nullable=False)
+
+
+class CollegeUpload(Base):
+    """The college's last successful upload, so an identical re-upload can be answered from it (see app/db/uploads.py)."""
+    __tablename__ = "college_uploads"
+    college_id = Column(String(64), primary_key=True)
+    upload_key = Column(String(64), nullable=False)  # content hash + upload parameters
+    data_version = Column(Integer, nullable=False)  # college_datasets.data_version the upload left behind
+    response = Column(LargeBinary, nullable=False)  # zlib-compressed UploadResponse JSON
+    uploaded_at = Column(DateTime, nullable=False)
+
+
+class RiskSnapshot(Base):
+    """Append-only risk counts recorded on every upload (see app/db/history.py)."""
+    __tablename__ = "risk_snapshots"
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    college_id = Column(String(64), nullable=False)
+    subject = Column(String(64), nullable=True)  # NULL: whole college
+    taken_at = Column(DateTime, nullable=False)
+    total = Column(Integer, default=0)
+    high = Column(Integer, default=0)
+    medium = Column(Integer, default=0)
+    low = Column(Integer, default=0)
+    health_score = Column(Float, nullable=True)  # college rows only
+
+    __table_args__ = (
+        Index("ix_risk_snapshots_series", college_id, subject, taken_at),
+    )
+
+
+class CollegeSummary(Base):
+    """Per-college risk totals, maintained by the write paths (see app/db/summary.py)."""
+    __tablename__ = "college_summaries"
+    college_id = Column(String(64), primary_key=True)
+    total = Column(Integer, default=0)
+    high = Column(Integer, default=0)
+    medium = Column(Integer, default=0)
+    low = Column(Integer, default=0)
+    quiz_avg_sum = Column(Float, default=0.0)  # sum of per-row quiz_avg
+    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+
+
+class SubjectSummary(Base):
+    __tablename__ = "subject_summaries"
+    college_id = Column(String(64), primary_key=True)
+    subject = Column(String(64), primary_key=True)
+    total = Column(Integer, default=0)
+    high = Column(Integer, default=0)
+    medium = Column(Integer, default=0)
+    low = Column(Integer, default=0)
@@ -0,0 +1,117 @@
+"""
+Bulk write path for scored rows.
+Sends column data to the risks table as executemany Core inserts in chunks,
+skipping ORM object construction and unit-of-work bookkeeping.
+"""
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Mapping, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import delete, insert, update
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.db.base import Risk
+
+logger = logging.getLogger(__name__)
+
+RISK_COLUMNS = (
+    "student_id",
+    "subject",
+    "quiz1",
+    "quiz2",
+    "quiz3",
+    "attendance",
+    "risk_level",
+    "xp_score",
+    "reason",
+    "priority",
+)
+OPTIONAL_COLUMNS = ("teacher_id", "row_hash", "quiz_avg", "extra_quizzes")
+# quiz1..quiz3 have their own columns; later assessments are packed into extra_quizzes
+STORED_QUIZ_COLUMNS = 3
+_PACKED = np.dtype("<f8")
+
+
+def pack_extra_quizzes(quizzes: np.ndarray) -> list:
+    """Per-row bytes of assessments 4..N of a (rows, N) matrix (None when N <= 3)."""
+    extra = np.ascontiguousarray(quizzes[:, STORED_QUIZ_COLUMNS:], dtype=_PACKED)
+    if extra.shape[1] == 0:
+        return [None] * len(quizzes)
+    return extra.view(np.dtype((np.void, extra.shape[1] * _PACKED.itemsize))).ravel().tolist()
+
+
+def unpack_quizzes(first: np.ndarray, extra: Sequence) -> np.ndarray:
+    """Rebuild the quiz matrix from quiz1..3 columns (rows, 3) and extra_quizzes blobs.
+
+    Rows with fewer assessments than the longest are NaN-padded on the right.
+    """
+    widths = np.array([len(b) // _PACKED.itemsize if b else 0 for b in extra], dtype=np.int64)
+    width = int(widths.max()) if len(widths) else 0
+    quizzes = np.full((len(first), STORED_QUIZ_COLUMNS + width), np.nan)
+    quizzes[:, :STORED_QUIZ_COLUMNS] = first
+    for w in np.unique(widths[widths > 0]).tolist():
+        rows = np.flatnonzero(widths == w)
+        packed = b"".join(extra[i] for i in rows.tolist())
+        quizzes[rows, STORED_QUIZ_COLUMNS:STORED_QUIZ_COLUMNS + w] = np.frombuffer(packed, _PACKED).reshape(-1, w)
+    return quizzes
+
+
+@dataclass
+class BulkInsertStats:
+    rows: int
+    seconds: float
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else float(self.rows)
+
+
+def bulk_insert_risks(
+    db: Session,
+    college_id: str,
+    columns: Mapping[str, Sequence],
+    chunk_size: Optional[int] = None,
+    dataset_version: int = 0,
+) -> BulkInsertStats:
+    """Insert scored rows given as parallel column sequences (keys: RISK_COLUMNS,
+    plus any of OPTIONAL_COLUMNS, which default to NULL).
+
+    Runs inside the session's transaction; the caller commits.
+    """
+    chunk_size = chunk_size or settings.BULK_INSERT_CHUNK_SIZE
+    start = time.perf_counter()
+    created_at = datetime.now(timezone.utc)
+    optional = tuple(name for name in OPTIONAL_COLUMNS if name in columns)
+    values = [list(columns[name]) for name in RISK_COLUMNS + optional]
+    keys = ("college_id", "dataset_version", "created_at") + RISK_COLUMNS + optional
+    total = len(values[0]) if values else 0
+    stmt = insert(Risk.__table__)
+
+    for offset in range(0, total, chunk_size):
+        chunk = zip(*(col[offset:offset + chunk_size] for col in values))
+        params = [dict(zip(keys, (college_id, dataset_version, created_at) + row)) for row in chunk]
+        db.execute(stmt, params)
+
+    stats = BulkInsertStats(rows=total, seconds=time.perf_counter() - start)
+    logger.info(
+        "Inserted %d risk rows for %s in %.3fs (%.0f rows/sec)",
+        stats.rows, college_id, stats.seconds, stats.rows_per_sec,
+    )
+    return stats
+
+
+def bulk_update_risks(db: Session, rows: Sequence[dict], chunk_size: Optional[int] = None) -> None:
+    """Update risks by primary key; each dict carries `id` plus the columns to set."""
+    chunk_size = chunk_size or settings.BULK_INSERT_CHUNK_SIZE
+    for offset in range(0, len(rows), chunk_size):
+        db.execute(update(Risk), list(rows[offset:offset + chunk_size]))
+
+
+def bulk_delete_risks(db: Session, ids: Sequence[int], chunk_size: Optional[int] = None) -> None:
+    chunk_size = chunk_size or settings.BULK_INSERT_CHUNK_SIZE
+    for offset in range(0, len(ids), chunk_size):
+        db.execute(delete(Risk.__table__).where(Risk.id.in_(ids[offset:offset + chunk_size])))
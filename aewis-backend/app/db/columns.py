@@ -0,0 +1,104 @@
+"""
+Columnar, in-memory copy of a college's published risks rows.
+Loaded once per data version into NumPy arrays (strings dictionary-encoded as
+small integer codes) and kept in app.core.cache.column_store, so analytics
+and what-if queries run as array operations instead of re-reading the table.
+"""
+from dataclasses import dataclass, fields
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.cache import column_store
+from app.core.risk_engine import LEVELS, RISK_LEVELS, series_stats
+from app.db.base import Risk
+from app.db.bulk import unpack_quizzes
+from app.db.datasets import active_risks, data_version
+
+
+@dataclass
+class CollegeColumns:
+    """Parallel arrays in risks id order; `*_code` columns index into their lookup arrays."""
+    id: np.ndarray  # int64
+    student_id: np.ndarray  # fixed-width str
+    subject_code: np.ndarray  # int16 -> subjects
+    teacher_code: np.ndarray  # int16 -> teachers, -1 if unassigned
+    quizzes: np.ndarray  # float64, shape (rows, longest series), NaN-padded
+    quiz_avg: np.ndarray  # float64
+    decline_pct: np.ndarray  # float64
+    attendance: np.ndarray  # float64
+    risk_code: np.ndarray  # int8 -> RISK_LEVELS (HIGH, MEDIUM, LOW)
+    xp_score: np.ndarray  # int32
+    priority: np.ndarray  # float64
+    subjects: np.ndarray
+    teachers: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.id)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, f.name).nbytes for f in fields(self))
+
+    def risk_level(self, rows=slice(None)) -> np.ndarray:
+        return LEVELS[self.risk_code[rows]]
+
+    def subject(self, rows=slice(None)) -> np.ndarray:
+        return self.subjects[self.subject_code[rows]]
+
+    def first_unique_pairs(self, limit: int) -> np.ndarray:
+        """Row positions of the first row of the first `limit` (student_id, subject) pairs."""
+        n = min(len(self), max(limit, 1) * 4)
+        while True:
+            pairs = pd.DataFrame({"student_id": self.student_id[:n], "subject": self.subject_code[:n]})
+            first = np.flatnonzero(~pairs.duplicated().to_numpy())
+            if len(first) >= limit or n == len(self):
+                return first[:limit]
+            n = min(len(self), n * 4)
+
+
+def load_columns(db: Session, college_id: str) -> CollegeColumns:
+    """Read the college's active rows into arrays (one query, in id order)."""
+    # Core execution on the session's connection: plain tuples, no ORM row processing
+    rows = db.connection().execute(
+        select(
+            Risk.id, Risk.student_id, Risk.subject, Risk.teacher_id,
+            Risk.quiz1, Risk.quiz2, Risk.quiz3, Risk.extra_quizzes, Risk.quiz_avg, Risk.attendance,
+            Risk.risk_level, Risk.xp_score, Risk.priority,
+        )
+        .where(active_risks(db, college_id))
+        .order_by(Risk.id)
+    ).fetchall()
+    df = pd.DataFrame.from_records(rows, columns=[
+        "id", "student_id", "subject", "teacher_id", "quiz1", "quiz2", "quiz3", "extra_quizzes", "quiz_avg",
+        "attendance", "risk_level", "xp_score", "priority",
+    ])
+    subject_code, subjects = pd.factorize(df["subject"].fillna(""))
+    teacher_code, teachers = pd.factorize(df["teacher_id"])
+    quizzes = unpack_quizzes(df[["quiz1", "quiz2", "quiz3"]].to_numpy(np.float64), df["extra_quizzes"].tolist())
+    stats = series_stats(quizzes)
+    risk_code = np.full(len(df), RISK_LEVELS.index("LOW"), dtype=np.int8)
+    for code, level in enumerate(RISK_LEVELS):
+        risk_code[(df["risk_level"] == level).to_numpy()] = code
+    return CollegeColumns(
+        id=df["id"].to_numpy(np.int64),
+        student_id=df["student_id"].fillna("").to_numpy(str),
+        subject_code=subject_code.astype(np.int16),
+        teacher_code=teacher_code.astype(np.int16),
+        quizzes=quizzes,
+        quiz_avg=stats.avg_score,
+        decline_pct=stats.decline_pct,
+        attendance=df["attendance"].to_numpy(np.float64),
+        risk_code=risk_code,
+        xp_score=df["xp_score"].fillna(0).to_numpy(np.int32),
+        priority=df["priority"].fillna(0).to_numpy(np.float64),
+        subjects=np.asarray(subjects, dtype=str),
+        teachers=np.asarray(teachers, dtype=str),
+    )
+
+
+def college_columns(db: Session, college_id: str) -> CollegeColumns:
+    """The college's columns from column_store, loading them on first access after a write."""
+    return column_store.get(college_id, data_version(db, college_id), lambda: load_columns(db, college_id))
@@ -0,0 +1,259 @@
+"""
+Versioned per-college datasets.
+Every risks row belongs to a dataset version, and readers only see the
+college's active version. A replace upload writes a new staging version in
+short per-chunk transactions and then publishes it with a single small
+transaction, so dashboards keep serving the previous version for the whole
+ingest. Superseded versions are deleted later, in the background. Uploads
+of one college are serialized by a write lease in college_datasets, so a
+replace and an incremental upload never interleave.
+
+Separately, `data_version` counts writes of any kind to the college's data
+(uploads, interventions, rule and summary changes). Each write bumps it in
+its own transaction, and response and column caches in every process key on
+it (see app/core/cache.py).
+"""
+import logging
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Iterator
+
+from sqlalchemy import and_, delete, or_, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.db.base import CollegeDataset, Risk
+
+logger = logging.getLogger(__name__)
+
+
+def active_version(db: Session, college_id: str) -> int:
+    dataset = db.get(CollegeDataset, college_id)
+    return dataset.active_version if dataset else 0
+
+
+def active_risks(db: Session, college_id: str):
+    """Filter clause selecting the college's published risks rows."""
+    return and_(Risk.college_id == college_id, Risk.dataset_version == active_version(db, college_id))
+
+
+def _ensure_dataset(db: Session, college_id: str) -> None:
+    """Create the college's college_datasets row if missing, without failing if another writer just did."""
+    if db.get(CollegeDataset, college_id) is not None:
+        return
+    dialect = {"sqlite": sqlite, "postgresql": postgresql}.get(db.get_bind().dialect.name)
+    if dialect is None:
+        db.add(CollegeDataset(college_id=college_id, active_version=0, next_version=1, data_version=0))
+        db.flush()
+        return
+    db.execute(
+        dialect.insert(CollegeDataset)
+        .values(college_id=college_id, active_version=0, next_version=1, data_version=0)
+        .on_conflict_do_nothing(index_elements=["college_id"])
+    )
+
+
+def data_version(db: Session, college_id: str) -> int:
+    """The college's write counter, read from the database on every call."""
+    version = db.execute(
+        select(CollegeDataset.data_version).where(CollegeDataset.college_id == college_id)
+    ).scalar()
+    return version or 0
+
+
+def bump_data_version(db: Session, college_id: str) -> None:
+    """Advance the college's data version in the caller's transaction.
+
+    Call it from every write path, before committing, so cached responses and
+    columns in every process are invalidated exactly when the write commits.
+    """
+    _ensure_dataset(db, college_id)
+    db.execute(
+        update(CollegeDataset)
+        .where(CollegeDataset.college_id == college_id)
+        .values(data_version=CollegeDataset.data_version + 1)
+    )
+
+
+def allocate_version(db: Session, college_id: str) -> int:
+    """Reserve a new staging version number; commits.
+
+    A single UPDATE ... RETURNING, so concurrent callers in any process get
+    distinct numbers.
+    """
+    _ensure_dataset(db, college_id)
+    reserved = db.execute(
+        update(CollegeDataset.__table__)
+        .where(CollegeDataset.college_id == college_id)
+        .values(next_version=CollegeDataset.next_version + 1)
+        .returning(CollegeDataset.next_version)
+    ).scalar_one()
+    db.commit()
+    return reserved - 1
+
+
+def publish_version(db: Session, college_id: str, version: int) -> bool:
+    """Make `version` the active dataset in the caller's transaction.
+
+    Returns False (and changes nothing) if a newer version was already
+    published, e.g. by an upload that started later but finished first.
+    """
+    dataset = db.get(CollegeDataset, college_id, with_for_update=True)
+    if dataset.active_version >= version:
+        return False
+    dataset.active_version = version
+    dataset.published_at = datetime.now(timezone.utc)
+    return True
+
+
+def _active_version_clause(college_id: str):
+    # Evaluated inside each DELETE, so a publish between chunks is always honoured
+    return select(CollegeDataset.active_version).where(CollegeDataset.college_id == college_id).scalar_subquery()
+
+
+def _delete_chunked(db: Session, stale) -> int:
+    deleted = 0
+    while True:
+        ids = select(Risk.id).where(stale).limit(settings.BULK_INSERT_CHUNK_SIZE).scalar_subquery()
+        result = db.execute(delete(Risk.__table__).where(Risk.id.in_(ids)))
+        db.commit()
+        deleted += result.rowcount
+        if result.rowcount == 0:
+            return deleted
+
+
+def collect_garbage(college_id: str, version: int | None = None) -> int:
+    """Delete superseded versions (or one specific `version`) in short chunked transactions.
+
+    Only versions below the active one are ever deleted: the active version
+    and anything newer are refused, whatever the caller asks for.
+    """
+    from app.db.session import SessionLocal
+
+    db = SessionLocal()
+    try:
+        stale = and_(Risk.college_id == college_id, Risk.dataset_version < _active_version_clause(college_id))
+        if version is not None:
+            stale = and_(stale, Risk.dataset_version == version)
+        deleted = _delete_chunked(db, stale)
+    finally:
+        db.close()
+    if deleted:
+        logger.info("Garbage-collected %d risk rows for %s", deleted, college_id)
+    return deleted
+
+
+def discard_version(db: Session, college_id: str, version: int) -> int:
+    """Delete the rows of a staging `version` that will never be published; commits.
+
+    For the upload that allocated it, while it still holds the college's
+    write lease, so no other writer can be using the version. Refuses
+    versions at or below the active one.
+    """
+    stale = and_(
+        Risk.college_id == college_id,
+        Risk.dataset_version == version,
+        _active_version_clause(college_id) < version,
+    )
+    return _delete_chunked(db, stale)
+
+
+def _collect_garbage_logged(college_id: str) -> None:
+    try:
+        collect_garbage(college_id)
+    except Exception:
+        logger.exception("Garbage collection failed for %s", college_id)
+
+
+def schedule_garbage_collection(college_id: str) -> threading.Timer:
+    """Run collect_garbage after DATASET_GC_DELAY_SECONDS, so in-flight reads of the old version finish."""
+    timer = threading.Timer(settings.DATASET_GC_DELAY_SECONDS, _collect_garbage_logged, args=(college_id,))
+    timer.daemon = True
+    timer.start()
+    return timer
+
+
+class CollegeBusy(RuntimeError):
+    """Another upload for the college holds its write lease."""
+
+
+class WriteLease:
+    """The right to write a college's risks, held in college_datasets.writer until released or expired."""
+
+    def __init__(self, db: Session, college_id: str, token: str):
+        self.db = db
+        self.college_id = college_id
+        self.token = token
+        self._renewed = time.monotonic()
+
+    def renew(self) -> None:
+        """Extend the lease in the caller's transaction, at most every third of COLLEGE_WRITE_LEASE_SECONDS."""
+        if time.monotonic() - self._renewed < settings.COLLEGE_WRITE_LEASE_SECONDS / 3:
+            return
+        self.db.execute(
+            update(CollegeDataset.__table__)
+            .where(CollegeDataset.college_id == self.college_id, CollegeDataset.writer == self.token)
+            .values(writer_expires=_lease_expiry())
+        )
+        self._renewed = time.monotonic()
+
+
+def _lease_expiry() -> datetime:
+    return datetime.now(timezone.utc) + timedelta(seconds=settings.COLLEGE_WRITE_LEASE_SECONDS)
+
+
+def _try_acquire(db: Session, college_id: str, token: str) -> bool:
+    try:
+        _ensure_dataset(db, college_id)
+        now = datetime.now(timezone.utc)
+        acquired = db.execute(
+            update(CollegeDataset.__table__)
+            .where(
+                CollegeDataset.college_id == college_id,
+                or_(CollegeDataset.writer.is_(None), CollegeDataset.writer_expires < now),
+            )
+            .values(writer=token, writer_expires=_lease_expiry())
+        ).rowcount == 1
+        db.commit()
+    except OperationalError:
+        # SQLite: another connection is mid-transaction and holds the database write lock
+        db.rollback()
+        return False
+    return acquired
+
+
+@contextmanager
+def college_write_lease(db: Session, college_id: str, wait: float | None = None) -> Iterator[WriteLease]:
+    """Hold the college's write lease for the block, so its uploads run one at a time.
+
+    Waits up to `wait` seconds (default COLLEGE_WRITE_WAIT_SECONDS) for the
+    current holder, then raises CollegeBusy. Acquiring and releasing commit
+    `db`. A lease left by a crashed process expires after
+    COLLEGE_WRITE_LEASE_SECONDS without renewal.
+    """
+    token = uuid.uuid4().hex
+    deadline = time.monotonic() + (settings.COLLEGE_WRITE_WAIT_SECONDS if wait is None else wait)
+    delay = 0.02
+    while not _try_acquire(db, college_id, token):
+        if time.monotonic() >= deadline:
+            raise CollegeBusy(f"Another upload for {college_id} is still in progress")
+        time.sleep(delay)
+        delay = min(delay * 2, 0.5)
+    try:
+        yield WriteLease(db, college_id, token)
+    finally:
+        try:
+            db.rollback()
+            db.execute(
+                update(CollegeDataset.__table__)
+                .where(CollegeDataset.college_id == college_id, CollegeDataset.writer == token)
+                .values(writer=None, writer_expires=None)
+            )
+            db.commit()
+        except Exception:
+            logger.exception("Could not release the write lease for %s; it expires on its own", college_id)
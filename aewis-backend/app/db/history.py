@@ -0,0 +1,78 @@
+"""
+Risk history snapshots.
+Each upload appends one college-level row and one row per subject with the
+resulting HIGH/MEDIUM/LOW counts. Trend KPIs and time series are read back with
+range scans on (college_id, subject, taken_at).
+"""
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.db.base import RiskSnapshot
+from app.db.summary import SummaryData
+
+
+def record_snapshot(db: Session, college_id: str, data: SummaryData) -> None:
+    """Append the college's current counts; runs in the caller's transaction."""
+    taken_at = datetime.now(timezone.utc)
+    rows = [
+        {
+            "college_id": college_id,
+            "subject": None,
+            "taken_at": taken_at,
+            "total": data.total,
+            "high": data.high,
+            "medium": data.medium,
+            "low": data.low,
+            "health_score": round(data.quiz_avg_sum / data.total, 2) if data.total else None,
+        }
+    ]
+    rows.extend(
+        {
+            "college_id": college_id,
+            "subject": subject,
+            "taken_at": taken_at,
+            "total": sum(counts),
+            "high": counts[0],
+            "medium": counts[1],
+            "low": counts[2],
+            "health_score": None,
+        }
+        for subject, counts in data.subjects.items()
+    )
+    db.execute(insert(RiskSnapshot.__table__), rows)
+
+
+def snapshot_series(
+    db: Session,
+    college_id: str,
+    subject: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: int = 200,
+) -> list[RiskSnapshot]:
+    """The latest `limit` snapshots in [since, until], oldest first."""
+    query = db.query(RiskSnapshot).filter(
+        RiskSnapshot.college_id == college_id,
+        RiskSnapshot.subject.is_(None) if subject is None else RiskSnapshot.subject == subject,
+    )
+    if since is not None:
+        query = query.filter(RiskSnapshot.taken_at >= since)
+    if until is not None:
+        query = query.filter(RiskSnapshot.taken_at <= until)
+    rows = query.order_by(RiskSnapshot.taken_at.desc(), RiskSnapshot.id.desc()).limit(limit).all()
+    return rows[::-1]
+
+
+def risk_trend(db: Session, college_id: str) -> float:
+    """Percent change in the HIGH-risk share between the last two uploads (negative is better)."""
+    latest = snapshot_series(db, college_id, limit=2)
+    if len(latest) < 2:
+        return 0.0
+    previous, current = latest
+    if not previous.total or not current.total or not previous.high:
+        return 0.0
+    prev_share = previous.high / previous.total
+    return round((current.high / current.total - prev_share) / prev_share * 100, 1)
@@ -0,0 +1,59 @@
+"""
+Per-college risk rule sets.
+Rules are stored as RuleSetConfig documents in college_rule_sets; colleges
+without one use the engine defaults. Each college's rules are compiled once
+and cached here, keyed on the row's updated_at, so a change made through any
+process is picked up on the next lookup. Saving rules applies from the next
+upload on; stored rows keep the levels they were scored with.
+"""
+import threading
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.risk_engine import DEFAULT_RULE_SET, DEFAULT_RULES, CompiledRules, compile_rules
+from app.db.base import CollegeRuleSet
+from app.models.risk import RuleSetConfig
+
+_compiled: dict[str, tuple[datetime, CompiledRules]] = {}
+_lock = threading.Lock()
+
+
+def read_rules(db: Session, college_id: str) -> Optional[CollegeRuleSet]:
+    return db.get(CollegeRuleSet, college_id)
+
+
+def rule_config(db: Session, college_id: str) -> RuleSetConfig:
+    row = read_rules(db, college_id)
+    return RuleSetConfig.model_validate(row.config) if row else DEFAULT_RULE_SET
+
+
+def college_rules(db: Session, college_id: str) -> CompiledRules:
+    """The college's compiled rules, compiling them on first use after a change."""
+    row = read_rules(db, college_id)
+    if row is None:
+        return DEFAULT_RULES
+    with _lock:
+        entry = _compiled.get(college_id)
+        if entry is not None and entry[0] == row.updated_at:
+            return entry[1]
+    compiled = compile_rules(RuleSetConfig.model_validate(row.config))
+    with _lock:
+        _compiled[college_id] = (row.updated_at, compiled)
+    return compiled
+
+
+def save_rules(db: Session, college_id: str, config: RuleSetConfig) -> None:
+    """Store the college's rules in the caller's transaction; call invalidate_rules after commit."""
+    row = read_rules(db, college_id)
+    if row is None:
+        row = CollegeRuleSet(college_id=college_id)
+        db.add(row)
+    row.config = config.model_dump()
+    row.updated_at = datetime.now(timezone.utc)
+
+
+def invalidate_rules(college_id: str) -> None:
+    with _lock:
+        _compiled.pop(college_id, None)
@@ -1,6 +1,6 @@
 """
 Seed demo data into SQLite for development.
-Uses utils.data_generator and risk engine to populate risks table.
+Uses utils.data_generator and the upload ingestion pipeline to populate risks table.
 """
 import sys
 from pathlib import Path
@@ -8,9 +8,10 @@ from pathlib import Path
 # Allow running from project root
 sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
 
+import pandas as pd
+
 from app.db.session import SessionLocal, init_db
-from app.db.base import Risk
-from app.core.risk_engine import compute_risk
+from app.core.ingest import ingest_frames
 
 
 def seed_demo(college_id: str = "demo_001", num_rows: int = 512):
@@ -19,26 +20,10 @@ def seed_demo(college_id: str = "demo_001", num_rows: int = 512):
     init_db()
     db = SessionLocal()
     try:
-        db.query(Risk).filter(Risk.college_id == college_id).delete()
-        db.commit()
         rows = generate_demo_data(num_rows)
-        for r in rows:
-            computed = compute_risk(r)
-            rec = Risk(
-                college_id=college_id,
-                student_id=str(r["student_id"]),
-                subject=str(r["subject"]),
-                quiz1=float(r["quiz1"]),
-                quiz2=float(r["quiz2"]),
-                quiz3=float(r["quiz3"]),
-                attendance=float(r["attendance"]),
-                risk_level=computed.risk_level,
-                xp_score=computed.xp_score,
-                reason=computed.reason,
-            )
-            db.add(rec)
-        db.commit()
-        print(f"Seeded {len(rows)} rows for college_id={college_id}")
+        # Same path as a replace upload: batch scoring, bulk inserts, summary, publish
+        response = ingest_frames(db, college_id, [pd.DataFrame(rows)], heatmap_limit=0)
+        print(f"Seeded {response.summary.total_students} rows for college_id={college_id}")
     finally:
         db.close()
 
@@ -1,7 +1,10 @@
-from sqlalchemy import create_engine
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, event, inspect
 from sqlalchemy.orm import sessionmaker
 from app.config import settings
-from app.db.base import Base
 
 
 # SQLite needs check_same_thread=False for FastAPI
@@ -14,11 +17,34 @@ engine = create_engine(
     connect_args=connect_args,
     echo=settings.DEBUG,
 )
+if settings.DATABASE_URL.startswith("sqlite"):
+    @event.listens_for(engine, "connect")
+    def _sqlite_wal(dbapi_connection, connection_record):
+        # WAL lets dashboard reads proceed while an upload holds the write lock
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.close()
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
+BASELINE_REVISION = "0001"  # the schema create_all built before migrations existed
+
+
+def migrate(connection) -> None:
+    """Upgrade the database behind `connection` to the latest migration (see migrations/versions)."""
+    config = Config(str(ALEMBIC_INI))
+    config.attributes["connection"] = connection
+    tables = inspect(connection).get_table_names()
+    if "risks" in tables and "alembic_version" not in tables:
+        command.stamp(config, BASELINE_REVISION)
+    command.upgrade(config, "head")
+
+
 def init_db():
-    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        migrate(connection)
 
 
 def get_db():
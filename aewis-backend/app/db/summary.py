@@ -0,0 +1,181 @@
+"""
+Materialized per-college risk summaries.
+Write paths replace a college's summary in the same transaction as its risks,
+so analytics can read O(subjects) rows instead of scanning every risk.
+
+Check (and optionally repair) summaries against the risks table:
+    python -m app.db.summary --check [--fix] [college_id ...]
+"""
+import argparse
+import sys
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+
+from app.core.risk_engine import subject_level_counts
+from app.db.base import CollegeSummary, Risk, SubjectSummary
+from app.db.datasets import active_risks, bump_data_version
+
+
+@dataclass
+class SummaryData:
+    high: int = 0
+    medium: int = 0
+    low: int = 0
+    quiz_avg_sum: float = 0.0
+    subjects: dict[str, tuple[int, int, int]] = field(default_factory=dict)  # subject -> (HIGH, MEDIUM, LOW)
+
+    @property
+    def total(self) -> int:
+        return self.high + self.medium + self.low
+
+    def add_counts(self, subjects: dict[str, tuple[int, int, int]], quiz_avg_sum: float, sign: int = 1) -> None:
+        """Add (sign=1) or remove (sign=-1) per-subject (HIGH, MEDIUM, LOW) counts."""
+        for subject, counts in subjects.items():
+            merged = tuple(a + sign * b for a, b in zip(self.subjects.get(subject, (0, 0, 0)), counts))
+            if any(merged):
+                self.subjects[subject] = merged
+            else:
+                self.subjects.pop(subject, None)
+            self.high += sign * counts[0]
+            self.medium += sign * counts[1]
+            self.low += sign * counts[2]
+        self.quiz_avg_sum += sign * quiz_avg_sum
+
+    def add_rows(self, subjects, risk_levels, quiz_avg_sum: float, sign: int = 1) -> None:
+        self.add_counts(subject_level_counts(subjects, risk_levels), quiz_avg_sum, sign)
+
+    def merge(self, other: "SummaryData", sign: int = 1) -> None:
+        self.add_counts(other.subjects, other.quiz_avg_sum, sign)
+
+
+def write_summary(db: Session, college_id: str, data: SummaryData) -> None:
+    """Replace the stored summary for `college_id`; the caller commits."""
+    db.query(SubjectSummary).filter(SubjectSummary.college_id == college_id).delete()
+    db.merge(
+        CollegeSummary(
+            college_id=college_id,
+            total=data.total,
+            high=data.high,
+            medium=data.medium,
+            low=data.low,
+            quiz_avg_sum=data.quiz_avg_sum,
+            updated_at=datetime.now(timezone.utc),
+        )
+    )
+    db.add_all(
+        SubjectSummary(college_id=college_id, subject=subject, total=sum(c), high=c[0], medium=c[1], low=c[2])
+        for subject, c in data.subjects.items()
+    )
+
+
+def read_summary(db: Session, college_id: str) -> Optional[SummaryData]:
+    college = db.get(CollegeSummary, college_id)
+    if college is None:
+        return None
+    subjects = {
+        s.subject: (s.high, s.medium, s.low)
+        for s in db.query(SubjectSummary).filter(SubjectSummary.college_id == college_id)
+    }
+    return SummaryData(
+        high=college.high,
+        medium=college.medium,
+        low=college.low,
+        quiz_avg_sum=college.quiz_avg_sum,
+        subjects=subjects,
+    )
+
+
+def compute_summary(db: Session, college_id: str) -> SummaryData:
+    """Aggregate a college's summary from its published risks rows."""
+    in_college = active_risks(db, college_id)
+    level_sums = [func.sum(case((Risk.risk_level == level, 1), else_=0)) for level in ("HIGH", "MEDIUM", "LOW")]
+    subjects = {
+        subject: (int(h or 0), int(m or 0), int(lo or 0))
+        for subject, h, m, lo in db.query(Risk.subject, *level_sums).filter(in_college).group_by(Risk.subject)
+    }
+    quiz_avg_sum = db.query(func.sum(Risk.quiz_avg)).filter(in_college).scalar()
+    return SummaryData(
+        high=sum(c[0] for c in subjects.values()),
+        medium=sum(c[1] for c in subjects.values()),
+        low=sum(c[2] for c in subjects.values()),
+        quiz_avg_sum=float(quiz_avg_sum or 0.0),
+        subjects=subjects,
+    )
+
+
+def rebuild_summary(db: Session, college_id: str) -> SummaryData:
+    """Rewrite the stored summary from risks in the caller's transaction, invalidating cached reads."""
+    data = compute_summary(db, college_id)
+    write_summary(db, college_id, data)
+    bump_data_version(db, college_id)
+    return data
+
+
+def get_or_rebuild_summary(db: Session, college_id: str) -> SummaryData:
+    """Stored summary, backfilled from risks for colleges written before summaries existed."""
+    data = read_summary(db, college_id)
+    if data is None:
+        data = compute_summary(db, college_id)
+        if data.total:
+            write_summary(db, college_id, data)
+            db.commit()
+    return data
+
+
+def check_summary(db: Session, college_id: str) -> list[str]:
+    """Differences between the stored summary and the risks table (empty when consistent)."""
+    stored = read_summary(db, college_id) or SummaryData()
+    actual = compute_summary(db, college_id)
+    problems = []
+    for name in ("high", "medium", "low"):
+        if getattr(stored, name) != getattr(actual, name):
+            problems.append(f"{name}: stored {getattr(stored, name)}, actual {getattr(actual, name)}")
+    if abs(stored.quiz_avg_sum - actual.quiz_avg_sum) > 1e-6 * max(1.0, abs(actual.quiz_avg_sum)):
+        problems.append(f"quiz_avg_sum: stored {stored.quiz_avg_sum}, actual {actual.quiz_avg_sum}")
+    for subject in sorted(set(stored.subjects) | set(actual.subjects)):
+        if stored.subjects.get(subject) != actual.subjects.get(subject):
+            problems.append(f"{subject}: stored {stored.subjects.get(subject)}, actual {actual.subjects.get(subject)}")
+    return problems
+
+
+def all_college_ids(db: Session) -> list[str]:
+    ids = {cid for (cid,) in db.query(Risk.college_id).distinct()}
+    ids |= {cid for (cid,) in db.query(CollegeSummary.college_id)}
+    return sorted(ids)
+
+
+def main() -> None:
+    from app.db.session import SessionLocal, init_db
+
+    parser = argparse.ArgumentParser(description="Check college summaries against the risks table")
+    parser.add_argument("college_ids", nargs="*", help="Colleges to check (default: all)")
+    parser.add_argument("--check", action="store_true", help="Report inconsistencies (default)")
+    parser.add_argument("--fix", action="store_true", help="Rebuild inconsistent summaries from risks")
+    args = parser.parse_args()
+
+    init_db()
+    db = SessionLocal()
+    try:
+        inconsistent = 0
+        for college_id in args.college_ids or all_college_ids(db):
+            problems = check_summary(db, college_id)
+            if not problems:
+                continue
+            inconsistent += 1
+            print(f"{college_id}: " + "; ".join(problems))
+            if args.fix:
+                rebuild_summary(db, college_id)
+                db.commit()
+                print(f"{college_id}: rebuilt")
+        if inconsistent and not args.fix:
+            sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
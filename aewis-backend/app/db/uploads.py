@@ -0,0 +1,100 @@
+"""
+Identical-upload short-circuit.
+Every upload through the API records a key (a SHA-256 of the file's bytes
+plus the parameters that shape the result: mode, format, streaming, whether
+the response carries the per-row heatmap, and the college's rules) together with its UploadResponse, in the same transaction
+that publishes the upload. A later upload with the same key is answered from
+the stored response without parsing, scoring or touching risks, as long as
+the college's data version is still the one that upload left: any write
+since then, including in-place ones such as interventions, means the data no
+longer matches the response.
+
+The record stays small whatever the upload's size: the per-row heatmap is
+not stored, only its length, and is rebuilt from the published rows (in
+upload order) when the response is replayed.
+"""
+import hashlib
+import json
+import zlib
+from datetime import datetime, timezone
+from typing import BinaryIO, Optional
+
+from sqlalchemy.orm import Session
+
+from app.db.base import CollegeUpload, Risk
+from app.db.datasets import active_risks, data_version
+from app.models.risk import UploadResponse
+
+HASH_READ_BYTES = 1024 * 1024
+
+
+def content_hash(fileobj: BinaryIO) -> str:
+    """SHA-256 of a seekable file's bytes, read in chunks; leaves the file at the start."""
+    sha = hashlib.sha256()
+    fileobj.seek(0)
+    while chunk := fileobj.read(HASH_READ_BYTES):
+        sha.update(chunk)
+    fileobj.seek(0)
+    return sha.hexdigest()
+
+
+def upload_key(
+    digest: str, mode: str, fmt: str, stream: bool, rules_key: Optional[str], heatmap: bool = True
+) -> str:
+    params = f"{digest}|{mode}|{fmt}|{int(stream)}|{rules_key or 'default'}|{int(heatmap)}"
+    return hashlib.sha256(params.encode()).hexdigest()
+
+
+def identical_upload(db: Session, college_id: str, key: str) -> Optional[bytes]:
+    """The stored response JSON if the college's last upload had `key` and nothing was written since."""
+    row = db.get(CollegeUpload, college_id)
+    if row is None or row.upload_key != key or row.data_version != data_version(db, college_id):
+        return None
+    record = json.loads(zlib.decompress(row.response))
+    if "heatmap_rows" not in record:
+        return None  # recorded with its whole heatmap by an earlier release; the next upload replaces it
+    response = record["response"]
+    response["heatmap_matrix"] = _heatmap_rows(db, college_id, record["heatmap_rows"])
+    return json.dumps(response, separators=(",", ":")).encode("utf-8")
+
+
+def _heatmap_rows(db: Session, college_id: str, limit: int) -> list[list]:
+    """The first `limit` published rows as UploadAccumulator heatmap rows."""
+    if not limit:
+        return []
+    rows = (
+        db.query(Risk.student_id, Risk.subject, Risk.risk_level, Risk.xp_score, Risk.quiz_avg)
+        .filter(active_risks(db, college_id))
+        .order_by(Risk.id)
+        .limit(limit)
+    )
+    return [
+        [student_id, subject, level, xp, min(100, max(0, int(avg or 0)))]
+        for student_id, subject, level, xp, avg in rows
+    ]
+
+
+def record_upload(db: Session, college_id: str, key: Optional[str], response: UploadResponse) -> None:
+    """Store the upload's key and response in the caller's transaction, after its data version bump.
+
+    The response's heatmap must list the first published rows in id order, as
+    a replace upload's does. `key=None` (uploads not made through the API, or
+    whose response cannot be replayed) forgets the previous record, since the
+    data no longer matches it.
+    """
+    row = db.get(CollegeUpload, college_id)
+    if key is None:
+        if row is not None:
+            db.delete(row)
+        return
+    if row is None:
+        row = CollegeUpload(college_id=college_id)
+        db.add(row)
+    row.upload_key = key
+    row.data_version = data_version(db, college_id)
+    record = {
+        "heatmap_rows": len(response.heatmap_matrix),
+        "response": response.model_dump(mode="json", exclude={"heatmap_matrix"}),
+    }
+    row.response = zlib.compress(json.dumps(record, separators=(",", ":")).encode("utf-8"), 1)
+    row.uploaded_at = datetime.now(timezone.utc)
@@ -4,6 +4,7 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from app.config import settings
 from app.api.v1.router import api_router
+from app.core.jobs import upload_jobs
 from app.db.session import init_db
 
 
@@ -11,6 +12,7 @@ from app.db.session import init_db
 async def lifespan(app: FastAPI):
     init_db()
     yield
+    upload_jobs.shutdown()
 
 
 app = FastAPI(
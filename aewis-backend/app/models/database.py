@@ -1,5 +1,5 @@
 # SQLAlchemy ORM models are defined in app/db/base.py
 # This module re-exports for convenience
-from app.db.base import Risk, Intervention, Base
+from app.db.base import Risk, Intervention, CollegeDataset, CollegeRuleSet, CollegeSummary, SubjectSummary, RiskSnapshot, Base
 
-__all__ = ["Risk", "Intervention", "Base"]
+__all__ = ["Risk", "Intervention", "CollegeDataset", "CollegeRuleSet", "CollegeSummary", "SubjectSummary", "RiskSnapshot", "Base"]
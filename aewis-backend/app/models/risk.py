@@ -1,5 +1,7 @@
-from pydantic import BaseModel
-from typing import List, Optional, Any
+from datetime import datetime
+
+from pydantic import BaseModel, Field, model_validator
+from typing import Dict, List, Literal, Optional, Any
 
 
 class RiskModel(BaseModel):
@@ -7,6 +9,7 @@ class RiskModel(BaseModel):
     reason: str
     xp_score: int
     health_score: int
+    priority: float = 0.0
 
 
 class UploadSummary(BaseModel):
@@ -24,12 +27,38 @@ class TopRisk(BaseModel):
     reason: str
 
 
+class IngestChanges(BaseModel):
+    inserted: int = 0
+    updated: int = 0
+    deleted: int = 0
+    unchanged: int = 0
+
+
 class UploadResponse(BaseModel):
     success: bool
     college_id: str
     summary: UploadSummary
     heatmap_matrix: List[List[Any]]
     top_risks: List[TopRisk]
+    changes: Optional[IngestChanges] = None  # incremental uploads only
+
+
+class UploadJobAccepted(BaseModel):
+    job_id: str
+    college_id: str
+    phase: str
+    status_url: str
+
+
+class UploadJobStatus(BaseModel):
+    job_id: str
+    college_id: str
+    phase: str  # queued | parsing | scoring | writing | committing | publishing | done | failed
+    rows_processed: int
+    rows_per_sec: float
+    elapsed_seconds: float
+    error: Optional[str] = None
+    result: Optional[UploadResponse] = None
 
 
 class InterventionRequest(BaseModel):
@@ -65,9 +94,111 @@ class RiskStatsResponse(BaseModel):
     heatmap_matrix: Optional[List[List[Any]]] = None
 
 
+class RiskHistoryResponse(BaseModel):
+    """Snapshot series in columnar form, oldest first; all lists have the same length."""
+    college_id: str
+    subject: Optional[str] = None  # None: whole college
+    taken_at: List[datetime]
+    total: List[int]
+    high: List[int]
+    medium: List[int]
+    low: List[int]
+    health_score: List[Optional[float]]
+
+
+class HeatmapCells(BaseModel):
+    """Non-empty cells in columnar form; `subject` and `bucket` index the response's lookups."""
+    subject: List[int]
+    bucket: List[int]
+    count: List[int]
+    high: List[int]  # HIGH rows in the cell
+    avg_score: List[float]
+    avg_attendance: List[float]
+
+
+class HeatmapResponse(BaseModel):
+    """Subject x bucket aggregate of a college's rows; size grows with cells, not students."""
+    college_id: str
+    by: Literal["risk", "health"]
+    total: int
+    subjects: List[str]
+    buckets: List[str]  # risk levels, or quiz-average ranges such as "40-50"
+    cells: HeatmapCells
+
+
+class HeatmapRowsResponse(BaseModel):
+    """One page of a heatmap cell's rows in columnar form, highest priority first."""
+    college_id: str
+    subject: str
+    bucket: str
+    total: int  # rows in the cell
+    student_id: List[str]
+    teacher_id: List[Optional[str]]
+    quiz_avg: List[float]
+    attendance: List[float]
+    decline_pct: List[float]
+    risk_level: List[str]
+    xp_score: List[int]
+    priority: List[float]
+    next_cursor: Optional[str] = None
+
+
+class RiskRule(BaseModel):
+    name: str = Field(min_length=1, max_length=32)  # shown in the row's reason, e.g. "Attendance"
+    metric: Literal["attendance", "decline_pct", "avg_score"]
+    op: Literal["<", "<=", ">", ">="]
+    value: float
+    weight: float = Field(1.0, gt=0)
+
+
+class RuleSetConfig(BaseModel):
+    """A college's risk rules: a row scores the weights of the rules it trips."""
+    rules: List[RiskRule] = Field(min_length=1, max_length=8)
+    high_at: float = Field(2.0, gt=0)  # score >= high_at is HIGH
+    medium_at: float = Field(1.0, gt=0)  # score >= medium_at is MEDIUM
+    crisis_share: float = Field(0.30, ge=0, le=1)  # crisis subject above this HIGH share
+
+    @model_validator(mode="after")
+    def _check(self) -> "RuleSetConfig":
+        if self.medium_at > self.high_at:
+            raise ValueError("medium_at must not exceed high_at")
+        if len({rule.name for rule in self.rules}) != len(self.rules):
+            raise ValueError("rule names must be unique")
+        return self
+
+
+class SimulationThresholds(BaseModel):
+    """Overrides for the college's rules; omitted fields keep the college's values."""
+    attendance: Optional[float] = Field(None, ge=0, le=100)  # value of attendance rules
+    decline: Optional[float] = Field(None, ge=0, le=100)  # value of decline_pct rules
+    average: Optional[float] = Field(None, ge=0, le=100)  # value of avg_score rules
+    crisis_share: Optional[float] = Field(None, ge=0, le=1)
+
+
+class SimulationRequest(BaseModel):
+    scenarios: List[SimulationThresholds] = Field(min_length=1, max_length=20)
+
+
+class SimulationResult(BaseModel):
+    thresholds: SimulationThresholds
+    high_risk: int
+    medium_risk: int
+    low_risk: int
+    changed: int  # rows whose level differs from the stored one
+    crisis_subjects: List[str]
+    subject_risks: Dict[str, float]  # HIGH share per subject, percent
+
+
+class SimulationResponse(BaseModel):
+    college_id: str
+    total_students: int
+    results: List[SimulationResult]
+
+
 class TeacherStudentRisk(BaseModel):
     student_id: str
     subject: str
     risk_level: str
     reason: str
     xp_score: int
+    priority: float = 0.0
@@ -0,0 +1,96 @@
+"""
+Time and memory of per-row result objects versus Pydantic models, per --rows rows.
+
+- compute_risk: the per-row engine returning RiskResult tuples, against
+  building a validated RiskModel for every row (RiskResult.to_model);
+- upload_response: UploadAccumulator.add + build, whose UploadResponse skips
+  re-validating the heatmap rows, against constructing it with validation.
+
+Time is from an untraced run; memory from a second run under tracemalloc:
+`peak_mb` is the peak while producing the results, `retained_mb` what is
+still allocated while they are held.
+
+    python -m benchmarks.bench_allocations --rows 100000 --output alloc.json
+"""
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(root))
+
+import pandas as pd
+
+from app.core.ingest import ScoredFrame, UploadAccumulator
+from app.core.risk_engine import compute_risk
+from app.models.risk import UploadResponse
+from utils.data_generator import generate_frames
+
+
+def measure(fn) -> dict:
+    """Time fn untraced, then run it again under tracemalloc for its memory."""
+    start = time.perf_counter()
+    fn()
+    seconds = time.perf_counter() - start
+
+    tracemalloc.start()
+    result = fn()  # held until measured
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return {
+        "seconds": round(seconds, 4),
+        "peak_mb": round(peak / 2**20, 2),
+        "retained_mb": round(retained / 2**20, 2),
+    }
+
+
+def bench_compute_risk(rows: list[dict]) -> dict:
+    return {
+        "risk_result": measure(lambda: [compute_risk(row) for row in rows]),
+        "pydantic_model": measure(lambda: [compute_risk(row).to_model() for row in rows]),
+    }
+
+
+def bench_upload_response(scored: ScoredFrame) -> dict:
+    def build() -> UploadResponse:
+        acc = UploadAccumulator()
+        acc.add(scored)
+        return acc.build("bench")
+
+    def build_validated() -> UploadResponse:
+        response = build()
+        return UploadResponse(**{name: getattr(response, name) for name in UploadResponse.model_fields})
+
+    return {"construct": measure(build), "validated": measure(build_validated)}
+
+
+def run(rows: int) -> dict:
+    df = pd.concat(generate_frames(rows, seed=0), ignore_index=True)
+    records = df.to_dict("records")
+    scored = ScoredFrame.score(df)
+    return {
+        "benchmark": "result_allocations",
+        "rows": rows,
+        "compute_risk": bench_compute_risk(records),
+        "upload_response": bench_upload_response(scored),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--output", type=Path, help="Also write the JSON result here")
+    args = parser.parse_args()
+
+    text = json.dumps(run(args.rows), indent=2)
+    if args.output:
+        args.output.write_text(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Latency of GET /risk-stats while a large upload is being ingested.
+
+Drives the ASGI app in-process on one event loop (like a single uvicorn
+worker) and reports p50/p99 read latency with and without a concurrent
+upload. The readers poll the college being uploaded, with the response
+cache and column store disabled so every read runs its queries against the
+tables the upload is writing. If ingestion blocked the loop, the "during_upload" p99 would
+grow to roughly the upload duration.
+
+    python -m benchmarks.bench_concurrent_latency --rows 200000 --readers 8
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(root))
+
+_tmpdir = tempfile.mkdtemp(prefix="aewis-bench-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_tmpdir}/bench.db")
+os.environ.setdefault("DEBUG", "false")
+# No cached responses: a replace upload only bumps the data version once it publishes
+os.environ.setdefault("RESPONSE_CACHE_MAX_BYTES", "0")
+# No cached columns either: risk-stats would otherwise read its row-level charts from memory
+os.environ.setdefault("COLUMN_STORE_MAX_BYTES", "0")
+
+import httpx
+import numpy as np
+import pandas as pd
+
+from app.db.session import init_db
+from app.main import app
+from utils.data_generator import generate_frames
+
+COLLEGE = "latency"
+
+
+def make_csv(num_rows: int, seed: int = 0) -> bytes:
+    return pd.concat(generate_frames(num_rows, seed=seed), ignore_index=True).to_csv(index=False).encode()
+
+
+def percentiles(samples: list[float]) -> dict:
+    arr = np.array(samples) * 1000
+    return {
+        "requests": len(samples),
+        "p50_ms": round(float(np.percentile(arr, 50)), 2),
+        "p99_ms": round(float(np.percentile(arr, 99)), 2),
+        "max_ms": round(float(arr.max()), 2),
+    }
+
+
+async def upload(client: httpx.AsyncClient, college_id: str, payload: bytes) -> float:
+    start = time.perf_counter()
+    r = await client.post(
+        "/api/v1/upload-csv?stream=true",
+        files={"file": ("bench.csv", payload, "text/csv")},
+        data={"college_id": college_id},
+    )
+    r.raise_for_status()
+    return time.perf_counter() - start
+
+
+async def reader(client: httpx.AsyncClient, college_id: str, stop: asyncio.Event, samples: list[float]) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        r = await client.get(f"/api/v1/risk-stats/{college_id}")
+        r.raise_for_status()
+        samples.append(time.perf_counter() - start)
+        await asyncio.sleep(0.01)
+
+
+async def run(rows: int, readers: int, baseline_seconds: float) -> dict:
+    init_db()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        await upload(client, COLLEGE, make_csv(2000, seed=1))
+        payload = make_csv(rows)
+
+        stop = asyncio.Event()
+        baseline: list[float] = []
+        tasks = [asyncio.create_task(reader(client, COLLEGE, stop, baseline)) for _ in range(readers)]
+        await asyncio.sleep(baseline_seconds)
+        stop.set()
+        await asyncio.gather(*tasks)
+
+        stop = asyncio.Event()
+        during: list[float] = []
+        tasks = [asyncio.create_task(reader(client, COLLEGE, stop, during)) for _ in range(readers)]
+        upload_seconds = await upload(client, COLLEGE, payload)
+        stop.set()
+        await asyncio.gather(*tasks)
+
+    return {
+        "benchmark": "risk_stats_latency_during_upload",
+        "upload_rows": rows,
+        "upload_seconds": round(upload_seconds, 3),
+        "readers": readers,
+        "baseline": percentiles(baseline),
+        "during_upload": percentiles(during),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--baseline-seconds", type=float, default=3.0)
+    args = parser.parse_args()
+    result = asyncio.run(run(args.rows, args.readers, args.baseline_seconds))
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
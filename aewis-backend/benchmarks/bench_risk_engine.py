@@ -0,0 +1,230 @@
+"""
+Throughput of the risk engine, the upload pipeline and risk-stats at several scales.
+
+Builds synthetic datasets with utils.data_generator.generate_frames and times:
+
+- compute_risk: the per-row path (on at most --row-path-max rows) and
+  compute_risk_batch over every row;
+- pooled_scoring: app.core.parallel.compute_risk_series over every row with
+  each of --processes worker counts (1 is the in-process path);
+- upload: CSV bytes -> read_csv_chunks -> ingest_frames (parse, score, persist,
+  publish), with the time spent in each progress phase;
+- risk_stats: building the GET /risk-stats body, first call and repeated calls;
+  the column store is dropped before every call, so each one measures the
+  database reads (summary tables and the column load), not cached data.
+
+Prints JSON; --output also writes it to a file, and --compare reports the
+rows/sec change against an earlier result file.
+
+    python -m benchmarks.bench_risk_engine --sizes 1000,100000,1000000 --output bench.json
+    python -m benchmarks.bench_risk_engine --compare bench.json
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(root))
+
+_tmpdir = tempfile.mkdtemp(prefix="aewis-bench-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_tmpdir}/bench.db")
+os.environ.setdefault("DEBUG", "false")
+
+import numpy as np
+import pandas as pd
+
+from app.api.v1.endpoints.analytics import _risk_stats
+from app.core import parallel
+from app.core.cache import column_store
+from app.core.ingest import ingest_frames, read_csv_chunks
+from app.core.risk_engine import compute_risk, compute_risk_batch
+from app.db.session import SessionLocal, init_db
+from utils.data_generator import generate_frames
+
+DEFAULT_SIZES = "1000,100000,1000000"
+
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=root, capture_output=True, text=True)
+    except OSError:
+        return None
+    return out.stdout.strip() or None
+
+
+def _rate(rows: int, seconds: float) -> float:
+    return round(rows / seconds, 1) if seconds > 0 else 0.0
+
+
+def bench_compute_risk(df: pd.DataFrame, row_path_max: int) -> dict:
+    sample = df.head(row_path_max).to_dict("records")
+    start = time.perf_counter()
+    for row in sample:
+        compute_risk(row)
+    row_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    compute_risk_batch(
+        df["quiz1"].to_numpy(float), df["quiz2"].to_numpy(float),
+        df["quiz3"].to_numpy(float), df["attendance"].to_numpy(float),
+    )
+    batch_seconds = time.perf_counter() - start
+    return {
+        "row_path": {"rows": len(sample), "seconds": round(row_seconds, 4), "rows_per_sec": _rate(len(sample), row_seconds)},
+        "batch": {"rows": len(df), "seconds": round(batch_seconds, 4), "rows_per_sec": _rate(len(df), batch_seconds)},
+    }
+
+
+def bench_pooled_scoring(df: pd.DataFrame, process_counts: list[int]) -> dict:
+    quizzes = df[["quiz1", "quiz2", "quiz3"]].to_numpy(np.float64)
+    attendance = df["attendance"].to_numpy(np.float64)
+    out = {}
+    for processes in process_counts:
+        # Start the workers outside the timed call
+        parallel.compute_risk_series(quizzes[:processes], attendance[:processes], processes=processes, min_rows=0)
+        start = time.perf_counter()
+        parallel.compute_risk_series(quizzes, attendance, processes=processes, min_rows=0)
+        seconds = time.perf_counter() - start
+        out[str(processes)] = {"seconds": round(seconds, 4), "rows_per_sec": _rate(len(df), seconds)}
+    parallel.shutdown_pool()
+    return out
+
+
+def bench_upload(college_id: str, payload: bytes, rows: int) -> dict:
+    phases: dict[str, float] = {}
+    current = {"phase": None, "since": 0.0}
+
+    def progress(phase: str, _rows: int) -> None:
+        now = time.perf_counter()
+        if current["phase"] is not None:
+            phases[current["phase"]] = phases.get(current["phase"], 0.0) + now - current["since"]
+        current.update(phase=phase, since=now)
+
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        ingest_frames(db, college_id, read_csv_chunks(io.BytesIO(payload)), heatmap_limit=0, progress=progress)
+        seconds = time.perf_counter() - start
+    finally:
+        db.close()
+    progress("done", rows)
+    return {
+        "rows": rows,
+        "csv_bytes": len(payload),
+        "seconds": round(seconds, 4),
+        "rows_per_sec": _rate(rows, seconds),
+        "phase_seconds": {phase: round(s, 4) for phase, s in phases.items()},
+    }
+
+
+def bench_risk_stats(college_id: str, repeat: int) -> dict:
+    db = SessionLocal()
+    try:
+        column_store.drop_college(college_id)
+        start = time.perf_counter()
+        _risk_stats(db, college_id)
+        first = time.perf_counter() - start
+        samples = []
+        for _ in range(repeat):
+            column_store.drop_college(college_id)
+            start = time.perf_counter()
+            _risk_stats(db, college_id)
+            samples.append(time.perf_counter() - start)
+    finally:
+        db.close()
+    arr = np.array(samples) * 1000
+    return {
+        "first_ms": round(first * 1000, 3),
+        "repeat": repeat,
+        "p50_ms": round(float(np.percentile(arr, 50)), 3),
+        "max_ms": round(float(arr.max()), 3),
+    }
+
+
+def run(sizes: list[int], row_path_max: int, stats_repeat: int, process_counts: list[int]) -> dict:
+    init_db()
+    results = []
+    for rows in sizes:
+        df = pd.concat(generate_frames(rows, seed=0), ignore_index=True)
+        payload = df.to_csv(index=False).encode()
+        college_id = f"bench_{rows}"
+        results.append({
+            "rows": rows,
+            "compute_risk": bench_compute_risk(df, row_path_max),
+            "pooled_scoring": bench_pooled_scoring(df, process_counts),
+            "upload": bench_upload(college_id, payload, rows),
+            "risk_stats": bench_risk_stats(college_id, stats_repeat),
+        })
+        print(f"{rows} rows done", file=sys.stderr)
+    return {
+        "benchmark": "risk_engine_scales",
+        "commit": _git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "database": os.environ["DATABASE_URL"].split(":", 1)[0],
+        "results": results,
+    }
+
+
+def _throughputs(result: dict) -> dict[tuple[int, str], float]:
+    out = {}
+    for entry in result["results"]:
+        out[(entry["rows"], "compute_risk.row_path")] = entry["compute_risk"]["row_path"]["rows_per_sec"]
+        out[(entry["rows"], "compute_risk.batch")] = entry["compute_risk"]["batch"]["rows_per_sec"]
+        for processes, timing in entry.get("pooled_scoring", {}).items():
+            out[(entry["rows"], f"pooled_scoring.{processes}")] = timing["rows_per_sec"]
+        out[(entry["rows"], "upload")] = entry["upload"]["rows_per_sec"]
+    return out
+
+
+def compare(baseline: dict, current: dict) -> list[dict]:
+    """rows/sec change per (size, metric) present in both results; negative is slower."""
+    before, after = _throughputs(baseline), _throughputs(current)
+    return [
+        {
+            "rows": rows,
+            "metric": metric,
+            "baseline_rows_per_sec": before[(rows, metric)],
+            "rows_per_sec": after[(rows, metric)],
+            "change_pct": round((after[(rows, metric)] / before[(rows, metric)] - 1) * 100, 1),
+        }
+        for rows, metric in sorted(after)
+        if before.get((rows, metric))
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="Comma-separated row counts")
+    parser.add_argument("--row-path-max", type=int, default=100_000, help="Rows timed through per-row compute_risk")
+    parser.add_argument("--stats-repeat", type=int, default=20)
+    parser.add_argument("--processes", default="1,2,4", help="Comma-separated scoring pool sizes")
+    parser.add_argument("--output", type=Path, help="Also write the JSON result here")
+    parser.add_argument("--compare", type=Path, help="Earlier result file to diff rows/sec against")
+    args = parser.parse_args()
+
+    result = run(
+        [int(s) for s in args.sizes.split(",")], args.row_path_max, args.stats_repeat,
+        [int(p) for p in args.processes.split(",")],
+    )
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())
+        result["compare"] = {"baseline_commit": baseline.get("commit"), "changes": compare(baseline, result)}
+    text = json.dumps(result, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
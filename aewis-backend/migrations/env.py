@@ -0,0 +1,45 @@
+"""
+Alembic environment. Runs against app.config.settings.DATABASE_URL, or against
+the connection init_db() passes in config.attributes["connection"].
+"""
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import create_engine
+
+from app.config import settings
+from app.db.base import Base
+
+config = context.config
+connection = config.attributes.get("connection")
+# Only the alembic CLI configures logging; init_db() runs inside the app's
+if config.config_file_name is not None and connection is None:
+    fileConfig(config.config_file_name)
+
+
+def run_migrations(connection) -> None:
+    context.configure(
+        connection=connection,
+        target_metadata=Base.metadata,
+        # SQLite cannot ALTER most constraints in place; batch mode rebuilds the table
+        render_as_batch=connection.dialect.name == "sqlite",
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_offline() -> None:
+    context.configure(url=settings.DATABASE_URL, target_metadata=Base.metadata, literal_binds=True)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+elif connection is not None:
+    run_migrations(connection)
+else:
+    engine = create_engine(settings.DATABASE_URL)
+    with engine.connect() as connection:
+        run_migrations(connection)
+    engine.dispose()
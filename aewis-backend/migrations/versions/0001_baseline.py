@@ -0,0 +1,55 @@
+"""Baseline schema: risks and interventions
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 16:13:34
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "risks",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("college_id", sa.String(64)),
+        sa.Column("student_id", sa.String(64)),
+        sa.Column("subject", sa.String(64)),
+        sa.Column("quiz1", sa.Float()),
+        sa.Column("quiz2", sa.Float()),
+        sa.Column("quiz3", sa.Float()),
+        sa.Column("attendance", sa.Float()),
+        sa.Column("risk_level", sa.String(16)),
+        sa.Column("xp_score", sa.Integer()),
+        sa.Column("reason", sa.String(256), nullable=True),
+        sa.Column("teacher_id", sa.String(64), nullable=True),
+        sa.Column("created_at", sa.DateTime()),
+    )
+    op.create_index("ix_risks_college_id", "risks", ["college_id"])
+    op.create_index("ix_risks_student_id", "risks", ["student_id"])
+    op.create_index("ix_risks_subject", "risks", ["subject"])
+    op.create_table(
+        "interventions",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("college_id", sa.String(64)),
+        sa.Column("student_id", sa.String(64)),
+        sa.Column("teacher_id", sa.String(64)),
+        sa.Column("action", sa.String(64)),
+        sa.Column("success", sa.Boolean()),
+        sa.Column("xp_earned", sa.Integer()),
+        sa.Column("created_at", sa.DateTime()),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("interventions")
+    op.drop_index("ix_risks_subject", table_name="risks")
+    op.drop_index("ix_risks_student_id", table_name="risks")
+    op.drop_index("ix_risks_college_id", table_name="risks")
+    op.drop_table("risks")
@@ -0,0 +1,60 @@
+"""Per-college and per-subject risk summaries
+
+Introduced by user-007 (57f8f0e: per-college summary tables maintained on write).
+Those commits changed the models; this migration shipped later, in fcc815f.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 16:29:17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "college_summaries",
+        sa.Column("college_id", sa.String(64), primary_key=True),
+        sa.Column("total", sa.Integer()),
+        sa.Column("high", sa.Integer()),
+        sa.Column("medium", sa.Integer()),
+        sa.Column("low", sa.Integer()),
+        sa.Column("quiz_avg_sum", sa.Float()),
+        sa.Column("updated_at", sa.DateTime()),
+    )
+    op.create_table(
+        "subject_summaries",
+        sa.Column("college_id", sa.String(64), primary_key=True),
+        sa.Column("subject", sa.String(64), primary_key=True),
+        sa.Column("total", sa.Integer()),
+        sa.Column("high", sa.Integer()),
+        sa.Column("medium", sa.Integer()),
+        sa.Column("low", sa.Integer()),
+    )
+    # Summarize rows already stored; the write paths keep them current from here on
+    counts = (
+        "COUNT(*), "
+        "SUM(CASE WHEN risk_level = 'HIGH' THEN 1 ELSE 0 END), "
+        "SUM(CASE WHEN risk_level = 'MEDIUM' THEN 1 ELSE 0 END), "
+        "SUM(CASE WHEN risk_level = 'LOW' THEN 1 ELSE 0 END)"
+    )
+    op.execute(
+        "INSERT INTO college_summaries (college_id, total, high, medium, low, quiz_avg_sum, updated_at) "
+        f"SELECT college_id, {counts}, SUM((quiz1 + quiz2 + quiz3) / 3.0), CURRENT_TIMESTAMP "
+        "FROM risks GROUP BY college_id"
+    )
+    op.execute(
+        "INSERT INTO subject_summaries (college_id, subject, total, high, medium, low) "
+        f"SELECT college_id, subject, {counts} FROM risks GROUP BY college_id, subject"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("subject_summaries")
+    op.drop_table("college_summaries")
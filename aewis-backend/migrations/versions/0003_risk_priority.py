@@ -0,0 +1,44 @@
+"""Worklist priority on risks
+
+Introduced by user-009 (00e5158: priority-ranked teacher worklist).
+Those commits changed the models; this migration shipped later, in fcc815f.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 16:30:57
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def _clip(expr: str) -> str:
+    return f"CASE WHEN {expr} < 0 THEN 0 WHEN {expr} > 100 THEN 100 ELSE {expr} END"
+
+
+# risk_engine.compute_risk's priority, from the stored three quizzes, attendance and level
+DECLINE = "CASE WHEN COALESCE(quiz1, 0) > 0 THEN (quiz1 - COALESCE(quiz3, 0)) * 100.0 / quiz1 ELSE 0 END"
+PRIORITY = (
+    "CASE risk_level WHEN 'HIGH' THEN 2000 WHEN 'MEDIUM' THEN 1000 ELSE 0 END"
+    f" + {_clip(DECLINE)} * 5"
+    f" + {_clip('100 - COALESCE(attendance, 0)')} * 4"
+)
+
+
+def upgrade() -> None:
+    op.add_column("risks", sa.Column("priority", sa.Float()))
+    op.execute(f"UPDATE risks SET priority = ROUND(CAST({PRIORITY} AS NUMERIC), 2)")
+    op.create_index(
+        "ix_risks_worklist", "risks", ["college_id", "teacher_id", sa.text("priority DESC"), "id"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_risks_worklist", table_name="risks")
+    with op.batch_alter_table("risks") as batch:
+        batch.drop_column("priority")
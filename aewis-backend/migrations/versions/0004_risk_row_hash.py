@@ -0,0 +1,29 @@
+"""Row hashes for incremental uploads
+
+Introduced by user-011 (e9c9e0f: incremental re-upload mode).
+Those commits changed the models; this migration shipped later, in fcc815f.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 16:33:51
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # NULL never matches a computed hash, so an incremental upload rewrites older rows once
+    op.add_column("risks", sa.Column("row_hash", sa.String(16), nullable=True))
+    op.create_index("ix_risks_college_student_subject", "risks", ["college_id", "student_id", "subject"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_risks_college_student_subject", table_name="risks")
+    with op.batch_alter_table("risks") as batch:
+        batch.drop_column("row_hash")
@@ -0,0 +1,56 @@
+"""Dataset versions: risks.dataset_version and college_datasets
+
+Introduced by user-012 (6aeab2c: staged dataset versions; a7101b8: write lease
+columns writer and writer_expires).
+Those commits changed the models; this migration shipped later, in fcc815f.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 16:35:30
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Existing rows become version 0, which colleges without a college_datasets row publish
+    op.add_column("risks", sa.Column("dataset_version", sa.Integer(), nullable=False, server_default="0"))
+    op.drop_index("ix_risks_worklist", table_name="risks")
+    op.drop_index("ix_risks_college_student_subject", table_name="risks")
+    op.create_index("ix_risks_college_version", "risks", ["college_id", "dataset_version"])
+    op.create_index(
+        "ix_risks_worklist",
+        "risks",
+        ["college_id", "dataset_version", "teacher_id", sa.text("priority DESC"), "id"],
+    )
+    op.create_index(
+        "ix_risks_college_student_subject", "risks", ["college_id", "dataset_version", "student_id", "subject"]
+    )
+    op.create_table(
+        "college_datasets",
+        sa.Column("college_id", sa.String(64), primary_key=True),
+        sa.Column("active_version", sa.Integer(), nullable=False),
+        sa.Column("next_version", sa.Integer(), nullable=False),
+        sa.Column("published_at", sa.DateTime(), nullable=True),
+        sa.Column("writer", sa.String(32), nullable=True),
+        sa.Column("writer_expires", sa.DateTime(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("college_datasets")
+    op.drop_index("ix_risks_college_student_subject", table_name="risks")
+    op.drop_index("ix_risks_worklist", table_name="risks")
+    op.drop_index("ix_risks_college_version", table_name="risks")
+    op.create_index("ix_risks_college_student_subject", "risks", ["college_id", "student_id", "subject"])
+    op.create_index(
+        "ix_risks_worklist", "risks", ["college_id", "teacher_id", sa.text("priority DESC"), "id"]
+    )
+    with op.batch_alter_table("risks") as batch:
+        batch.drop_column("dataset_version")
@@ -0,0 +1,38 @@
+"""Risk snapshots per upload
+
+Introduced by user-013 (f7f6bc6: risk snapshots per upload).
+Those commits changed the models; this migration shipped later, in fcc815f.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 16:37:16
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "risk_snapshots",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("college_id", sa.String(64), nullable=False),
+        sa.Column("subject", sa.String(64), nullable=True),
+        sa.Column("taken_at", sa.DateTime(), nullable=False),
+        sa.Column("total", sa.Integer()),
+        sa.Column("high", sa.Integer()),
+        sa.Column("medium", sa.Integer()),
+        sa.Column("low", sa.Integer()),
+        sa.Column("health_score", sa.Float(), nullable=True),
+    )
+    op.create_index("ix_risk_snapshots_series", "risk_snapshots", ["college_id", "subject", "taken_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_risk_snapshots_series", table_name="risk_snapshots")
+    op.drop_table("risk_snapshots")
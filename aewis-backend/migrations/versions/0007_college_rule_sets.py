@@ -0,0 +1,30 @@
+"""Per-college risk rule sets
+
+Introduced by user-019 (3484951: per-college risk rule sets).
+Those commits changed the models; this migration shipped later, in fcc815f.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 16:47:14
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "college_rule_sets",
+        sa.Column("college_id", sa.String(64), primary_key=True),
+        sa.Column("config", sa.JSON(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("college_rule_sets")
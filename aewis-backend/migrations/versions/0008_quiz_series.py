@@ -0,0 +1,30 @@
+"""Variable-length quiz series: risks.extra_quizzes and risks.quiz_avg
+
+Introduced by user-020 (8397126: variable-length quiz series).
+Those commits changed the models; this migration shipped later, in fcc815f.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 16:50:53
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("risks", sa.Column("extra_quizzes", sa.LargeBinary(), nullable=True))
+    op.add_column("risks", sa.Column("quiz_avg", sa.Float()))
+    # Rows stored so far have exactly three quizzes
+    op.execute("UPDATE risks SET quiz_avg = (quiz1 + quiz2 + quiz3) / 3.0")
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("risks") as batch:
+        batch.drop_column("quiz_avg")
+        batch.drop_column("extra_quizzes")
@@ -0,0 +1,36 @@
+"""Data versions: college_datasets.data_version and college_uploads
+
+Introduced by user-008 (666d00a: college_datasets.data_version keying the caches)
+and user-024 (f27b5ea, d4bd817: college_uploads for identical uploads).
+Those commits changed the models; this migration shipped later, in fcc815f.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18 17:03:04
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("college_datasets", sa.Column("data_version", sa.Integer(), nullable=False, server_default="0"))
+    op.create_table(
+        "college_uploads",
+        sa.Column("college_id", sa.String(64), primary_key=True),
+        sa.Column("upload_key", sa.String(64), nullable=False),
+        sa.Column("data_version", sa.Integer(), nullable=False),
+        sa.Column("response", sa.LargeBinary(), nullable=False),
+        sa.Column("uploaded_at", sa.DateTime(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("college_uploads")
+    with op.batch_alter_table("college_datasets") as batch:
+        batch.drop_column("data_version")
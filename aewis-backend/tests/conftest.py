@@ -11,6 +11,10 @@ sys.path.insert(0, str(root))
 
 os.environ["DATABASE_URL"] = "sqlite:///./test_aewis.db"
 
+# Start from an empty database; init_db migrates it to the current schema
+for suffix in ("", "-wal", "-shm"):
+    Path(f"test_aewis.db{suffix}").unlink(missing_ok=True)
+
 from app.main import app
 from app.db.session import init_db
 
@@ -29,3 +33,24 @@ def demo_csv_path():
         from utils.data_generator import write_demo_csv
         write_demo_csv(p, 512)
     return p
+
+
+@pytest.fixture
+def upload(client):
+    """POST a file to /upload-csv: upload(college_id, payload, filename, **query).
+
+    `payload` is CSV text, file bytes or a path; the format follows `filename`.
+    """
+    def post(college_id: str, payload, filename: str = "upload.csv", **query):
+        if isinstance(payload, Path):
+            payload = payload.read_bytes()
+        elif isinstance(payload, str):
+            payload = payload.encode()
+        return client.post(
+            "/api/v1/upload-csv",
+            params=query,
+            files={"file": (filename, payload, "application/octet-stream")},
+            data={"college_id": college_id},
+        )
+
+    return post
@@ -5,6 +5,12 @@ import pytest
 root = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(root))
 
+HEADER = "student_id,subject,quiz1,quiz2,quiz3,attendance\n"
+
+
+def _csv(rows, header=HEADER):
+    return header + "".join(f"{r}\n" for r in rows)
+
 
 def test_health(client):
     r = client.get("/health")
@@ -85,3 +91,596 @@ def test_teacher_students(client, demo_csv_path):
     body = r.json()
     assert "students" in body
     assert body["teacher_id"] == "T001_Sharma"
+
+
+def test_teacher_assignments_from_upload(client):
+    csv = (
+        "student_id,subject,teacher_id,quiz1,quiz2,quiz3,attendance\n"
+        "S1,Math,T1,80,70,50,60\n"
+        "S2,Math,T2,75,78,76,88\n"
+        "S3,Physics,T1,75,78,76,88\n"
+        "S4,Physics,,75,78,76,88\n"
+    )
+    client.post(
+        "/api/v1/upload-csv",
+        files={"file": ("roster.csv", csv.encode(), "text/csv")},
+        data={"college_id": "roster_college"},
+    )
+    body = client.get("/api/v1/teacher/T1/students", params={"college_id": "roster_college"}).json()
+    assert [s["student_id"] for s in body["students"]] == ["S1", "S3"]
+    body = client.get("/api/v1/teacher/T2/students", params={"college_id": "roster_college"}).json()
+    assert [s["student_id"] for s in body["students"]] == ["S2"]
+
+
+def test_numeric_teacher_ids_with_blanks(client, upload):
+    import io
+
+    pd = pytest.importorskip("pandas")
+    pytest.importorskip("pyarrow")
+
+    csv = (
+        "student_id,subject,teacher_id,quiz1,quiz2,quiz3,attendance\n"
+        "S1,Math,12,80,70,50,60\n"
+        "S2,Math,,75,78,76,88\n"
+        "S3,Physics,007,75,78,76,88\n"
+    )
+    parquet = io.BytesIO()
+    pd.read_csv(io.StringIO(csv)).to_parquet(parquet)  # teacher_id as float64 with a null
+    # CSV keeps the ID text as written; a numeric Parquet column can only give 7
+    for name, payload, padded in (("roster.csv", csv.encode(), "007"), ("roster.parquet", parquet.getvalue(), "7")):
+        assert upload("numeric_teachers", payload, name).status_code == 200
+        for teacher_id, expected in (("12", ["S1"]), (padded, ["S3"])):
+            body = client.get(f"/api/v1/teacher/{teacher_id}/students", params={"college_id": "numeric_teachers"}).json()
+            assert [s["student_id"] for s in body["students"]] == expected, (name, teacher_id)
+
+
+def test_upload_csv_stream_matches_buffered(client, demo_csv_path, monkeypatch):
+    from app.config import settings
+    with open(demo_csv_path, "rb") as f:
+        buffered = client.post(
+            "/api/v1/upload-csv",
+            files={"file": ("demo_data.csv", f, "text/csv")},
+            data={"college_id": "demo"},
+        ).json()
+    monkeypatch.setattr(settings, "UPLOAD_CHUNK_ROWS", 100)
+    monkeypatch.setattr(settings, "UPLOAD_STREAM_HEATMAP_ROWS", 150)
+    with open(demo_csv_path, "rb") as f:
+        r = client.post(
+            "/api/v1/upload-csv?stream=true",
+            files={"file": ("demo_data.csv", f, "text/csv")},
+            data={"college_id": "demo"},
+        )
+    assert r.status_code == 200
+    body = r.json()
+    assert body["summary"] == buffered["summary"]
+    assert body["top_risks"] == buffered["top_risks"]
+    assert body["heatmap_matrix"] == buffered["heatmap_matrix"][:150]
+
+
+def test_upload_csv_missing_column(client):
+    r = client.post(
+        "/api/v1/upload-csv?stream=true",
+        files={"file": ("bad.csv", b"student_id,subject,quiz1\nS1,Math,50\n", "text/csv")},
+        data={"college_id": "bad_college"},
+    )
+    assert r.status_code == 400
+    assert r.json()["detail"] == "Missing column: quiz2"
+
+
+def test_upload_formats_match_csv(upload, demo_csv_path):
+    import gzip
+    import io
+    import zipfile
+
+    pd = pytest.importorskip("pandas")
+    pa = pytest.importorskip("pyarrow")
+    import pyarrow.ipc
+    import pyarrow.parquet as pq
+
+    df = pd.read_csv(demo_csv_path)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+
+    def encode(write):
+        buf = io.BytesIO()
+        write(buf)
+        return buf.getvalue()
+
+    def arrow_file(buf):
+        # Dictionary-encoded strings, as ERP exports often write them
+        encoded = table.set_column(1, "subject", table.column("subject").dictionary_encode())
+        with pa.ipc.new_file(buf, encoded.schema) as writer:
+            writer.write_table(encoded, max_chunksize=100)
+
+    def arrow_stream(buf):
+        with pa.ipc.new_stream(buf, table.schema) as writer:
+            writer.write_table(table)
+
+    def zipped(buf):
+        with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr("export/students.csv", demo_csv_path.read_bytes())
+
+    payloads = {
+        "students.parquet": encode(lambda buf: pq.write_table(table, buf, row_group_size=100)),
+        "students.arrow": encode(arrow_file),
+        "students.feather": encode(arrow_stream),
+        "students.csv.gz": gzip.compress(demo_csv_path.read_bytes()),
+        "students.zip": encode(zipped),
+    }
+
+    expected = upload("formats", demo_csv_path, "students.csv").json()
+    for name, payload in payloads.items():
+        for stream in (False, True):
+            body = upload("formats", payload, name, stream=stream).json()
+            assert body["summary"] == expected["summary"], name
+            assert body["heatmap_matrix"][:50] == expected["heatmap_matrix"][:50], name
+
+    # Same required-column validation for every format
+    missing = encode(lambda buf: pq.write_table(table.drop(["attendance"]), buf))
+    r = upload("formats", missing, "students.parquet")
+    assert r.status_code == 400 and "attendance" in r.json()["detail"]
+    assert upload("formats", b"not a zip", "students.zip").status_code == 400
+    assert upload("formats", b"not parquet", "students.parquet").status_code == 400
+    assert upload("formats", b"", "students.xlsx").status_code == 400
+
+
+def test_identical_upload_short_circuits(client, upload, demo_csv_path):
+    import functools
+    import time
+    from app.db.datasets import active_version
+    from app.db.session import SessionLocal
+
+    resend = functools.partial(upload, "identical", demo_csv_path, "demo_data.csv")
+
+    def version():
+        db = SessionLocal()
+        try:
+            return active_version(db, "identical")
+        finally:
+            db.close()
+
+    first = resend()
+    assert "X-Upload-Identical" not in first.headers
+    published = version()
+
+    again = resend()
+    assert again.headers["X-Upload-Identical"] == "true"
+    assert again.json() == first.json()
+    assert version() == published
+    assert len(client.get("/api/v1/risk-history/identical").json()["taken_at"]) == 1
+
+    # Async uploads never carry the per-row heatmap, so they match a heatmap=false upload
+    quiet = resend(heatmap=False)
+    assert quiet.json()["heatmap_matrix"] == [] and version() == published + 1
+    published = version()
+    job = resend(**{"async": True}).json()
+    for _ in range(50):
+        status = client.get(f"/api/v1/jobs/{job['job_id']}").json()
+        if status["phase"] in ("done", "failed"):
+            break
+        time.sleep(0.05)
+    assert status["result"] == quiet.json()
+    assert version() == published
+
+    # force, another mode or changed rules process the file again
+    forced = resend(force=True)
+    assert "X-Upload-Identical" not in forced.headers and version() == published + 1
+    assert "X-Upload-Identical" not in resend(mode="incremental").headers
+    assert resend(mode="incremental").headers["X-Upload-Identical"] == "true"
+    rules = client.get("/api/v1/rules/identical").json()
+    rules["high_at"] = 1
+    assert client.put("/api/v1/rules/identical", json=rules).status_code == 200
+    assert "X-Upload-Identical" not in resend(mode="incremental").headers
+
+    # An intervention rewrites teacher_id in place; re-sending the export restores the file's assignments
+    resend()
+    assert resend().headers["X-Upload-Identical"] == "true"
+    client.post(
+        "/api/v1/interventions",
+        json={"college_id": "identical", "teacher_id": "T999_Moved", "student_ids": ["S001"]},
+    )
+    assert "X-Upload-Identical" not in resend().headers
+    moved = client.get("/api/v1/teacher/T999_Moved/students", params={"college_id": "identical"}).json()
+    assert moved["students"] == []
+
+
+def test_identical_upload_record_omits_heatmap(upload, demo_csv_path, monkeypatch):
+    import json
+    import zlib
+    from app.config import settings
+    from app.db.base import CollegeUpload
+    from app.db.session import SessionLocal
+
+    monkeypatch.setattr(settings, "UPLOAD_CHUNK_ROWS", 100)
+    monkeypatch.setattr(settings, "UPLOAD_STREAM_HEATMAP_ROWS", 150)
+    for query in ({}, {"stream": True}):
+        first = upload("identical_record", demo_csv_path, **query)
+        again = upload("identical_record", demo_csv_path, **query)
+        assert again.headers["X-Upload-Identical"] == "true"
+        assert again.json() == first.json() and len(first.json()["heatmap_matrix"]) > 0
+
+        db = SessionLocal()
+        try:
+            record = json.loads(zlib.decompress(db.get(CollegeUpload, "identical_record").response))
+        finally:
+            db.close()
+        assert "heatmap_matrix" not in record["response"]
+        assert record["heatmap_rows"] == len(first.json()["heatmap_matrix"])
+
+
+def test_upload_csv_async_job(client, demo_csv_path):
+    import time
+    with open(demo_csv_path, "rb") as f:
+        r = client.post(
+            "/api/v1/upload-csv?async=true&stream=true",
+            files={"file": ("demo_data.csv", f, "text/csv")},
+            data={"college_id": "demo"},
+        )
+    assert r.status_code == 202
+    accepted = r.json()
+    assert accepted["college_id"] == "demo_001"
+
+    deadline = time.time() + 30
+    while True:
+        status = client.get(accepted["status_url"]).json()
+        if status["phase"] in ("done", "failed") or time.time() > deadline:
+            break
+        time.sleep(0.05)
+    assert status["phase"] == "done", status
+    assert status["rows_processed"] == status["result"]["summary"]["total_students"] > 0
+    assert status["rows_per_sec"] > 0
+    assert status["result"]["heatmap_matrix"] == []
+
+
+def test_upload_csv_async_removes_copy_on_error(client, demo_csv_path, monkeypatch, tmp_path):
+    import tempfile
+    from app.api.v1.endpoints import upload
+
+    def fail(*args):
+        raise RuntimeError("database unavailable")
+
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    monkeypatch.setattr(upload, "identical_upload", fail)
+    with open(demo_csv_path, "rb") as f, pytest.raises(RuntimeError):
+        client.post(
+            "/api/v1/upload-csv?async=true",
+            files={"file": ("demo_data.csv", f, "text/csv")},
+            data={"college_id": "demo"},
+        )
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_job_not_found(client):
+    r = client.get("/api/v1/jobs/does-not-exist")
+    assert r.status_code == 404
+
+
+def test_finished_jobs_pruned_when_polled():
+    import time
+    from app.core.jobs import JobManager
+
+    jobs = JobManager(max_workers=1, ttl_seconds=0)
+    try:
+        job = jobs.submit("demo_001", lambda job: "ok")
+        while not job.finished:
+            time.sleep(0.01)
+        time.sleep(0.01)
+        assert jobs.get(job.id) is None
+    finally:
+        jobs.shutdown()
+
+
+def test_risk_stats_matches_upload_summary(client, demo_csv_path):
+    with open(demo_csv_path, "rb") as f:
+        upload = client.post(
+            "/api/v1/upload-csv",
+            files={"file": ("demo_data.csv", f, "text/csv")},
+            data={"college_id": "demo"},
+        ).json()
+    body = client.get("/api/v1/risk-stats/demo_001").json()
+    counts = {d["level"]: d["count"] for d in body["charts"]["risk_distribution"]}
+    summary = upload["summary"]
+    assert counts == {"HIGH": summary["high_risk"], "MEDIUM": summary["medium_risk"], "LOW": summary["low_risk"]}
+    crisis = sorted(s for s, pct in body["charts"]["subject_risks"].items() if pct > 30)
+    assert crisis == summary["crisis_subjects"]
+    assert len(body["charts"]["decline_trends"]) == 50
+    assert body["heatmap_matrix"][0][:4] == upload["heatmap_matrix"][0][:4]
+
+
+def test_risk_stats_unknown_college(client):
+    r = client.get("/api/v1/risk-stats/no_such_college")
+    assert r.status_code == 404
+
+
+def test_risk_stats_etag_and_not_modified(client, demo_csv_path):
+    with open(demo_csv_path, "rb") as f:
+        client.post(
+            "/api/v1/upload-csv",
+            files={"file": ("demo_data.csv", f, "text/csv")},
+            data={"college_id": "demo"},
+        )
+    first = client.get("/api/v1/risk-stats/demo_001")
+    etag = first.headers["etag"]
+    again = client.get("/api/v1/risk-stats/demo_001", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.headers["etag"] == etag
+
+    client.post(
+        "/api/v1/interventions",
+        json={"college_id": "demo_001", "teacher_id": "T001_Sharma", "student_ids": ["S101"]},
+    )
+    after_write = client.get("/api/v1/risk-stats/demo_001", headers={"If-None-Match": etag})
+    assert after_write.status_code == 200
+    assert after_write.headers["etag"] != etag
+    assert after_write.json() == first.json()
+
+
+def test_cached_reads_follow_writes_from_other_processes(client):
+    from sqlalchemy import update
+    from app.db.base import Risk
+    from app.db.session import SessionLocal
+    from app.db.summary import rebuild_summary
+
+    csv = "student_id,subject,quiz1,quiz2,quiz3,attendance\nS1,Math,80,70,50,60\nS2,Math,75,78,76,88\n"
+    client.post("/api/v1/upload-csv", files={"file": ("a.csv", csv.encode())}, data={"college_id": "elsewhere"})
+    first = client.get("/api/v1/risk-stats/elsewhere")
+    assert client.get("/api/v1/heatmap/elsewhere").json()["cells"]["high"] == [1, 0]
+
+    # What the summary CLI or another worker does: write through its own session,
+    # without touching this process's caches
+    db = SessionLocal()
+    try:
+        db.execute(update(Risk).where(Risk.college_id == "elsewhere").values(risk_level="HIGH"))
+        rebuild_summary(db, "elsewhere")
+        db.commit()
+    finally:
+        db.close()
+
+    etag = first.headers["etag"]
+    again = client.get("/api/v1/risk-stats/elsewhere", headers={"If-None-Match": etag})
+    assert again.status_code == 200 and again.headers["etag"] != etag
+    assert again.json()["charts"]["risk_distribution"][0] == {"level": "HIGH", "count": 2}
+    assert client.get("/api/v1/heatmap/elsewhere").json()["cells"]["high"] == [2]
+
+
+def test_teacher_worklist_priority_keyset_pages(client, demo_csv_path):
+    with open(demo_csv_path, "rb") as f:
+        client.post(
+            "/api/v1/upload-csv",
+            files={"file": ("demo_data.csv", f, "text/csv")},
+            data={"college_id": "worklist"},
+        )
+    student_ids = [f"S{i:03d}" for i in range(1, 31)]
+    client.post(
+        "/api/v1/interventions",
+        json={"college_id": "worklist", "teacher_id": "T009_Rao", "student_ids": student_ids},
+    )
+
+    seen, cursor = [], None
+    while True:
+        params = {"college_id": "worklist", "limit": 7}
+        if cursor:
+            params["cursor"] = cursor
+        body = client.get("/api/v1/teacher/T009_Rao/students", params=params).json()
+        seen.extend(body["students"])
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+
+    assert sorted(s["student_id"] for s in seen) == student_ids
+    priorities = [s["priority"] for s in seen]
+    assert priorities == sorted(priorities, reverse=True)
+    severity = {"HIGH": 2, "MEDIUM": 1, "LOW": 0}
+    levels = [severity[s["risk_level"]] for s in seen]
+    assert levels == sorted(levels, reverse=True)
+
+    other = client.get("/api/v1/teacher/T404_Nobody/students", params={"college_id": "worklist"}).json()
+    assert other["students"] == []
+
+
+def test_incremental_upload_diffs_rows(client, upload):
+    def weekly(rows, mode):
+        return upload("weekly", _csv(rows), mode=mode).json()
+
+    weekly(["S1,Math,80,70,50,60", "S2,Math,75,78,76,88", "S3,Physics,75,78,76,88"], "replace")
+    body = weekly(["S1,Math,80,70,50,60", "S2,Math,30,30,30,60", "S4,Physics,75,78,76,88"], "incremental")
+    assert body["changes"] == {"inserted": 1, "updated": 1, "deleted": 1, "unchanged": 1}
+    assert [row[0] for row in body["heatmap_matrix"]] == ["S2", "S4"]
+
+    full = weekly(["S1,Math,80,70,50,60", "S2,Math,30,30,30,60", "S4,Physics,75,78,76,88"], "replace")
+    assert body["summary"] == full["summary"]
+
+    again = weekly(["S1,Math,80,70,50,60", "S2,Math,30,30,30,60", "S4,Physics,75,78,76,88"], "incremental")
+    assert again["changes"] == {"inserted": 0, "updated": 0, "deleted": 0, "unchanged": 3}
+    assert again["summary"] == full["summary"]
+
+    stats = client.get("/api/v1/risk-stats/weekly").json()
+    counts = {d["level"]: d["count"] for d in stats["charts"]["risk_distribution"]}
+    assert counts == {"HIGH": full["summary"]["high_risk"], "MEDIUM": full["summary"]["medium_risk"], "LOW": full["summary"]["low_risk"]}
+
+    from app.db.session import SessionLocal
+    from app.db.summary import check_summary
+    db = SessionLocal()
+    try:
+        assert check_summary(db, "weekly") == []
+    finally:
+        db.close()
+
+
+def test_incremental_upload_restores_reassigned_teacher(client, upload):
+    csv = _csv(["S1,Math,T1,80,70,50,60", "S2,Math,T1,75,78,76,88"], "student_id,subject,teacher_id,quiz1,quiz2,quiz3,attendance\n")
+
+    def worklist(teacher_id):
+        body = client.get(f"/api/v1/teacher/{teacher_id}/students", params={"college_id": "reassigned"}).json()
+        return [s["student_id"] for s in body["students"]]
+
+    for mode in ("replace", "incremental"):
+        upload("reassigned", csv, force=True)
+        client.post(
+            "/api/v1/interventions",
+            json={"college_id": "reassigned", "teacher_id": "T2", "student_ids": ["S1"]},
+        )
+        assert worklist("T2") == ["S1"]
+        body = upload("reassigned", csv, mode=mode, force=True).json()
+        if mode == "incremental":
+            assert body["changes"] == {"inserted": 0, "updated": 1, "deleted": 0, "unchanged": 1}
+        assert worklist("T2") == [] and sorted(worklist("T1")) == ["S1", "S2"], mode
+
+
+def test_upload_variable_quiz_series(client, upload):
+    header = "student_id,subject,quiz1,quiz2,quiz3,quiz4,quiz5,quiz6,attendance\n"
+    r = upload("quizzes", header + "S1,Math,60,55,50,45,40,35,90\nS2,Math,60,60,60,60,60,60,90\n")
+    assert r.status_code == 200
+    assert r.json()["summary"]["medium_risk"] == 1
+
+    # Only quiz5 differs: the row is re-scored from the stored extra quizzes
+    body = upload("quizzes", header + "S1,Math,60,55,50,45,40,35,90\nS2,Math,60,60,60,60,20,60,90\n", mode="incremental").json()
+    assert body["changes"] == {"inserted": 0, "updated": 1, "deleted": 0, "unchanged": 1}
+
+    stats = client.get("/api/v1/risk-stats/quizzes").json()
+    assert [row[4] for row in stats["heatmap_matrix"]] == pytest.approx([47.5, 160 / 3])
+
+    gap = upload("quizzes", "student_id,subject,quiz1,quiz2,quiz3,quiz5,attendance\nS1,Math,60,55,50,45,90\n")
+    assert gap.status_code == 400
+    assert "quiz4" in gap.json()["detail"]
+
+
+def test_incremental_upload_rejects_duplicate_keys(upload):
+    r = upload("dup_college", _csv(["S1,Math,80,70,50,60", "S1,Math,70,70,70,90"]), mode="incremental")
+    assert r.status_code == 400
+
+
+def test_upload_rejects_non_numeric_values(upload):
+    for mode in ("replace", "incremental"):
+        for row in ("S2,Math,x,50,50,90", "S2,Math,50,50,50,high"):
+            r = upload("bad_values", _csv(["S1,Math,50,50,50,90", row]), mode=mode)
+            assert r.status_code == 400, (mode, row)
+            assert r.json()["detail"].startswith("Invalid CSV")
+
+
+def test_risk_history_and_trend(client, upload):
+    upload("history", _csv(["S1,Math,80,70,50,60", "S2,Math,75,78,76,88"]))
+    assert client.get("/api/v1/risk-stats/history").json()["kpis"]["risk_trend"] == 0.0
+    upload("history", _csv(["S1,Math,80,70,50,60", "S2,Math,30,30,30,60"]))
+    assert client.get("/api/v1/risk-stats/history").json()["kpis"]["risk_trend"] == 100.0
+
+    series = client.get("/api/v1/risk-history/history").json()
+    assert series["high"] == [1, 2]
+    assert series["total"] == [2, 2]
+    assert len(series["taken_at"]) == 2 and series["health_score"][0] is not None
+
+    math = client.get("/api/v1/risk-history/history", params={"subject": "Math", "limit": 1}).json()
+    assert math["subject"] == "Math" and math["high"] == [2] and math["health_score"] == [None]
+
+    empty = client.get("/api/v1/risk-history/history", params={"since": "2999-01-01T00:00:00"}).json()
+    assert empty["taken_at"] == []
+
+
+def test_heatmap_cells_and_drill_down(client, demo_csv_path):
+    with open(demo_csv_path, "rb") as f:
+        upload = client.post(
+            "/api/v1/upload-csv",
+            files={"file": ("demo.csv", f, "text/csv")},
+            data={"college_id": "heatmap"},
+            params={"heatmap": "false"},
+        ).json()
+    assert upload["heatmap_matrix"] == []
+    summary = upload["summary"]
+
+    body = client.get("/api/v1/heatmap/heatmap").json()
+    assert body["buckets"] == ["HIGH", "MEDIUM", "LOW"]
+    cells = body["cells"]
+    assert sum(cells["count"]) == body["total"] == summary["total_students"]
+    per_level = [0, 0, 0]
+    for bucket, count, high in zip(cells["bucket"], cells["count"], cells["high"]):
+        per_level[bucket] += count
+        assert high == (count if bucket == 0 else 0)
+    assert per_level == [summary["high_risk"], summary["medium_risk"], summary["low_risk"]]
+
+    health = client.get("/api/v1/heatmap/heatmap", params={"by": "health", "width": 25}).json()
+    assert health["buckets"] == ["0-25", "25-50", "50-75", "75-100"]
+    assert sum(health["cells"]["high"]) == summary["high_risk"]
+    i = max(range(len(health["cells"]["count"])), key=health["cells"]["count"].__getitem__)
+    subject = health["subjects"][health["cells"]["subject"][i]]
+    bucket = health["buckets"][health["cells"]["bucket"][i]]
+    lo, hi = map(int, bucket.split("-"))
+
+    seen, cursor = [], None
+    while True:
+        params = {"by": "health", "width": 25, "subject": subject, "bucket": bucket, "limit": 3}
+        if cursor:
+            params["cursor"] = cursor
+        page = client.get("/api/v1/heatmap/heatmap/rows", params=params).json()
+        assert page["total"] == health["cells"]["count"][i]
+        seen.extend(zip(page["student_id"], page["quiz_avg"], page["priority"]))
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert len(seen) == health["cells"]["count"][i]
+    assert all(lo <= avg <= hi for _, avg, _ in seen)
+    priorities = [p for _, _, p in seen]
+    assert priorities == sorted(priorities, reverse=True)
+
+    params = {"subject": subject, "bucket": "SEVERE"}
+    assert client.get("/api/v1/heatmap/heatmap/rows", params=params).status_code == 400
+    params = {"subject": "Astrology", "bucket": "HIGH"}
+    assert client.get("/api/v1/heatmap/heatmap/rows", params=params).status_code == 404
+    assert client.get("/api/v1/heatmap/nonexistent_college").status_code == 404
+
+
+def test_simulate_thresholds(client, demo_csv_path):
+    with open(demo_csv_path, "rb") as f:
+        upload = client.post(
+            "/api/v1/upload-csv", files={"file": ("demo.csv", f, "text/csv")}, data={"college_id": "simulate"}
+        ).json()["summary"]
+
+    r = client.post(
+        "/api/v1/simulate/simulate",
+        json={"scenarios": [{}, {"attendance": 90, "decline": 5}, {"attendance": 0, "decline": 100, "average": 0}]},
+    )
+    assert r.status_code == 200
+    current, strict, lenient = r.json()["results"]
+    assert r.json()["total_students"] == upload["total_students"]
+    assert current["changed"] == 0
+    assert (current["high_risk"], current["medium_risk"], current["low_risk"]) == (
+        upload["high_risk"], upload["medium_risk"], upload["low_risk"]
+    )
+    assert current["crisis_subjects"] == upload["crisis_subjects"]
+    assert strict["high_risk"] > current["high_risk"]
+    assert lenient["low_risk"] == upload["total_students"] and lenient["crisis_subjects"] == []
+
+    stats = client.get("/api/v1/risk-stats/simulate").json()
+    assert {d["level"]: d["count"] for d in stats["charts"]["risk_distribution"]}["HIGH"] == upload["high_risk"]
+
+
+def test_simulate_validation(client):
+    assert client.post("/api/v1/simulate/no_such_college", json={"scenarios": [{}]}).status_code == 404
+    assert client.post("/api/v1/simulate/no_such_college", json={"scenarios": []}).status_code == 422
+    assert client.post("/api/v1/simulate/x", json={"scenarios": [{"attendance": 150}]}).status_code == 422
+
+
+def test_college_rules_apply_to_uploads_and_simulation(client, upload):
+    csv = _csv(["S1,Math,80,80,80,70", "S2,Math,80,80,80,60"])
+
+    defaults = client.get("/api/v1/rules/rules").json()
+    assert [r["value"] for r in defaults["rules"]] == [75, 15, 40]
+    assert upload("rules", csv).json()["summary"]["medium_risk"] == 2
+
+    eligibility = {
+        "rules": [{"name": "Eligibility", "metric": "attendance", "op": "<", "value": 65, "weight": 2}],
+        "high_at": 2,
+        "medium_at": 1,
+    }
+    assert client.put("/api/v1/rules/rules", json=eligibility).status_code == 200
+    assert client.get("/api/v1/rules/rules").json()["rules"][0]["name"] == "Eligibility"
+
+    # Unchanged rows are re-scored by an incremental upload once the rules change
+    body = upload("rules", csv, mode="incremental").json()
+    assert body["changes"]["updated"] == 2
+    assert (body["summary"]["high_risk"], body["summary"]["low_risk"]) == (1, 1)
+    assert body["top_risks"][0]["reason"] == "Eligibility"
+
+    sim = client.post("/api/v1/simulate/rules", json={"scenarios": [{}, {"attendance": 75}]}).json()["results"]
+    assert sim[0]["changed"] == 0 and sim[1]["high_risk"] == 2
+
+    bad = dict(eligibility, medium_at=3)
+    assert client.put("/api/v1/rules/rules", json=bad).status_code == 422
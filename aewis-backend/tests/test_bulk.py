@@ -0,0 +1,43 @@
+import sys
+from pathlib import Path
+
+root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(root))
+
+from app.db.base import Risk
+from app.db.bulk import bulk_insert_risks
+from app.db.session import SessionLocal
+
+
+def test_bulk_insert_risks_chunks():
+    db = SessionLocal()
+    try:
+        db.query(Risk).filter(Risk.college_id == "bulk_test").delete()
+        n = 25
+        stats = bulk_insert_risks(
+            db,
+            "bulk_test",
+            {
+                "student_id": [f"S{i:03d}" for i in range(n)],
+                "subject": ["Math"] * n,
+                "quiz1": [50.0] * n,
+                "quiz2": [50.0] * n,
+                "quiz3": [50.0] * n,
+                "attendance": [80.0] * n,
+                "risk_level": ["LOW"] * n,
+                "xp_score": [500] * n,
+                "reason": ["OK"] * n,
+                "priority": [0.0] * n,
+            },
+            chunk_size=10,
+        )
+        db.commit()
+        assert stats.rows == n
+        assert stats.rows_per_sec > 0
+        rows = db.query(Risk).filter(Risk.college_id == "bulk_test").all()
+        assert len(rows) == n
+        assert rows[0].created_at is not None
+        db.query(Risk).filter(Risk.college_id == "bulk_test").delete()
+        db.commit()
+    finally:
+        db.close()
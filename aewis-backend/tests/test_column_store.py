@@ -0,0 +1,77 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.core.cache import ColumnStore, column_store
+
+
+def _columns(nbytes):
+    return SimpleNamespace(nbytes=nbytes)
+
+
+def test_column_store_lru_budget_and_version():
+    store = ColumnStore(max_bytes=100)
+    loads = []
+
+    def loader(nbytes):
+        def load():
+            loads.append(nbytes)
+            return _columns(nbytes)
+        return load
+
+    a = store.get("lru_a", 1, loader(40))
+    assert store.get("lru_a", 1, loader(40)) is a and loads == [40]
+    store.get("lru_b", 1, loader(40))
+    store.get("lru_a", 1, loader(40))  # a is now most recently used
+    store.get("lru_c", 1, loader(40))  # evicts b
+    assert store.size == 80
+    store.get("lru_b", 1, loader(40))
+    assert loads == [40, 40, 40, 40]
+
+    store.get("lru_big", 1, loader(500))  # larger than the budget: served, not kept
+    assert store.size == 80
+
+    store.get("lru_a", 2, loader(40))  # a write moved the college to version 2
+    assert loads[-1] == 40 and len(loads) == 6
+
+
+def test_college_columns_follow_uploads(upload):
+    from app.db.columns import college_columns
+    from app.db.session import SessionLocal
+
+    header = "student_id,subject,teacher_id,quiz1,quiz2,quiz3,attendance\n"
+    upload("columns", header + "S1,Math,T1,80,70,50,60\nS2,Physics,,75,78,76,88\n")
+    db = SessionLocal()
+    try:
+        cols = college_columns(db, "columns")
+        assert cols is college_columns(db, "columns")
+        assert cols.student_id.tolist() == ["S1", "S2"]
+        assert cols.subject().tolist() == ["Math", "Physics"]
+        assert cols.risk_level().tolist() == ["HIGH", "LOW"]
+        assert cols.teacher_code.tolist() == [0, -1] and cols.teachers.tolist() == ["T1"]
+        assert np.allclose(cols.quiz_avg, [200 / 3, 229 / 3])
+
+        upload("columns", header + "S3,Math,T1,30,30,30,60\n")
+        fresh = college_columns(db, "columns")
+        assert fresh is not cols and fresh.student_id.tolist() == ["S3"]
+    finally:
+        db.close()
+        column_store.drop_college("columns")
+
+
+def test_upload_loads_columns(upload, monkeypatch):
+    from app.db import columns
+    from app.db.session import SessionLocal
+
+    header = "student_id,subject,teacher_id,quiz1,quiz2,quiz3,attendance\n"
+    for query in ({}, {"mode": "incremental"}):
+        upload("columns_warm", header + "S1,Math,T1,80,70,50,60\n", **query)
+        db = SessionLocal()
+        try:
+            monkeypatch.setattr(columns, "load_columns", lambda db, college_id: pytest.fail("columns not loaded"))
+            assert columns.college_columns(db, "columns_warm").student_id.tolist() == ["S1"]
+        finally:
+            monkeypatch.undo()
+            db.close()
+    column_store.drop_college("columns_warm")
@@ -0,0 +1,50 @@
+import random
+
+import pandas as pd
+
+from utils.data_generator import (
+    COLUMNS,
+    generate_colleges,
+    generate_demo_data,
+    generate_frames,
+    write_frames,
+)
+
+
+def test_generate_demo_data_leaves_global_random_alone():
+    random.seed(7)
+    expected = random.random()
+    random.seed(7)
+    first = generate_demo_data(50)
+    assert random.random() == expected
+    assert generate_demo_data(50) == first
+
+
+def test_generate_frames_chunks_and_seed():
+    frames = list(generate_frames(2500, chunk_rows=1000, seed=1))
+    assert [len(f) for f in frames] == [1000, 1000, 500]
+    df = pd.concat(frames, ignore_index=True)
+    assert list(df.columns) == COLUMNS
+    assert df["student_id"].is_unique and df["student_id"].iloc[-1] == "S2500"
+    assert df.equals(pd.concat(generate_frames(2500, chunk_rows=1000, seed=1), ignore_index=True))
+    assert df[["quiz1", "quiz2", "quiz3", "attendance"]].stack().between(0, 100).all()
+
+
+def test_generate_frames_keeps_crisis_bias_and_counts():
+    df = pd.concat(generate_frames(20000, num_subjects=8, num_teachers=12, seed=2))
+    assert df["subject"].nunique() == 8 and df["teacher_id"].nunique() == 12
+    drop = (df["quiz1"] - df["quiz3"]).groupby(df["subject"]).mean()
+    attendance = df.groupby("subject")["attendance"].mean()
+    assert drop["Physics"] > drop["Math"] + 5 and drop["Chemistry"] > drop["English"] + 5
+    assert attendance["Physics"] < attendance["Biology"] - 5
+
+
+def test_generate_colleges_independent_streams(tmp_path):
+    (a, frames_a), (b, frames_b) = generate_colleges(2, 300, seed=3)
+    df_a, df_b = pd.concat(frames_a), pd.concat(frames_b)
+    assert (a, b) == ("college_001", "college_002")
+    assert not df_a["quiz3"].equals(df_b["quiz3"])
+
+    path = tmp_path / "college.csv"
+    assert write_frames(generate_frames(300, chunk_rows=128, seed=3), path) == 300
+    assert len(pd.read_csv(path)) == 300
@@ -0,0 +1,172 @@
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(root))
+
+from app.core.ingest import IngestError, ingest_frames
+from app.db.base import Risk
+from app.db.datasets import (
+    CollegeBusy, active_risks, active_version, allocate_version, collect_garbage, college_write_lease,
+)
+from app.db.session import SessionLocal
+
+
+def _frame(n, quiz=70.0, offset=0):
+    return pd.DataFrame({
+        "student_id": [f"S{i + offset:04d}" for i in range(n)],
+        "subject": ["Math"] * n,
+        "quiz1": [quiz] * n,
+        "quiz2": [quiz] * n,
+        "quiz3": [quiz] * n,
+        "attendance": [90.0] * n,
+    })
+
+
+def _visible_rows(college_id):
+    reader = SessionLocal()
+    try:
+        return reader.query(Risk).filter(active_risks(reader, college_id)).count()
+    finally:
+        reader.close()
+
+
+def test_readers_see_previous_version_until_publish(monkeypatch):
+    from app.config import settings
+    monkeypatch.setattr(settings, "DATASET_GC_DELAY_SECONDS", 3600)
+    db = SessionLocal()
+    try:
+        ingest_frames(db, "staged", [_frame(10)])
+        assert _visible_rows("staged") == 10
+
+        def frames():
+            yield _frame(5, offset=100)
+            # First chunk is committed to the staging version but not visible yet
+            assert _visible_rows("staged") == 10
+            yield _frame(5, offset=200)
+
+        ingest_frames(db, "staged", frames())
+        assert _visible_rows("staged") == 10
+        total = db.query(Risk).filter(Risk.college_id == "staged").count()
+        assert total == 20  # previous version awaits garbage collection
+
+        assert collect_garbage("staged") == 10
+        assert db.query(Risk).filter(Risk.college_id == "staged").count() == 10
+    finally:
+        db.close()
+
+
+def test_failed_upload_keeps_published_version(monkeypatch):
+    from app.config import settings
+    monkeypatch.setattr(settings, "DATASET_GC_DELAY_SECONDS", 3600)
+    db = SessionLocal()
+    try:
+        ingest_frames(db, "staged_fail", [_frame(10)])
+        published = active_version(db, "staged_fail")
+
+        def frames():
+            yield _frame(5, offset=100)
+            yield _frame(5, offset=200).drop(columns=["attendance"])
+
+        with pytest.raises(IngestError):
+            ingest_frames(db, "staged_fail", frames())
+        assert active_version(db, "staged_fail") == published
+        assert _visible_rows("staged_fail") == 10
+        # The failed upload discarded its staging rows before releasing the college
+        assert db.query(Risk).filter(Risk.college_id == "staged_fail").count() == 10
+
+        # Garbage collection never deletes the active version
+        assert collect_garbage("staged_fail", published) == 0
+        assert _visible_rows("staged_fail") == 10
+    finally:
+        db.close()
+
+
+def test_allocate_version_is_atomic():
+    def allocate(_):
+        db = SessionLocal()
+        try:
+            return [allocate_version(db, "allocate") for _ in range(5)]
+        finally:
+            db.close()
+
+    with ThreadPoolExecutor(8) as pool:
+        versions = [v for batch in pool.map(allocate, range(8)) for v in batch]
+    assert len(set(versions)) == 40
+
+
+def test_concurrent_uploads_run_one_at_a_time(monkeypatch):
+    from app.config import settings
+    from app.db.summary import check_summary
+    monkeypatch.setattr(settings, "DATASET_GC_DELAY_SECONDS", 3600)
+    db = SessionLocal()
+    try:
+        ingest_frames(db, "concurrent", [_frame(10)])
+    finally:
+        db.close()
+
+    started = threading.Event()
+
+    def slow_frames(offset):
+        for chunk in range(3):
+            started.set()
+            time.sleep(0.1)
+            yield _frame(20, quiz=30.0, offset=offset + chunk * 20)
+
+    def slow_incremental():
+        time.sleep(0.5)
+        yield _frame(5, offset=5000)
+
+    def upload(frames, mode):
+        session = SessionLocal()
+        try:
+            return ingest_frames(session, "concurrent", frames, mode=mode)
+        finally:
+            session.close()
+
+    with ThreadPoolExecutor(3) as pool:
+        first = pool.submit(upload, slow_frames(1000), "replace")
+        started.wait()
+        second = pool.submit(upload, slow_frames(2000), "replace")
+        # Reads the stored rows and summary, then is slow to parse: without the lease a
+        # replace would publish meanwhile and the deltas would land on the old version
+        incremental = pool.submit(upload, slow_incremental(), "incremental")
+        responses = [f.result() for f in (first, second, incremental)]
+
+    assert [r.summary.total_students for r in responses[:2]] == [60, 60]
+    db = SessionLocal()
+    try:
+        assert check_summary(db, "concurrent") == []
+        visible = db.query(Risk).filter(active_risks(db, "concurrent")).all()
+        # Each upload applied to a whole dataset: the last replace (60 rows), or the
+        # incremental upload (5 rows) after it
+        assert len(visible) in (60, 5)
+        assert len({r.dataset_version for r in visible}) == 1
+
+        collect_garbage("concurrent")
+        assert _visible_rows("concurrent") == len(visible)
+        staged = db.query(Risk.dataset_version).filter(Risk.college_id == "concurrent").distinct().all()
+        assert staged == [(active_version(db, "concurrent"),)]
+    finally:
+        db.close()
+
+
+def test_upload_waits_then_gives_up_on_a_busy_college(monkeypatch):
+    from app.config import settings
+    monkeypatch.setattr(settings, "COLLEGE_WRITE_WAIT_SECONDS", 0.2)
+    holder, db = SessionLocal(), SessionLocal()
+    try:
+        with college_write_lease(holder, "busy"):
+            with pytest.raises(CollegeBusy):
+                ingest_frames(db, "busy", [_frame(3)])
+        ingest_frames(db, "busy", [_frame(3)])
+        assert _visible_rows("busy") == 3
+    finally:
+        holder.close()
+        db.close()
@@ -0,0 +1,69 @@
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from sqlalchemy import create_engine, text
+
+from app.core.risk_engine import compute_risk
+from app.db.base import Base
+from app.db.session import ALEMBIC_INI, migrate
+
+
+def _engine(tmp_path):
+    return create_engine(f"sqlite:///{tmp_path / 'migrate.db'}")
+
+
+def test_migrations_build_the_model_schema(tmp_path):
+    engine = _engine(tmp_path)
+    with engine.begin() as connection:
+        migrate(connection)
+        migrate(connection)  # already at head: a no-op
+        assert compare_metadata(MigrationContext.configure(connection), Base.metadata) == []
+
+
+def test_baseline_database_is_upgraded_in_place(tmp_path):
+    engine = _engine(tmp_path)
+    with engine.begin() as connection:
+        # A database create_all built before migrations existed: baseline tables, no alembic_version
+        config = Config(str(ALEMBIC_INI))
+        config.attributes["connection"] = connection
+        command.upgrade(config, "0001")
+        connection.execute(text("DROP TABLE alembic_version"))
+        connection.execute(text(
+            "INSERT INTO risks (college_id, student_id, subject, quiz1, quiz2, quiz3, attendance, risk_level, xp_score) "
+            "VALUES ('c1', 'S1', 'Math', 30, 60, 90, 80, 'LOW', 500), ('c1', 'S2', 'Math', 20, 20, 20, 50, 'HIGH', 100)"
+        ))
+
+        migrate(connection)
+
+        rows = connection.execute(text(
+            "SELECT quiz_avg, priority, dataset_version, row_hash FROM risks ORDER BY student_id"
+        )).all()
+        assert [tuple(row) for row in rows] == [(60.0, 80.0, 0, None), (20.0, 2200.0, 0, None)]
+        summary = connection.execute(text(
+            "SELECT total, high, medium, low, quiz_avg_sum FROM college_summaries WHERE college_id = 'c1'"
+        )).one()
+        assert tuple(summary) == (2, 1, 0, 1, 80.0)
+        assert connection.execute(text("SELECT version_num FROM alembic_version")).scalar() == "0009"
+
+
+def test_priority_backfill_matches_compute_risk(tmp_path):
+    rows = [
+        dict(quiz1=q1, quiz2=q2, quiz3=q3, attendance=attendance)
+        for q1, q2, q3 in ((30, 60, 90), (90, 60, 30), (80, 70, 50), (0, 40, 40), (100, 0, 0))
+        for attendance in (0, 55, 74.5, 100)
+    ]
+    engine = _engine(tmp_path)
+    with engine.begin() as connection:
+        config = Config(str(ALEMBIC_INI))
+        config.attributes["connection"] = connection
+        command.upgrade(config, "0002")
+        for i, row in enumerate(rows):
+            connection.execute(text(
+                "INSERT INTO risks (college_id, student_id, subject, quiz1, quiz2, quiz3, attendance, risk_level, xp_score) "
+                "VALUES ('c1', :student_id, 'Math', :quiz1, :quiz2, :quiz3, :attendance, :risk_level, 0)"
+            ), dict(row, student_id=f"S{i:02d}", risk_level=compute_risk(row).risk_level))
+        command.upgrade(config, "0003")
+
+        stored = connection.execute(text("SELECT priority FROM risks ORDER BY student_id")).scalars().all()
+        assert stored == [compute_risk(row).priority for row in rows]
@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.core import parallel
+from app.core.risk_engine import compile_rules, compute_risk_series
+from app.models.risk import RiskRule, RuleSetConfig
+from utils.data_generator import generate_frames
+
+
+@pytest.fixture(scope="module", autouse=True)
+def _pool():
+    yield
+    parallel.shutdown_pool()
+
+
+def _inputs(rows=5000):
+    df = pd.concat(generate_frames(rows, seed=3, num_quizzes=6), ignore_index=True)
+    quizzes = df[[f"quiz{i}" for i in range(1, 7)]].to_numpy(np.float64)
+    return quizzes, df["attendance"].to_numpy(np.float64)
+
+
+def test_pooled_scoring_matches_in_process():
+    quizzes, attendance = _inputs()
+    rules = compile_rules(RuleSetConfig(
+        rules=[
+            RiskRule(name="Eligibility", metric="attendance", op="<", value=65, weight=2),
+            RiskRule(name="Decline", metric="decline_pct", op=">", value=10),
+        ],
+        high_at=2,
+        medium_at=1,
+    ))
+    for r in (None, rules):
+        expected = compute_risk_series(quizzes, attendance, r)
+        pooled = parallel.compute_risk_series(quizzes, attendance, r, processes=3, min_rows=1)
+        for name, want, got in zip(expected._fields, expected, pooled):
+            assert np.array_equal(want, got), name
+
+
+def test_small_inputs_stay_in_process(monkeypatch):
+    def no_pool(processes):
+        raise AssertionError("pool used for a small input")
+
+    monkeypatch.setattr(parallel, "_get_pool", no_pool)
+    quizzes, attendance = _inputs(100)
+    batch = parallel.compute_risk_series(quizzes, attendance, processes=4, min_rows=1000)
+    assert len(batch.risk_level) == 100
+    parallel.compute_risk_series(quizzes, attendance, processes=1, min_rows=0)
+
+
+def test_pooled_scoring_rejects_nan():
+    with pytest.raises(ValueError):
+        parallel.compute_risk_series([[np.nan, 1, 2], [1, 2, 3]], [80, 80], processes=2, min_rows=1)
+
+
+def test_streamed_upload_scores_chunks_in_pool(upload, demo_csv_path, monkeypatch):
+    from app.config import settings
+
+    def upload_demo(college_id, **query):
+        r = upload(college_id, demo_csv_path, **query)
+        assert r.status_code == 200
+        return r.json()
+
+    monkeypatch.setattr(settings, "SCORING_PROCESSES", 1)
+    expected = upload_demo("stream_pool_ref")
+
+    pools = []
+    get_pool = parallel._get_pool
+
+    def spy(processes):
+        pools.append(processes)
+        return get_pool(processes)
+
+    monkeypatch.setattr(parallel, "_get_pool", spy)
+    monkeypatch.setattr(settings, "SCORING_PROCESSES", 2)
+    monkeypatch.setattr(settings, "UPLOAD_CHUNK_ROWS", 100)
+
+    # A small streamed file stays in-process
+    streamed = upload_demo("stream_pool", stream=True)
+    assert pools == []
+    assert streamed["summary"] == expected["summary"]
+
+    # Past the threshold, each further chunk goes to the pool: chunks 3-6 of the 512-row file
+    monkeypatch.setattr(settings, "SCORING_PARALLEL_MIN_ROWS", 250)
+    streamed = upload_demo("stream_pool", stream=True, force=True)
+    assert len(pools) == 4
+    assert streamed["summary"] == expected["summary"]
+    assert streamed["top_risks"] == expected["top_risks"]
+    assert streamed["heatmap_matrix"] == expected["heatmap_matrix"]
+
+    bad = b"student_id,subject,quiz1,quiz2,quiz3,attendance\n" + b"S1,Math,50,50,50,90\n" * 150 + b"S2,Math,x,50,50,90\n"
+    assert upload("stream_pool_bad", bad, stream=True).status_code == 400
@@ -29,18 +29,100 @@ def test_compute_risk_low():
     assert r.reason == "OK" or r.reason == ""
 
 
+def test_compute_risk_result_to_model():
+    from app.core.risk_engine import RiskResult
+    from app.models.risk import RiskModel
+    r = compute_risk({"quiz1": 30, "quiz2": 35, "quiz3": 32, "attendance": 60})
+    assert isinstance(r, RiskResult)
+    assert not hasattr(r, "__dict__")
+    model = r.to_model()
+    assert isinstance(model, RiskModel)
+    assert model.model_dump() == {"risk_level": "HIGH", "reason": "Attendance+Average", "xp_score": 323, "health_score": 32, "priority": 2160.0}
+
+
 def test_physics_crisis_cluster():
     from utils.data_generator import generate_demo_data
     import pandas as pd
     data = generate_demo_data(512)
     df = pd.DataFrame(data)
-    from app.core.risk_engine import compute_risk
-    risks = []
-    for _, row in df.iterrows():
-        r = compute_risk(row.to_dict())
-        risks.append(r.risk_level)
-    df["risk_level"] = risks
+    from app.core.risk_engine import compute_risk_batch
+    df["risk_level"] = compute_risk_batch(df["quiz1"], df["quiz2"], df["quiz3"], df["attendance"]).risk_level
     physics = df[df["subject"] == "Physics"]["risk_level"]
     if len(physics) > 0:
         high_pct = (physics == "HIGH").sum() / len(physics)
         assert high_pct > 0.20, "Physics should show elevated high-risk share"
+
+
+def test_compute_risk_batch_matches_row_engine():
+    from utils.data_generator import generate_demo_data
+    from app.core.risk_engine import compute_risk_batch
+    rows = generate_demo_data(512) + [
+        {"quiz1": 0, "quiz2": 0, "quiz3": 0, "attendance": 0},
+        {"quiz1": 0, "quiz2": 50, "quiz3": 60, "attendance": 100},
+        {"quiz1": 100, "quiz2": 100, "quiz3": 100, "attendance": 75},
+        {"quiz1": 40, "quiz2": 40, "quiz3": 34, "attendance": 74.9},
+    ]
+    batch = compute_risk_batch(
+        [r["quiz1"] for r in rows],
+        [r["quiz2"] for r in rows],
+        [r["quiz3"] for r in rows],
+        [r["attendance"] for r in rows],
+    )
+    for i, row in enumerate(rows):
+        expected = compute_risk(row)
+        assert batch.risk_level[i] == expected.risk_level
+        assert batch.reason[i] == expected.reason
+        assert batch.xp_score[i] == expected.xp_score
+        assert batch.health_score[i] == expected.health_score
+        assert batch.priority[i] == pytest.approx(expected.priority, abs=0.01)
+
+
+def test_crisis_subjects():
+    from app.core.risk_engine import crisis_subjects
+    subjects = ["Physics", "Physics", "Math", "Math", "Math", "Math"]
+    levels = ["HIGH", "LOW", "HIGH", "LOW", "LOW", "LOW"]
+    assert crisis_subjects(subjects, levels) == ["Physics"]
+    assert crisis_subjects([], []) == []
+
+
+def test_compiled_rules_weights_and_reasons():
+    from app.core.risk_engine import compile_rules
+    from app.models.risk import RiskRule, RuleSetConfig
+
+    rules = compile_rules(RuleSetConfig(
+        rules=[
+            RiskRule(name="Eligibility", metric="attendance", op="<", value=65, weight=2),
+            RiskRule(name="Low", metric="avg_score", op="<=", value=50),
+        ],
+        high_at=2,
+        medium_at=1,
+    ))
+    quizzes = [[80, 80, 80], [80, 80, 80], [40, 40, 40], [40, 40, 40]]
+    batch = rules.score(quizzes, [60, 70, 70, 60])
+    assert batch.risk_level.tolist() == ["HIGH", "LOW", "MEDIUM", "HIGH"]
+    assert batch.reason.tolist() == ["Eligibility", "OK", "Low", "Eligibility+Low"]
+    assert rules.hash_key is not None
+    assert rules.with_overrides(attendance=75).score([[80, 80, 80]], [70]).risk_level.tolist() == ["HIGH"]
+
+
+def test_series_stats_slope_and_ragged_rows():
+    import numpy as np
+    from app.core.risk_engine import series_stats
+    nan = np.nan
+    stats = series_stats([
+        [80, 70, 60, 50, 40],
+        [80, 70, 50, nan, nan],
+        [0, 50, 60, nan, nan],
+    ])
+    assert stats.avg_score.tolist() == pytest.approx([60, 200 / 3, 110 / 3])
+    assert stats.slope.tolist() == pytest.approx([-10, -15, 30])
+    # Fitted drop across the series relative to the first quiz; no decline from a zero start
+    assert stats.decline_pct.tolist() == pytest.approx([50, 37.5, 0])
+
+
+def test_longer_series_scores_on_fitted_trend():
+    from app.core.risk_engine import compute_risk_series
+    # Same first/last quiz: a recovered dip is not a decline, a steady slide is
+    batch = compute_risk_series([[60, 45, 45, 45, 60], [60, 55, 50, 45, 40]], [90, 90])
+    assert batch.risk_level.tolist() == ["LOW", "MEDIUM"]
+    assert batch.reason.tolist() == ["OK", "Decline"]
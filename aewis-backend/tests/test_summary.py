@@ -0,0 +1,46 @@
+import sys
+from pathlib import Path
+
+root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(root))
+
+from app.db.base import Risk
+from app.db.session import SessionLocal
+from app.db.summary import check_summary, rebuild_summary, read_summary
+
+
+def test_upload_maintains_summary(client, demo_csv_path):
+    with open(demo_csv_path, "rb") as f:
+        body = client.post(
+            "/api/v1/upload-csv",
+            files={"file": ("demo_data.csv", f, "text/csv")},
+            data={"college_id": "summary_test"},
+        ).json()
+    db = SessionLocal()
+    try:
+        summary = read_summary(db, "summary_test")
+        assert summary.total == body["summary"]["total_students"]
+        assert summary.high == body["summary"]["high_risk"]
+        assert check_summary(db, "summary_test") == []
+    finally:
+        db.close()
+
+
+def test_check_summary_detects_and_rebuilds_drift(client, demo_csv_path):
+    with open(demo_csv_path, "rb") as f:
+        client.post(
+            "/api/v1/upload-csv",
+            files={"file": ("demo_data.csv", f, "text/csv")},
+            data={"college_id": "summary_drift"},
+        )
+    db = SessionLocal()
+    try:
+        db.query(Risk).filter(Risk.college_id == "summary_drift", Risk.risk_level == "HIGH").delete()
+        db.commit()
+        assert check_summary(db, "summary_drift")
+        rebuild_summary(db, "summary_drift")
+        db.commit()
+        assert check_summary(db, "summary_drift") == []
+        assert read_summary(db, "summary_drift").high == 0
+    finally:
+        db.close()
@@ -1,33 +1,48 @@
 """
-Generate 512-row synthetic CSV for AEWIS demo.
-Columns: student_id, subject, quiz1, quiz2, quiz3, attendance
+Generate synthetic student CSVs for AEWIS demos, benchmarks and load tests.
+Columns: student_id, subject, teacher_id, quiz1, quiz2, quiz3, attendance
 Physics/Chemistry biased toward decline + low attendance for crisis clustering.
+
+generate_demo_data is the original 512-row demo generator. generate_frames
+draws the same distributions with NumPy, in DataFrame chunks, so millions of
+rows can be streamed to CSV or Parquet without holding them in memory:
+
+    python -m utils.data_generator --rows 1000000 --colleges 5 --format parquet --out data/
 """
+import argparse
 import random
 import csv
 from pathlib import Path
+from typing import Iterator, Optional
+
+import numpy as np
+import pandas as pd
 
 SUBJECTS = ["Physics", "Chemistry", "Math", "Biology", "English"]
 TEACHERS = ["T001_Sharma", "T002_Kumar", "T003_Patel", "T004_Singh", "T005_Mehta"]
+CRISIS_SUBJECTS = ("Physics", "Chemistry")
+COLUMNS = ["student_id", "subject", "teacher_id", "quiz1", "quiz2", "quiz3", "attendance"]
+DEFAULT_CHUNK_ROWS = 100_000
 
 
 def generate_demo_data(num_rows: int = 512) -> list[dict]:
-    random.seed(42)
+    # Own Random(42) instance: same rows as before, without reseeding the global RNG
+    rng = random.Random(42)
     rows = []
     for i in range(1, num_rows + 1):
         student_id = f"S{i:03d}"
-        subject = random.choice(SUBJECTS)
-        teacher = random.choice(TEACHERS)
-        base = random.randint(35, 85)
-        trend = random.gauss(0, 8)
+        subject = rng.choice(SUBJECTS)
+        teacher = rng.choice(TEACHERS)
+        base = rng.randint(35, 85)
+        trend = rng.gauss(0, 8)
         q1 = max(0, min(100, base))
         q2 = max(0, min(100, base + trend))
         q3 = max(0, min(100, base + trend * 1.5))
-        if subject in ("Physics", "Chemistry"):
-            q3 = max(0, min(100, q3 - random.randint(5, 20)))
-            att = random.gauss(72, 12)
+        if subject in CRISIS_SUBJECTS:
+            q3 = max(0, min(100, q3 - rng.randint(5, 20)))
+            att = rng.gauss(72, 12)
         else:
-            att = random.gauss(82, 10)
+            att = rng.gauss(82, 10)
         attendance = max(0, min(100, att))
         rows.append({
             "student_id": student_id,
@@ -46,14 +61,144 @@ def write_demo_csv(filepath: str | Path, num_rows: int = 512) -> None:
     path = Path(filepath)
     path.parent.mkdir(parents=True, exist_ok=True)
     with open(path, "w", newline="", encoding="utf-8") as f:
-        w = csv.DictWriter(
-            f,
-            fieldnames=["student_id", "subject", "teacher_id", "quiz1", "quiz2", "quiz3", "attendance"],
-        )
+        w = csv.DictWriter(f, fieldnames=COLUMNS)
         w.writeheader()
         w.writerows(rows)
 
 
+def subject_names(num_subjects: int = len(SUBJECTS)) -> list[str]:
+    """The demo subjects, then Subject06, Subject07, ... if more are asked for."""
+    return SUBJECTS[:num_subjects] + [f"Subject{i:02d}" for i in range(len(SUBJECTS) + 1, num_subjects + 1)]
+
+
+def teacher_names(num_teachers: int = len(TEACHERS)) -> list[str]:
+    return TEACHERS[:num_teachers] + [f"T{i:03d}_Teacher" for i in range(len(TEACHERS) + 1, num_teachers + 1)]
+
+
+def generate_frames(
+    num_rows: int,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    num_subjects: int = len(SUBJECTS),
+    num_teachers: int = len(TEACHERS),
+    seed: int | np.random.SeedSequence | None = None,
+    num_quizzes: int = 3,
+) -> Iterator[pd.DataFrame]:
+    """Yield one college's rows as DataFrames of at most `chunk_rows` rows.
+
+    Uses its own Generator, so nothing global is touched; the same `seed` and
+    `chunk_rows` always give the same rows. Quiz k follows the per-row trend
+    (quiz4 onward add half a trend step each), with the crisis drop on the last.
+    """
+    rng = np.random.default_rng(seed)
+    subjects = np.array(subject_names(num_subjects), dtype=object)
+    teachers = np.array(teacher_names(num_teachers), dtype=object)
+    crisis = np.isin(subjects, CRISIS_SUBJECTS)
+    quiz_steps = [0.0, 1.0, 1.5][:num_quizzes] + [1.5 + 0.5 * k for k in range(1, num_quizzes - 2)]
+
+    for start in range(0, num_rows, chunk_rows):
+        n = min(chunk_rows, num_rows - start)
+        subject_idx = rng.integers(0, len(subjects), n)
+        teacher_idx = rng.integers(0, len(teachers), n)
+        base = rng.integers(35, 86, n).astype(float)
+        trend = rng.normal(0, 8, n)
+        biased = crisis[subject_idx]
+        quizzes = [np.clip(base + trend * step, 0, 100) for step in quiz_steps]
+        quizzes[-1] = np.where(biased, np.clip(quizzes[-1] - rng.integers(5, 21, n), 0, 100), quizzes[-1])
+        attendance = np.where(biased, rng.normal(72, 12, n), rng.normal(82, 10, n))
+        yield pd.DataFrame({
+            "student_id": [f"S{i:03d}" for i in range(start + 1, start + n + 1)],
+            "subject": subjects[subject_idx],
+            "teacher_id": teachers[teacher_idx],
+            **{f"quiz{k}": q.round(1) for k, q in enumerate(quizzes, start=1)},
+            "attendance": np.clip(attendance, 0, 100).round(1),
+        })
+
+
+def generate_colleges(
+    num_colleges: int,
+    num_rows: int,
+    seed: Optional[int] = None,
+    prefix: str = "college",
+    **kwargs,
+) -> Iterator[tuple[str, Iterator[pd.DataFrame]]]:
+    """Yield (college_id, frames) per college; each college gets an independent RNG stream."""
+    for i, child in enumerate(np.random.SeedSequence(seed).spawn(num_colleges), start=1):
+        yield f"{prefix}_{i:03d}", generate_frames(num_rows, seed=child, **kwargs)
+
+
+def write_frames(frames: Iterator[pd.DataFrame], filepath: str | Path, fmt: Optional[str] = None) -> int:
+    """Stream frames to one CSV or Parquet file (format from `fmt` or the suffix); returns rows written."""
+    path = Path(filepath)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fmt = fmt or path.suffix.lstrip(".").lower() or "csv"
+    rows = 0
+    if fmt == "csv":
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            for i, df in enumerate(frames):
+                df.to_csv(f, header=i == 0, index=False)
+                rows += len(df)
+    elif fmt == "parquet":
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Parquet output requires pyarrow (pip install pyarrow)")
+        writer = None
+        try:
+            for df in frames:
+                table = pa.Table.from_pandas(df, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(path, table.schema)
+                writer.write_table(table)
+                rows += len(df)
+        finally:
+            if writer is not None:
+                writer.close()
+    else:
+        raise ValueError(f"Unsupported format: {fmt}")
+    return rows
+
+
+def write_dataset(
+    directory: str | Path,
+    num_colleges: int,
+    num_rows: int,
+    fmt: str = "csv",
+    seed: Optional[int] = None,
+    **kwargs,
+) -> list[Path]:
+    """Write one file per college, named <college_id>.<fmt>, into `directory`."""
+    paths = []
+    for college_id, frames in generate_colleges(num_colleges, num_rows, seed=seed, **kwargs):
+        path = Path(directory) / f"{college_id}.{fmt}"
+        write_frames(frames, path, fmt)
+        paths.append(path)
+    return paths
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate synthetic AEWIS student data")
+    parser.add_argument("--rows", type=int, help="Rows per college (default: the 512-row demo_data.csv)")
+    parser.add_argument("--colleges", type=int, default=1)
+    parser.add_argument("--subjects", type=int, default=len(SUBJECTS))
+    parser.add_argument("--teachers", type=int, default=len(TEACHERS))
+    parser.add_argument("--quizzes", type=int, default=3, help="Quiz columns per row (quiz1..quizN)")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
+    parser.add_argument("--format", choices=("csv", "parquet"), default="csv")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--out", default="data", help="Output directory")
+    args = parser.parse_args()
+
+    if args.rows is None:
+        write_demo_csv("demo_data.csv", 512)
+        print("Generated demo_data.csv with 512 rows")
+        return
+    paths = write_dataset(
+        args.out, args.colleges, args.rows, fmt=args.format, seed=args.seed,
+        chunk_rows=args.chunk_rows, num_subjects=args.subjects, num_teachers=args.teachers, num_quizzes=args.quizzes,
+    )
+    print(f"Generated {len(paths)} file(s) of {args.rows} rows in {args.out}/")
+
+
 if __name__ == "__main__":
-    write_demo_csv("demo_data.csv", 512)
-    print("Generated demo_data.csv with 512 rows")
+    main()